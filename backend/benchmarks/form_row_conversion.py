@@ -0,0 +1,135 @@
+"""
+Benchmark: converting forms-database rows into FormSubmissionOut
+Compares the original per-row path (load ORM objects, getattr every column to
+build data, then a validated FormSubmissionOut) with the converters compiled
+per model in services/form_converters.py, which read column tuples.
+Runs against an in-memory SQLite forms database; no project database is touched.
+Run with: python -m benchmarks.form_row_conversion [--rows 100000] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from database_forms import FormsBase
+from models.external.brochure_forms import BrochureForm
+from models.external.contact_forms import ContactForm
+from models.external.newsletter_subscriptions import NewsletterSubscription
+from models.external.product_profile_forms import ProductProfileForm
+from models.external.talk_to_sales_forms import TalkToSalesForm
+from schemas.submission import FormSubmissionOut
+from services.form_converters import converter_for, form_columns
+
+# form type -> model, as the forms database listing reads them
+FORMS = {
+    'contact': ContactForm,
+    'brochure': BrochureForm,
+    'product-profile': ProductProfileForm,
+    'talk': TalkToSalesForm,
+    'newsletter': NewsletterSubscription,
+}
+
+def seed(db, rows: int):
+    start = datetime(2024, 1, 1)
+    per_form = rows // len(FORMS)
+    person = lambda i: dict(first_name=f"First {i}", last_name=f"Last {i}", email=f"person{i}@example.com", phone="+1 555 0100")
+    db.execute(insert(ContactForm), [
+        dict(person(i), company=f"Company {i % 97}", message="Please get in touch", timeline="Q3", submitted_at=start + timedelta(minutes=i))
+        for i in range(per_form)
+    ])
+    db.execute(insert(BrochureForm), [
+        dict(person(i), company=f"Company {i % 97}", job_role="Buyer", agreed_to_marketing=i % 2 == 0, submitted_at=start + timedelta(minutes=i))
+        for i in range(per_form)
+    ])
+    db.execute(insert(ProductProfileForm), [
+        dict(person(i), company_name=f"Company {i % 97}", industry="Retail", warehouses=i % 9, submitted_at=start + timedelta(minutes=i))
+        for i in range(per_form)
+    ])
+    db.execute(insert(TalkToSalesForm), [
+        dict(person(i), company=f"Company {i % 97}", additional_information="Pricing", users=i % 50, submitted_at=start + timedelta(minutes=i))
+        for i in range(per_form)
+    ])
+    db.execute(insert(NewsletterSubscription), [
+        dict(email=f"reader{i}@example.com", subscribed_at=start + timedelta(minutes=i)) for i in range(per_form)
+    ])
+    db.commit()
+
+def original_path(db) -> list:
+    """The pre-converter loop body of _get_submissions_from_forms_db"""
+    results = []
+    for ft, model in FORMS.items():
+        for form in db.query(model).all():
+            if ft == 'newsletter':
+                results.append(FormSubmissionOut(
+                    id=form.id, form_type='newsletter', name='', email=form.email, company='',
+                    submitted_at=form.subscribed_at, data={'email': form.email}, status='New', lead_id=None
+                ))
+            else:
+                name = f"{getattr(form, 'first_name', '')} {getattr(form, 'last_name', '')}".strip()
+                data = {}
+                for key in form.__table__.columns.keys():
+                    if key not in ['id', 'submitted_at']:
+                        value = getattr(form, key, None)
+                        if value is not None:
+                            data[key] = value
+                results.append(FormSubmissionOut(
+                    id=form.id,
+                    form_type=ft,
+                    name=name,
+                    email=getattr(form, 'email', ''),
+                    company=getattr(form, 'company', '') or getattr(form, 'company_name', ''),
+                    submitted_at=getattr(form, 'submitted_at', datetime.now()),
+                    data=data,
+                    status='New',
+                    lead_id=None
+                ))
+        db.expunge_all()
+    return results
+
+def compiled_path(db) -> list:
+    results = []
+    for ft, model in FORMS.items():
+        convert = converter_for(model)
+        results.extend(convert(row, ft) for row in db.query(*form_columns(model)))
+    return results
+
+def timed(fn, db, repeat: int):
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(db)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    FormsBase.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    seed(db, args.rows)
+
+    original, original_result = timed(original_path, db, args.repeat)
+    compiled, compiled_result = timed(compiled_path, db, args.repeat)
+    if [item.model_dump() for item in original_result] != [item.model_dump() for item in compiled_result]:
+        print("[ERROR] Compiled converters' output differs from the original path")
+        sys.exit(1)
+
+    per_1k = 1000 / len(original_result)
+    print(f"Rows: {len(original_result)} (best of {args.repeat})")
+    print(f"  original path: {original * 1000:8.2f} ms total, {original * 1000 * per_1k:6.2f} ms per 1k rows")
+    print(f"  compiled path: {compiled * 1000:8.2f} ms total, {compiled * 1000 * per_1k:6.2f} ms per 1k rows")
+    print(f"  speedup:       {original / compiled:.1f}x, identical output")
+
+if __name__ == "__main__":
+    main()
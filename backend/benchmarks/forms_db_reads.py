@@ -0,0 +1,139 @@
+"""
+Benchmark: reading the forms pages from spars_forms.db
+Compares the previous engine (default read/write SQLite engine and pragmas)
+with the read-only engine from database_forms.create_forms_engine (mode=ro,
+mmap, larger page cache, warm pool, per-connection statement cache), alone
+and with pages reused while FormsDbChanges reports the file unchanged (as
+GET /form-submissions does). Each request reads what the forms pages read.
+Runs against a temporary forms database file; no project database is touched.
+Run with: python -m benchmarks.forms_db_reads [--rows 50000] [--requests 100] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from database_forms import FormsBase, FormsDbChanges, create_forms_engine, warm_forms_pool
+from models.external.brochure_forms import BrochureForm
+from models.external.contact_forms import ContactForm
+from models.external.newsletter_subscriptions import NewsletterSubscription
+from models.external.product_profile_forms import ProductProfileForm
+from models.external.talk_to_sales_forms import TalkToSalesForm
+from services.submission_feed import FormsPageCache, forms_db_feed, take_page
+
+PAGE_SIZE = 50
+
+def seed(path: str, rows: int):
+    engine = create_engine(f"sqlite:///{path}")
+    FormsBase.metadata.create_all(bind=engine)
+    start = datetime(2024, 1, 1)
+    per_form = rows // 5
+    person = lambda i: dict(first_name=f"First {i}", last_name=f"Last {i}", email=f"person{i}@example.com", phone="+1 555 0100")
+    with engine.begin() as conn:
+        conn.execute(insert(ContactForm), [
+            dict(person(i), company=f"Company {i % 97}", message="Please get in touch " * 8,
+                 demo_date="2024-02-01" if i % 3 == 0 else None, submitted_at=start + timedelta(minutes=i))
+            for i in range(per_form)
+        ])
+        conn.execute(insert(BrochureForm), [
+            dict(person(i), company=f"Company {i % 97}", job_role="Buyer", submitted_at=start + timedelta(minutes=i))
+            for i in range(per_form)
+        ])
+        conn.execute(insert(ProductProfileForm), [
+            dict(person(i), company_name=f"Company {i % 97}", industry="Retail", warehouses=i % 9, submitted_at=start + timedelta(minutes=i))
+            for i in range(per_form)
+        ])
+        conn.execute(insert(TalkToSalesForm), [
+            dict(person(i), company=f"Company {i % 97}", additional_information="Pricing " * 8, submitted_at=start + timedelta(minutes=i))
+            for i in range(per_form)
+        ])
+        conn.execute(insert(NewsletterSubscription), [
+            dict(email=f"reader{i}@example.com", subscribed_at=start + timedelta(minutes=i)) for i in range(per_form)
+        ])
+    engine.dispose()
+
+def reader(session_factory, changes=None):
+    """read(form_type, cursor, limit) -> (items, next_cursor), one session per call"""
+    cache = FormsPageCache()
+
+    def read(form_type, cursor, limit):
+        version = changes.version() if changes is not None else None
+        page = cache.get(version, (form_type, cursor, limit)) if changes is not None else None
+        if page is not None:
+            return page
+        db = session_factory()
+        try:
+            page = take_page(forms_db_feed(db, form_type, cursor=cursor, limit=limit), limit)
+        finally:
+            db.close()
+        if changes is not None:
+            cache.put(version, (form_type, cursor, limit), page)
+        return page
+    return read
+
+def requests(read, count: int) -> list:
+    """count requests: the newest page of every form, the pages after it, and a full list of one form"""
+    results = []
+    cursor = None
+    for i in range(count):
+        if i % 10 == 9:
+            results.append(len(read('talk', None, None)[0]))
+        else:
+            items, cursor = read(None, cursor if i % 10 else None, PAGE_SIZE)
+            results.append([(item.form_type, item.id) for item in items])
+    return results
+
+def timed(make_read, count: int, repeat: int):
+    best = None
+    result = None
+    for _ in range(repeat):
+        read = make_read()
+        started = time.perf_counter()
+        result = requests(read, count)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "spars_forms.db")
+        seed(path, args.rows)
+
+        default_engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+        tuned_engine = create_forms_engine(path)
+        warm_forms_pool(tuned_engine)
+        changes = FormsDbChanges(path)
+        default, default_result = timed(lambda: reader(sessionmaker(bind=default_engine)), args.requests, args.repeat)
+        tuned, tuned_result = timed(lambda: reader(sessionmaker(bind=tuned_engine)), args.requests, args.repeat)
+        cached, cached_result = timed(lambda: reader(sessionmaker(bind=tuned_engine), changes), args.requests, args.repeat)
+        if not default_result == tuned_result == cached_result:
+            print("[ERROR] The read-only engine's results differ from the default engine's")
+            sys.exit(1)
+
+        started = time.perf_counter()
+        for _ in range(10000):
+            changes.version()
+        check = (time.perf_counter() - started) / 10000
+        default_engine.dispose()
+        tuned_engine.dispose()
+
+    print(f"Rows: {args.rows}, requests: {args.requests} (best of {args.repeat})")
+    print(f"  default engine:            {default * 1000:9.2f} ms total, {default * 1000 / args.requests:7.2f} ms per request")
+    print(f"  read-only engine:          {tuned * 1000:9.2f} ms total, {tuned * 1000 / args.requests:7.2f} ms per request ({default / tuned:.1f}x)")
+    print(f"  read-only + change check:  {cached * 1000:9.2f} ms total, {cached * 1000 / args.requests:7.2f} ms per request ({default / cached:.1f}x)")
+    print(f"  unchanged-file check:      {check * 1e6:.1f} us; identical results")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark: serializing a lead list page
+Compares the original per-row path (load ORM objects, normalize, LeadOut
+model_validate + model_dump, then response_model validation and JSON encoding
+of the list) with the column-tuple fast path used by GET /leads.
+Runs against an in-memory SQLite database; the project database is untouched.
+Run with: python -m benchmarks.lead_list_serialization [--leads 5000] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from database import Base
+from models.lead import Lead
+from models.role import Role  # noqa: F401 - registers the tables leads references
+from models.user import User  # noqa: F401
+from schemas.lead import LeadOut
+from services.lead_serializer import LEAD_LIST_COLUMNS, serialize_lead_rows
+from services.lead_sources import normalize_source
+
+STATUSES = ['New', 'Contacted', 'Qualified', 'Proposal Sent', 'Closed Won']
+SOURCES = [('Website', 'Talk to Sales'), ('Trade Show', None), ('Request a Demo', None), (None, 'Brochure Download')]
+
+def seed(db, count: int):
+    start = datetime(2024, 1, 1)
+    for i in range(count):
+        # Stored sources are normalized at write time
+        source_type, source = normalize_source(*SOURCES[i % len(SOURCES)])
+        db.add(Lead(
+            name=f"Lead {i}",
+            email=f"lead{i}@example.com",
+            phone="+1 555 0100",
+            company=f"Company {i % 97}",
+            source_type=source_type,
+            source=source,
+            designation="Buyer",
+            status=STATUSES[i % len(STATUSES)],
+            stage="ABCDEFGH"[i % 8],
+            assigned="Unassigned",
+            created_by=1 + i % 5,
+            follow_up_required=i % 3 == 0,
+            follow_up_date=(start + timedelta(days=i % 30)).date() if i % 3 == 0 else None,
+            created_at=start + timedelta(minutes=i),
+        ))
+    db.commit()
+
+def original_path(db, creator_names: dict) -> bytes:
+    """The pre-fast-path get_leads body plus FastAPI's response_model handling"""
+    result = []
+    for lead in db.query(Lead).all():
+        lead.source_type, lead.source = normalize_source(lead.source_type, lead.source)
+        lead_dict = LeadOut.model_validate(lead).model_dump()
+        lead_dict['created_by_name'] = creator_names.get(lead.created_by) if lead.created_by else None
+        result.append(lead_dict)
+    validated = response_adapter.validate_python(result)
+    body = json.dumps(jsonable_encoder(response_adapter.dump_python(validated, mode="json"))).encode()
+    db.expunge_all()
+    return body
+
+def fast_path(db, creator_names: dict) -> bytes:
+    rows = db.query(*LEAD_LIST_COLUMNS).all()
+    return serialize_lead_rows(rows, creator_names)
+
+response_adapter = TypeAdapter(list[LeadOut])
+
+def timed(fn, db, creator_names, repeat: int):
+    best = None
+    body = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = fn(db, creator_names)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, body
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--leads", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    seed(db, args.leads)
+    creator_names = {i: f"User {i}" for i in range(1, 6)}
+
+    original, original_body = timed(original_path, db, creator_names, args.repeat)
+    fast, fast_body = timed(fast_path, db, creator_names, args.repeat)
+    if json.loads(original_body) != json.loads(fast_body):
+        print("[ERROR] Fast path output differs from the original path")
+        sys.exit(1)
+
+    per_1k = 1000 / args.leads
+    print(f"Leads: {args.leads} (best of {args.repeat})")
+    print(f"  original path: {original * 1000:8.2f} ms total, {original * 1000 * per_1k:7.2f} ms per 1k leads")
+    print(f"  fast path:     {fast * 1000:8.2f} ms total, {fast * 1000 * per_1k:7.2f} ms per 1k leads")
+    print(f"  speedup:       {original / fast:.1f}x, identical output")
+
+if __name__ == "__main__":
+    main()
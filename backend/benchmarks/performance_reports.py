@@ -0,0 +1,150 @@
+"""
+Benchmark: team performance report metrics
+Compares the original per-executive path (load every lead and every call log
+of each executive and count in Python, two queries per executive) with GROUP
+BY queries over leads and call_logs and with the rollup tables that
+/reports/team-performance and /reports/org-performance read.
+Runs against an in-memory SQLite database; the project database is untouched.
+Run with: python -m benchmarks.performance_reports [--executives 200] [--leads 500000] [--calls 100000] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from database import Base
+from models.call_log import CallLog
+from models.lead import Lead
+from models.role import Role  # noqa: F401 - registers the tables the models reference
+from models.tag import Tag  # noqa: F401
+from models.user import User  # noqa: F401
+from services.performance import user_metrics, source_metrics
+from services.report_rollups import ensure_report_rollups
+
+STATUSES = ['New', 'Contacted', 'Qualified', 'Proposal Sent', 'Closed Won', 'Closed Lost']
+STAGES = [None] + list("ABCDEFGH")
+INSERT_BATCH = 10000
+
+def _insert(db, table, rows):
+    for start in range(0, len(rows), INSERT_BATCH):
+        db.execute(table.insert(), rows[start:start + INSERT_BATCH])
+    db.commit()
+
+def seed(db, executives: int, leads: int, calls: int):
+    start = datetime(2024, 1, 1)
+    _insert(db, Lead.__table__, [
+        {
+            "name": f"Lead {i}",
+            "email": f"lead{i}@example.com",
+            "company": f"Company {i % 997}",
+            "status": STATUSES[i % len(STATUSES)],
+            "stage": "ABCDEFGH"[i % 8],
+            # A few unassigned leads, which no report counts
+            "assigned_to": 1 + i % executives if i % 50 else None,
+            "created_at": start + timedelta(minutes=i),
+        }
+        for i in range(leads)
+    ])
+    _insert(db, CallLog.__table__, [
+        {
+            "lead_id": 1 + i % leads,
+            "user_id": 1 + i % executives,
+            "stage": STAGES[i % len(STAGES)],
+            "secured_order": i % 7 == 0,
+            "dollar_value": (i % 1000) * 12.5 if i % 3 else None,
+            "meeting_date": start + timedelta(hours=i),
+        }
+        for i in range(calls)
+    ])
+
+def original_path(db, executive_ids) -> dict:
+    """The pre-rewrite loop body of get_team_performance"""
+    result = {}
+    for user_id in executive_ids:
+        leads = db.query(Lead).filter(Lead.assigned_to == user_id).all()
+        status_counts = {}
+        for lead in leads:
+            status_counts[lead.status] = status_counts.get(lead.status, 0) + 1
+        call_logs = db.query(CallLog).filter(CallLog.user_id == user_id).all()
+        closed_won = status_counts.get("Closed Won", 0) + status_counts.get("Won", 0)
+        stage_counts = {}
+        for log in call_logs:
+            if log.stage:
+                stage_counts[log.stage] = stage_counts.get(log.stage, 0) + 1
+        result[user_id] = {
+            "total_leads": len(leads),
+            "total_calls": len(call_logs),
+            "conversion_rate": round((closed_won / len(leads) * 100) if leads else 0, 2),
+            "total_dollar_value": round(sum(log.dollar_value or 0 for log in call_logs if log.dollar_value), 2),
+            "secured_orders": sum(1 for log in call_logs if log.secured_order),
+            "status_counts": status_counts,
+            "stage_distribution": stage_counts,
+            "closed_won": closed_won,
+        }
+        db.expunge_all()
+    return result
+
+def _rounded(metrics: dict) -> dict:
+    return {
+        user_id: {
+            **user,
+            "conversion_rate": round(user["conversion_rate"], 2),
+            "total_dollar_value": round(user["total_dollar_value"], 2),
+        }
+        for user_id, user in metrics.items()
+    }
+
+def grouped_path(db, executive_ids) -> dict:
+    return _rounded(source_metrics(db, executive_ids))
+
+def rollup_path(db, executive_ids) -> dict:
+    return _rounded(user_metrics(db, executive_ids))
+
+def timed(fn, db, executive_ids, repeat: int):
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(db, executive_ids)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--executives", type=int, default=200)
+    parser.add_argument("--leads", type=int, default=500000)
+    parser.add_argument("--calls", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    seed(db, args.executives, args.leads, args.calls)
+    started = time.perf_counter()
+    ensure_report_rollups(engine)
+    build = time.perf_counter() - started
+    executive_ids = list(range(1, args.executives + 1))
+
+    original, original_result = timed(original_path, db, executive_ids, args.repeat)
+    grouped, grouped_result = timed(grouped_path, db, executive_ids, args.repeat)
+    rollup, rollup_result = timed(rollup_path, db, executive_ids, args.repeat)
+    for name, result in (("Grouped", grouped_result), ("Rollup", rollup_result)):
+        if result != original_result:
+            print(f"[ERROR] {name} metrics differ from the original path")
+            sys.exit(1)
+
+    print(f"Executives: {args.executives}, leads: {args.leads}, call logs: {args.calls} (best of {args.repeat})")
+    print(f"  original path: {original * 1000:9.2f} ms, {2 * args.executives} queries")
+    print(f"  grouped path:  {grouped * 1000:9.2f} ms, {original / grouped:.1f}x")
+    print(f"  rollup path:   {rollup * 1000:9.2f} ms, {original / rollup:.1f}x (rollups built in {build * 1000:.0f} ms)")
+    print("  identical metrics")
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,22 @@ else:
 
 SECRET_KEY = os.getenv('SECRET_KEY', 'supersecret')
 ALGORITHM = os.getenv('ALGORITHM', 'HS256')
+# Auth mode: 'database' resolves each token against the users table (cached),
+# 'stateless' trusts the signed claims and only checks the per-user token version
+AUTH_MODE = os.getenv('AUTH_MODE', 'database').lower()
+# Seconds a resolved principal (user + role) stays cached per token; 0 disables the cache
+PRINCIPAL_CACHE_TTL = int(os.getenv('PRINCIPAL_CACHE_TTL', '60'))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv('PRINCIPAL_CACHE_MAX_ENTRIES', '10000'))
+# Full reload interval for the stateless-mode token version mirror (picks up other workers' revocations); 0 never reloads
+TOKEN_REGISTRY_REFRESH_SECONDS = int(os.getenv('TOKEN_REGISTRY_REFRESH_SECONDS', '30'))
+# Full reload interval for the in-memory team index (manager -> executives); 0 never reloads
+TEAM_INDEX_REFRESH_SECONDS = int(os.getenv('TEAM_INDEX_REFRESH_SECONDS', '300'))
+# Most lead ids a single POST /leads/bulk request may touch
+BULK_LEADS_MAX = int(os.getenv('BULK_LEADS_MAX', '5000'))
+# Rows fetched per round trip by the streaming /export endpoints (bounds their memory use)
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '1000'))
+# Threads reserved for bcrypt hashing/verification (bounds CPU spent on password work)
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', str(min(4, os.cpu_count() or 1))))
 ALLOW_ORIGINS = [o.strip() for o in os.getenv('ALLOW_ORIGINS', 'http://localhost:3002,http://192.168.100.77:3002,https://spars-dashboard-7yxc.vercel.app').split(',') if o.strip()]
 
 # Forms Database Configuration
@@ -26,3 +42,18 @@ ALLOW_ORIGINS = [o.strip() for o in os.getenv('ALLOW_ORIGINS', 'http://localhost
 # If USE_FORMS_DB=false, use seeded dummy data in CRM database
 USE_FORMS_DB = os.getenv('USE_FORMS_DB', 'false').lower() == 'true'
 FORMS_DB_PATH = os.getenv('FORMS_DB_PATH', './spars_forms.db')
+# spars_forms.db is opened read-only: connections kept open (and opened at startup), bytes of the
+# file memory-mapped per connection, page cache KiB and prepared statements kept per connection
+FORMS_DB_POOL_SIZE = int(os.getenv('FORMS_DB_POOL_SIZE', '5'))
+FORMS_DB_MMAP_BYTES = int(os.getenv('FORMS_DB_MMAP_BYTES', str(256 * 1024 * 1024)))
+FORMS_DB_CACHE_KB = int(os.getenv('FORMS_DB_CACHE_KB', str(16 * 1024)))
+FORMS_DB_STATEMENT_CACHE = int(os.getenv('FORMS_DB_STATEMENT_CACHE', '256'))
+# Pages read from spars_forms.db kept for reuse until the file changes (0 disables)
+FORMS_DB_PAGE_CACHE_ENTRIES = int(os.getenv('FORMS_DB_PAGE_CACHE_ENTRIES', '64'))
+# In forms-DB mode, copy new spars_forms.db rows into the submissions table, where
+# they can be converted and tagged like our own; when off, lists read spars_forms.db directly
+FORMS_DB_SYNC = os.getenv('FORMS_DB_SYNC', 'true').lower() == 'true'
+FORMS_DB_DIRECT_READS = USE_FORMS_DB and not FORMS_DB_SYNC
+# Seconds between background sync passes (0: only on demand) and rows copied per transaction
+FORMS_SYNC_INTERVAL_SECONDS = int(os.getenv('FORMS_SYNC_INTERVAL_SECONDS', '30'))
+FORMS_SYNC_BATCH_SIZE = int(os.getenv('FORMS_SYNC_BATCH_SIZE', '500'))
@@ -1,40 +1,119 @@
 """
 Secondary database connection for spars_forms.db (read-only)
 Only used when USE_FORMS_DB=true
+The website owns the file; we only read it. Connections open it with
+mode=ro, map it into memory and keep a larger page cache, and stay open in a
+pool (opened at startup by warm_forms_pool) so a request reuses a connection,
+its cached pages and its prepared statements instead of reopening the file.
+forms_db_changes tells callers whether the file changed since they last
+looked, so they can skip re-reading it.
 """
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
-from config import USE_FORMS_DB, FORMS_DB_PATH
 import os
+import sqlite3
+import threading
+from urllib.parse import quote
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import QueuePool
+from config import (
+    USE_FORMS_DB, FORMS_DB_PATH, FORMS_DB_POOL_SIZE, FORMS_DB_MMAP_BYTES, FORMS_DB_CACHE_KB, FORMS_DB_STATEMENT_CACHE,
+)
 
 # Base for external forms models
 FormsBase = declarative_base()
 
+def resolve_forms_db_path(path: str = FORMS_DB_PATH) -> str:
+    """Relative paths are relative to the backend directory"""
+    if os.path.isabs(path):
+        return path
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(backend_dir, path)
+
+def _read_only_uri(path: str) -> str:
+    return f"file:{quote(path)}?mode=ro"
+
+def _tune_connection(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA mmap_size = {FORMS_DB_MMAP_BYTES}")
+    cursor.execute(f"PRAGMA cache_size = -{FORMS_DB_CACHE_KB}")  # negative: KiB rather than pages
+    cursor.execute("PRAGMA query_only = 1")
+    cursor.close()
+
+def create_forms_engine(path: str, pool_size: int = FORMS_DB_POOL_SIZE):
+    """Read-only, tuned, pooled engine over a forms SQLite file"""
+    engine = create_engine(
+        f"sqlite:///{_read_only_uri(path)}&uri=true",
+        connect_args={"check_same_thread": False, "cached_statements": FORMS_DB_STATEMENT_CACHE},
+        poolclass=QueuePool,
+        pool_size=pool_size,
+        max_overflow=pool_size,
+        echo=False
+    )
+    event.listen(engine, "connect", _tune_connection)
+    return engine
+
+class FormsDbChanges:
+    """
+    Change counter for a forms SQLite file: PRAGMA data_version, read on a
+    connection kept for that purpose, which moves on every commit by another
+    connection but not on a checkpoint or a touch. It is read on every call
+    (a few microseconds on the open connection), since the file's mtime and
+    size can stay the same across a commit. The connection is reopened when
+    a new file replaces the one at the path.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._inode = None
+        self._data_version = None
+        self._version = 0
+
+    def _file_inode(self):
+        try:
+            return os.stat(self.path).st_ino
+        except FileNotFoundError:
+            return None
+
+    def version(self) -> int:
+        """A number that increases whenever the file's data has changed since the previous call"""
+        with self._lock:
+            inode = self._file_inode()
+            if self._conn is not None and inode != self._inode:
+                # A new file at the path: the old connection still reads the old one
+                self._conn.close()
+                self._conn = None
+            self._inode = inode
+            if self._conn is None:
+                self._conn = sqlite3.connect(_read_only_uri(self.path), uri=True, check_same_thread=False)
+                self._data_version = None
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version != self._data_version:
+                self._data_version = data_version
+                self._version += 1
+            return self._version
+
 # Forms database engine (only created if USE_FORMS_DB is True)
 forms_engine = None
 FormsSessionLocal = None
+forms_db_changes = None
 
 if USE_FORMS_DB:
-    # Construct the full path to the forms database
-    if not os.path.isabs(FORMS_DB_PATH):
-        # Relative path - make it relative to backend directory
-        backend_dir = os.path.dirname(os.path.abspath(__file__))
-        forms_db_path = os.path.join(backend_dir, FORMS_DB_PATH)
-    else:
-        forms_db_path = FORMS_DB_PATH
-    
-    # SQLite connection for forms database
-    forms_db_url = f'sqlite:///{forms_db_path}'
-    forms_engine = create_engine(
-        forms_db_url,
-        connect_args={"check_same_thread": False},
-        echo=False
-    )
+    forms_db_path = resolve_forms_db_path()
+    forms_engine = create_forms_engine(forms_db_path)
     FormsSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=forms_engine)
-    print(f"[INFO] Connected to forms database: {forms_db_path}")
+    forms_db_changes = FormsDbChanges(forms_db_path)
+    print(f"[INFO] Connected to forms database (read-only): {forms_db_path}")
 else:
     print("[INFO] Using dummy form data from CRM database (USE_FORMS_DB=false)")
 
+def warm_forms_pool(engine=None, size: int = FORMS_DB_POOL_SIZE):
+    """Open the pool's connections now rather than on the first requests"""
+    engine = engine or forms_engine
+    connections = [engine.connect() for _ in range(size)]
+    for connection in connections:
+        connection.close()
+
 def get_forms_session():
     """Get a database session for forms database"""
     if not USE_FORMS_DB:
@@ -42,11 +121,3 @@ def get_forms_session():
     if FormsSessionLocal is None:
         raise RuntimeError("Forms database session not initialized.")
     return FormsSessionLocal()
-
-
-
-
-
-
-
-
@@ -1,8 +1,9 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from database import Base, engine
-from config import ALLOW_ORIGINS
-from routers import leads, submissions, newsletter, users, roles, comments, forms, auth, activities, form_submissions, tags, reminders, workflows, call_logs, reports
+from database import Base, engine, SessionLocal
+from config import ALLOW_ORIGINS, USE_FORMS_DB, FORMS_DB_SYNC
+from services.change_tracker import track_changes, ensure_version_rows
+from routers import leads, submissions, newsletter, users, roles, comments, forms, auth, activities, form_submissions, tags, reminders, workflows, call_logs, reports, search, export, dashboard
 
 app = FastAPI(title="SPARS FastAPI Backend")
 
@@ -12,10 +13,65 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
     allow_credentials=True,
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
 
 Base.metadata.create_all(bind=engine)
 
+# Bump table_versions on every write so list endpoints can answer If-None-Match
+track_changes(SessionLocal)
+
+@app.on_event("startup")
+def compile_permissions():
+    """Compile every role's permission JSON into bitmasks once at startup"""
+    from services.permissions import permission_registry
+    db = SessionLocal()
+    try:
+        permission_registry.load(db)
+    finally:
+        db.close()
+
+@app.on_event("startup")
+def seed_table_versions():
+    """Make sure every table has a change counter row before serving requests"""
+    db = SessionLocal()
+    try:
+        ensure_version_rows(db)
+    finally:
+        db.close()
+
+@app.on_event("startup")
+def build_search_index():
+    """Create the full-text search index (and its sync triggers) if missing"""
+    from services.search_index import ensure_search_index
+    ensure_search_index(engine)
+
+@app.on_event("startup")
+def build_report_rollups():
+    """Create the performance report rollups (and their sync triggers) if missing"""
+    from services.report_rollups import ensure_report_rollups
+    ensure_report_rollups(engine)
+
+@app.on_event("startup")
+def open_forms_db():
+    """Open the read-only spars_forms.db connections before the first request needs one"""
+    if USE_FORMS_DB:
+        from database_forms import warm_forms_pool
+        warm_forms_pool()
+
+@app.on_event("startup")
+def sync_forms_db():
+    """Start copying new spars_forms.db rows into submissions in the background"""
+    if USE_FORMS_DB and FORMS_DB_SYNC:
+        from database_forms import get_forms_session, forms_db_changes
+        from services.form_sync import start_background_sync
+        start_background_sync(SessionLocal, get_forms_session, changes=forms_db_changes)
+
+@app.on_event("shutdown")
+def stop_forms_db_sync():
+    from services.form_sync import stop_background_sync
+    stop_background_sync()
+
 app.include_router(auth.router)
 app.include_router(leads.router)
 app.include_router(submissions.router)
@@ -31,6 +87,9 @@ app.include_router(reminders.router)
 app.include_router(workflows.router)
 app.include_router(call_logs.router)
 app.include_router(reports.router)
+app.include_router(search.router)
+app.include_router(export.router)
+app.include_router(dashboard.router)
 
 @app.get("/")
 def root():
@@ -0,0 +1,100 @@
+"""
+Migration script to add the duplicate-detection keys to leads.
+Adds the email_key and company_key columns, fills them from each lead's email
+and company with the same normalization used on every write
+(services/lead_dedup.py), then creates their indexes.
+Idempotent and batched, so it is safe to re-run and to run against a live database.
+Run with: python -m migrations.add_lead_dedup_keys [--batch-size 500]
+"""
+import argparse
+import os
+import sys
+from sqlalchemy import inspect, select, text, update, bindparam
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import engine
+from models.lead import Lead
+from services.lead_dedup import dedup_keys
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+KEY_COLUMNS = ('email_key', 'company_key')
+
+def add_key_columns():
+    columns = {col['name'] for col in inspect(engine).get_columns('leads')}
+    with engine.begin() as conn:
+        for column in KEY_COLUMNS:
+            if column in columns:
+                print(f"[INFO] Column '{column}' already exists in 'leads' table.")
+                continue
+            conn.execute(text(f"ALTER TABLE leads ADD COLUMN {column} VARCHAR(255) NULL"))
+            print(f"[OK] Added '{column}' column to 'leads' table.")
+
+def ensure_key_indexes():
+    """Create the key column indexes if they are missing"""
+    existing = {index['name'] for index in inspect(engine).get_indexes('leads')}
+    for index in sorted(Lead.__table__.indexes, key=lambda i: i.name):
+        if index.name not in {f"ix_leads_{column}" for column in KEY_COLUMNS}:
+            continue
+        if index.name in existing:
+            print(f"[INFO] Index '{index.name}' already exists.")
+            continue
+        index.create(bind=engine)
+        print(f"[OK] Created index '{index.name}'")
+
+def add_lead_dedup_keys(batch_size: int = 500):
+    """Fill the key columns in id-ordered batches, committing after each batch"""
+    print("Starting lead duplicate key migration...")
+    if not inspect(engine).has_table('leads'):
+        print("[ERROR] 'leads' table does not exist. Cannot add duplicate keys.")
+        return
+
+    add_key_columns()
+
+    leads = Lead.__table__
+    rows_after = select(leads.c.id, leads.c.email, leads.c.company, leads.c.email_key, leads.c.company_key).order_by(leads.c.id)
+    statement = update(leads).where(leads.c.id == bindparam('lead_id')).values(
+        email_key=bindparam('new_email_key'),
+        company_key=bindparam('new_company_key'),
+    )
+
+    db = SessionLocal()
+    total = 0
+    last_id = 0
+    try:
+        while True:
+            rows = db.execute(rows_after.where(leads.c.id > last_id).limit(batch_size)).all()
+            if not rows:
+                break
+            params = []
+            for lead_id, email, company, email_key, company_key in rows:
+                keys = dedup_keys(email, company)
+                # Rows already holding the right keys are left alone, so a re-run writes nothing
+                if (keys['email_key'], keys['company_key']) != (email_key, company_key):
+                    params.append({'lead_id': lead_id, 'new_email_key': keys['email_key'], 'new_company_key': keys['company_key']})
+            if params:
+                db.execute(statement, params)
+            db.commit()
+            total += len(params)
+            last_id = rows[-1][0]
+            print(f"[OK] Filled keys for {total} leads (through id {last_id})")
+
+        ensure_key_indexes()
+        if total == 0:
+            print("[INFO] All lead duplicate keys are already up to date.")
+        print(f"[SUCCESS] Lead duplicate key migration completed successfully. {total} leads updated.")
+
+    except Exception as e:
+        print(f"[ERROR] Error during migration: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Add and fill the lead duplicate-detection keys")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    add_lead_dedup_keys(batch_size=args.batch_size)
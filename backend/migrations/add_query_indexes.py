@@ -0,0 +1,99 @@
+"""
+Migration script to create the indexes declared on the models
+Compares every index in the model metadata with what the database has and
+creates the missing ones. Safe to re-run. On MySQL indexes are built online
+(ALGORITHM=INPLACE, LOCK=NONE) so reads and writes continue during the build;
+SQLite builds each index in its own short transaction.
+Run with: python -m migrations.add_query_indexes [--dry-run]
+"""
+import argparse
+import os
+import sys
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateIndex
+
+# Add parent directory to path to import config and models
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Base, engine
+# Import every model so all tables (and their indexes) are in the metadata
+from models import activity_log, call_log, comment, entity_tag, form_field, lead, newsletter, reminder, role, submission, tag, user  # noqa: F401
+
+# Single-column indexes made redundant by a composite index with the same
+# leading column; dropped once the replacement exists so the planner picks it
+SUPERSEDED_INDEXES = {
+    'submissions': {'ix_submissions_form_type': 'ix_submissions_form_type_submitted'},
+}
+
+def missing_indexes(bind=engine):
+    """Declared indexes that don't exist yet, for tables that do exist"""
+    inspector = inspect(bind)
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            if index.name not in existing:
+                missing.append(index)
+    return missing
+
+def create_index(index, bind=engine):
+    ddl = str(CreateIndex(index).compile(dialect=bind.dialect))
+    if bind.dialect.name == 'mysql':
+        ddl += ' ALGORITHM=INPLACE LOCK=NONE'
+    with bind.begin() as conn:
+        conn.exec_driver_sql(ddl)
+
+def superseded_indexes(bind=engine):
+    """(table, index name) pairs whose replacement index already exists"""
+    inspector = inspect(bind)
+    superseded = []
+    for table_name, replacements in SUPERSEDED_INDEXES.items():
+        if not inspector.has_table(table_name):
+            continue
+        existing = {index['name'] for index in inspector.get_indexes(table_name)}
+        for old_name, new_name in replacements.items():
+            if old_name in existing and new_name in existing:
+                superseded.append((table_name, old_name))
+    return superseded
+
+def drop_index(table_name: str, index_name: str, bind=engine):
+    if bind.dialect.name == 'mysql':
+        ddl = f"DROP INDEX {index_name} ON {table_name} ALGORITHM=INPLACE LOCK=NONE"
+    else:
+        ddl = f"DROP INDEX {index_name}"
+    with bind.begin() as conn:
+        conn.exec_driver_sql(ddl)
+
+def run_migration(dry_run: bool = False):
+    print("Starting query index migration...")
+    try:
+        indexes = missing_indexes()
+        for index in indexes:
+            columns = ", ".join(column.name for column in index.columns)
+            if dry_run:
+                print(f"[INFO] Would create {index.name} on {index.table.name} ({columns})")
+                continue
+            create_index(index)
+            print(f"[OK] Created {index.name} on {index.table.name} ({columns})")
+
+        # Replacements were created above, so redundant indexes can go now
+        superseded = superseded_indexes() if not dry_run else []
+        for table_name, index_name in superseded:
+            drop_index(table_name, index_name)
+            print(f"[OK] Dropped {index_name} on {table_name} (superseded)")
+
+        if not indexes and not superseded:
+            print("[INFO] All declared indexes already exist. Skipping migration.")
+        elif not dry_run:
+            print(f"[SUCCESS] Created {len(indexes)} indexes, dropped {len(superseded)}.")
+    except Exception as e:
+        print(f"[ERROR] Error during migration: {e}")
+        raise
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create indexes declared on the models")
+    parser.add_argument("--dry-run", action="store_true", help="List missing indexes without creating them")
+    args = parser.parse_args()
+    run_migration(dry_run=args.dry_run)
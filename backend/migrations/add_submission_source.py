@@ -0,0 +1,50 @@
+"""
+Migration script to let submissions record the spars_forms.db row they were copied from
+Adds submissions.source_table and submissions.source_id with a unique index
+over the pair, and creates the form_sync_state table that holds each forms
+table's high-water mark. Safe to re-run.
+Run with: python -m migrations.add_submission_source
+"""
+import os
+import sys
+from sqlalchemy import inspect, text
+
+# Add parent directory to path to import config and models
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import engine
+from models.form_sync_state import FormSyncState
+
+SOURCE_COLUMNS = {
+    'source_table': 'VARCHAR(64) NULL',
+    'source_id': 'INTEGER NULL',
+}
+SOURCE_INDEX = 'uq_submissions_source'
+
+def run_migration():
+    print("Starting submission source migration...")
+    inspector = inspect(engine)
+    try:
+        columns = {col['name'] for col in inspector.get_columns('submissions')}
+        indexes = {index['name'] for index in inspector.get_indexes('submissions')}
+        indexes.update(constraint['name'] for constraint in inspector.get_unique_constraints('submissions'))
+        with engine.begin() as conn:
+            for name, ddl in SOURCE_COLUMNS.items():
+                if name in columns:
+                    print(f"[INFO] Column '{name}' already exists. Skipping.")
+                    continue
+                conn.execute(text(f"ALTER TABLE submissions ADD COLUMN {name} {ddl}"))
+                print(f"[OK] Added '{name}' column to 'submissions' table.")
+            if SOURCE_INDEX in indexes:
+                print(f"[INFO] Index '{SOURCE_INDEX}' already exists. Skipping.")
+            else:
+                conn.execute(text(f"CREATE UNIQUE INDEX {SOURCE_INDEX} ON submissions (source_table, source_id)"))
+                print(f"[OK] Created unique index '{SOURCE_INDEX}'.")
+        FormSyncState.__table__.create(bind=engine, checkfirst=True)
+        print("[SUCCESS] Submission source migration completed successfully.")
+    except Exception as e:
+        print(f"[ERROR] Error during migration: {e}")
+        raise
+
+if __name__ == "__main__":
+    run_migration()
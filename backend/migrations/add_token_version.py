@@ -0,0 +1,45 @@
+"""
+Migration script to add token_version column to users table
+Run with: python -m migrations.add_token_version
+"""
+import os
+import sys
+from sqlalchemy import text, inspect
+from sqlalchemy.orm import sessionmaker
+
+# Add parent directory to path to import config and models
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import engine
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def run_migration():
+    print("Starting token_version column migration...")
+    db = SessionLocal()
+    inspector = inspect(engine)
+    
+    try:
+        if not inspector.has_table('users'):
+            print("[ERROR] 'users' table does not exist. Cannot add token_version.")
+            return
+        
+        columns = [col['name'] for col in inspector.get_columns('users')]
+        if 'token_version' in columns:
+            print("[INFO] Column 'token_version' already exists. Skipping migration.")
+            return
+        
+        db.execute(text("ALTER TABLE users ADD COLUMN token_version INTEGER NOT NULL DEFAULT 0"))
+        db.commit()
+        print("[OK] Added 'token_version' column to 'users' table.")
+        print("[SUCCESS] Token version migration completed successfully.")
+        
+    except Exception as e:
+        print(f"[ERROR] Error during migration: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,37 @@
+"""
+Migration script to build the performance report rollups
+Creates the rollup tables and the triggers on leads and call_logs that keep
+them current, filling the tables from scratch if any trigger was missing.
+--rebuild recomputes every rollup row, e.g. after editing leads or call logs
+with triggers disabled.
+Run with: python -m migrations.build_report_rollups [--rebuild]
+"""
+import argparse
+import os
+import sys
+
+# Add parent directory to path to import config and models
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import engine
+from services.report_rollups import ensure_report_rollups, rebuild_report_rollups
+
+def run_migration(rebuild: bool = False):
+    print("Starting report rollup migration...")
+    try:
+        if rebuild:
+            rebuild_report_rollups(engine)
+            print("[SUCCESS] Report rollups rebuilt.")
+        elif ensure_report_rollups(engine):
+            print("[SUCCESS] Report rollups created.")
+        else:
+            print("[INFO] Report rollups already exist. Skipping migration.")
+    except Exception as e:
+        print(f"[ERROR] Error during migration: {e}")
+        raise
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create the performance report rollups")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute every rollup row")
+    args = parser.parse_args()
+    run_migration(rebuild=args.rebuild)
@@ -0,0 +1,36 @@
+"""
+Migration script to build the full-text search index
+Creates the SQLite FTS5 table and its sync triggers (or the MySQL FULLTEXT
+indexes) if they are missing. --rebuild re-indexes every lead, comment and
+call log from scratch, e.g. after editing the tables with triggers disabled.
+Run with: python -m migrations.build_search_index [--rebuild]
+"""
+import argparse
+import os
+import sys
+
+# Add parent directory to path to import config and models
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import engine
+from services.search_index import ensure_search_index, rebuild_search_index
+
+def run_migration(rebuild: bool = False):
+    print("Starting search index migration...")
+    try:
+        if rebuild:
+            rebuild_search_index(engine)
+            print("[SUCCESS] Search index rebuilt.")
+        elif ensure_search_index(engine):
+            print("[SUCCESS] Search index created.")
+        else:
+            print("[INFO] Search index already exists. Skipping migration.")
+    except Exception as e:
+        print(f"[ERROR] Error during migration: {e}")
+        raise
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create the full-text search index")
+    parser.add_argument("--rebuild", action="store_true", help="Re-index every document")
+    args = parser.parse_args()
+    run_migration(rebuild=args.rebuild)
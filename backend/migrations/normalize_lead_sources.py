@@ -1,68 +1,79 @@
 """
 Migration script to normalize lead sources in the database.
-This ensures all form-based leads have source='Website' and source_type=form name.
+Form-based leads get source_type='Website' and source=<form name>, the same rule
+applied whenever a lead is written (services/lead_sources.py). Also creates the
+(source_type, source) index used by GET /leads/stats/sources.
+Idempotent and batched, so it is safe to re-run and to run against a live database.
+Run with: python -m migrations.normalize_lead_sources [--batch-size 500]
 """
+import argparse
 import os
 import sys
-from sqlalchemy import create_engine, text
+from sqlalchemy import inspect, select, update, bindparam
 from sqlalchemy.orm import sessionmaker
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database import Base, engine
-from config import MYSQL_URL
+from database import engine
+from models.lead import Lead
+from services.lead_sources import normalize_source, needs_normalization
+from services.change_tracker import track_changes
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Bump the leads change counter so cached lead lists are revalidated
+track_changes(SessionLocal)
 
-def normalize_lead_sources():
-    """Normalize lead sources: set source='Website' for form-based leads"""
+SOURCE_INDEX_NAME = 'ix_leads_source_type_source'
+
+def ensure_source_index():
+    """Create the (source_type, source) index if it is missing"""
+    inspector = inspect(engine)
+    if SOURCE_INDEX_NAME in {index['name'] for index in inspector.get_indexes('leads')}:
+        print(f"[INFO] Index '{SOURCE_INDEX_NAME}' already exists.")
+        return
+    index = next(i for i in Lead.__table__.indexes if i.name == SOURCE_INDEX_NAME)
+    index.create(bind=engine)
+    print(f"[OK] Created index '{SOURCE_INDEX_NAME}'")
+
+def normalize_lead_sources(batch_size: int = 500):
+    """Normalize lead sources in id-ordered batches, committing after each batch"""
     print("Starting lead source normalization migration...")
-    db = SessionLocal()
+    if not inspect(engine).has_table('leads'):
+        print("[ERROR] 'leads' table does not exist. Nothing to normalize.")
+        return
+    
+    ensure_source_index()
+    
+    leads = Lead.__table__
+    pending = select(leads.c.id, leads.c.source_type, leads.c.source).where(
+        needs_normalization(leads.c.source_type, leads.c.source)
+    ).order_by(leads.c.id)
+    statement = update(leads).where(leads.c.id == bindparam('lead_id')).values(
+        source_type=bindparam('new_source_type'),
+        source=bindparam('new_source'),
+    )
     
+    db = SessionLocal()
+    total = 0
+    last_id = 0
     try:
-        # Form source names that should be normalized
-        form_source_names = [
-            'Brochure Download',
-            'Product Profile Download',
-            'Talk to Sales',
-            'General Inquiry',
-            'Request a Demo'
-        ]
-        
-        # Update leads where source_type is a form name but source is not 'Website'
-        for form_name in form_source_names:
-            result = db.execute(
-                text("""
-                    UPDATE leads 
-                    SET source = 'Website' 
-                    WHERE source_type = :form_name AND source != 'Website'
-                """),
-                {"form_name": form_name}
-            )
-            count = result.rowcount
-            if count > 0:
-                print(f"[OK] Updated {count} leads with source_type='{form_name}' to source='Website'")
-        
-        # Update leads where source is a form name (old data structure)
-        for form_name in form_source_names:
-            result = db.execute(
-                text("""
-                    UPDATE leads 
-                    SET source = 'Website',
-                        source_type = CASE 
-                            WHEN source_type IS NULL OR source_type = '' THEN :form_name
-                            ELSE source_type
-                        END
-                    WHERE source = :form_name AND source != 'Website'
-                """),
-                {"form_name": form_name}
-            )
-            count = result.rowcount
-            if count > 0:
-                print(f"[OK] Updated {count} leads with source='{form_name}' to source='Website'")
+        while True:
+            rows = db.execute(pending.where(leads.c.id > last_id).limit(batch_size)).all()
+            if not rows:
+                break
+            params = []
+            for lead_id, source_type, source in rows:
+                new_source_type, new_source = normalize_source(source_type, source)
+                params.append({'lead_id': lead_id, 'new_source_type': new_source_type, 'new_source': new_source})
+            db.execute(statement, params)
+            db.commit()
+            total += len(params)
+            last_id = rows[-1][0]
+            print(f"[OK] Normalized {total} leads (through id {last_id})")
         
-        db.commit()
-        print("[SUCCESS] Lead source normalization completed successfully.")
+        if total == 0:
+            print("[INFO] All lead sources are already normalized.")
+        print(f"[SUCCESS] Lead source normalization completed successfully. {total} leads updated.")
         
     except Exception as e:
         print(f"[ERROR] Error during migration: {e}")
@@ -72,6 +83,7 @@ def normalize_lead_sources():
         db.close()
 
 if __name__ == "__main__":
-    normalize_lead_sources()
-
-
+    parser = argparse.ArgumentParser(description="Normalize stored lead sources")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    normalize_lead_sources(batch_size=args.batch_size)
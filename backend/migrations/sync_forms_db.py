@@ -0,0 +1,38 @@
+"""
+Job script to copy new spars_forms.db rows into the submissions table
+Does one sync pass, the same as the API's background sync or
+POST /form-submissions/sync: every forms table's rows above its high-water
+mark, in batches of --batch-size rows per transaction. Needs USE_FORMS_DB=true.
+Run with: python -m migrations.sync_forms_db [--batch-size 500]
+"""
+import argparse
+import os
+import sys
+
+# Add parent directory to path to import config and models
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import FORMS_SYNC_BATCH_SIZE
+from database import SessionLocal
+from database_forms import get_forms_session
+from services.change_tracker import track_changes
+from services.form_sync import sync_forms_db
+
+def run_job(batch_size: int):
+    print("Syncing the forms database into submissions...")
+    # Copies bump the submissions change counter, like writes made by the API
+    track_changes(SessionLocal)
+    try:
+        copied = sync_forms_db(SessionLocal, get_forms_session, batch_size)
+        for table, count in copied.items():
+            print(f"[OK] {table}: {count} new rows")
+        print(f"[SUCCESS] Copied {sum(copied.values())} submissions.")
+    except Exception as e:
+        print(f"[ERROR] Error syncing the forms database: {e}")
+        raise
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Copy new spars_forms.db rows into submissions")
+    parser.add_argument("--batch-size", type=int, default=FORMS_SYNC_BATCH_SIZE, help="Rows copied per transaction")
+    args = parser.parse_args()
+    run_job(args.batch_size)
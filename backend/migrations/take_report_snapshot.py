@@ -0,0 +1,42 @@
+"""
+Job script to store the daily performance report snapshot
+Records every executive's and every manager's team metrics for the day, which
+GET /reports/trends reads back. Run it once a day (e.g. from cron, shortly
+before midnight); re-running it replaces that day's snapshot.
+Run with: python -m migrations.take_report_snapshot [--date YYYY-MM-DD]
+"""
+import argparse
+import os
+import sys
+from datetime import date
+
+# Add parent directory to path to import config and models
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import SessionLocal, engine
+from models.report_snapshot import ReportSnapshot
+from services.report_rollups import ensure_report_rollups
+from services.report_snapshots import take_snapshot
+
+def run_job(day: date):
+    print(f"Taking performance report snapshot for {day.isoformat()}...")
+    ReportSnapshot.__table__.create(bind=engine, checkfirst=True)
+    # The snapshot is read from the rollups
+    ensure_report_rollups(engine)
+    db = SessionLocal()
+    try:
+        rows = take_snapshot(db, day)
+        db.commit()
+        print(f"[SUCCESS] Stored {rows} snapshot rows.")
+    except Exception as e:
+        db.rollback()
+        print(f"[ERROR] Error taking snapshot: {e}")
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Store the daily performance report snapshot")
+    parser.add_argument("--date", type=date.fromisoformat, default=date.today(), help="Snapshot date (default: today)")
+    args = parser.parse_args()
+    run_job(args.date)
@@ -0,0 +1,131 @@
+"""
+Verify that the routers' main queries are served by indexes
+Builds each hot list query the way its router does, captures the database's
+plan (EXPLAIN QUERY PLAN on SQLite, EXPLAIN on MySQL) and fails if any of them
+falls back to a full table scan. Parameter values are representative only;
+the planner doesn't depend on them.
+Run with: python -m migrations.verify_query_plans [--verbose]
+"""
+import argparse
+import os
+import re
+import sys
+from datetime import datetime
+from sqlalchemy import desc, exists, func
+
+# Add parent directory to path to import config and models
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import engine
+from models.activity_log import ActivityLog
+from models.call_log import CallLog
+from models.comment import Comment
+from models.lead import Lead
+from models.reminder import Reminder
+from models.submission import Submission
+from models.user import User
+from services.lead_queries import encode_cursor, filter_leads, page_query
+from services.lead_serializer import LEAD_LIST_COLUMNS
+from sqlalchemy.orm import Session
+
+NOW = datetime(2024, 1, 1)
+
+# (name, builder(session) -> ORM query) for each router's main query
+QUERY_CHECKS = [
+    ("leads: admin first page", lambda db: page_query(db.query(*LEAD_LIST_COLUMNS), limit=50)),
+    ("leads: admin next page", lambda db: page_query(
+        db.query(*LEAD_LIST_COLUMNS), cursor=encode_cursor("created_at", "desc", "2024-01-01 00:00:00", 100), limit=50)),
+    ("leads: manager team", lambda db: db.query(*LEAD_LIST_COLUMNS).filter(Lead.assigned_to.in_([2, 3, 4]))),
+    ("leads: executive own", lambda db: db.query(*LEAD_LIST_COLUMNS).filter(
+        (Lead.assigned_to == 3) | (Lead.assigned == "Executive"))),
+    ("leads: status filter", lambda db: filter_leads(db.query(*LEAD_LIST_COLUMNS), status=["New"])),
+    ("leads: email lookup", lambda db: db.query(Lead.id).filter(Lead.email == "lead@example.com")),
+    ("leads: existing for email key", lambda db: db.query(Lead.email_key, Lead.id).filter(
+        Lead.email_key.in_(["lead@example.com"])).order_by(Lead.id)),
+    ("leads: duplicate email clusters", lambda db: db.query(Lead.email_key, func.count(Lead.id)).filter(
+        Lead.email_key.isnot(None)).group_by(Lead.email_key).having(func.count(Lead.id) > 1)),
+    ("reports: lead status by assignee", lambda db: db.query(Lead.assigned_to, Lead.status, func.count(Lead.id)).filter(
+        Lead.assigned_to.in_([2, 3, 4])).group_by(Lead.assigned_to, Lead.status)),
+    ("reminders: list for user", lambda db: db.query(Reminder).filter(
+        Reminder.user_id == 3, Reminder.completed == False,
+        (Reminder.lead_id == None) | exists().where(Lead.id == Reminder.lead_id)
+    ).order_by(Reminder.due_date.asc())),
+    ("reminders: my upcoming", lambda db: db.query(Reminder).filter(
+        Reminder.user_id == 3, Reminder.due_date >= NOW, Reminder.completed == False
+    ).order_by(Reminder.due_date.asc())),
+    ("call_logs: list for user", lambda db: db.query(CallLog).filter(
+        CallLog.user_id == 3, exists().where(Lead.id == CallLog.lead_id)
+    ).order_by(CallLog.meeting_date.desc(), CallLog.created_at.desc())),
+    ("call_logs: totals by user and stage", lambda db: db.query(CallLog.user_id, CallLog.stage, func.count(CallLog.id)).filter(
+        CallLog.user_id.in_([2, 3, 4])).group_by(CallLog.user_id, CallLog.stage)),
+    ("call_logs: for lead", lambda db: db.query(CallLog).filter(CallLog.lead_id == 1)),
+    ("activities: lead timeline", lambda db: db.query(ActivityLog).filter(
+        ActivityLog.entity_type == 'lead', ActivityLog.entity_id == 1
+    ).order_by(desc(ActivityLog.created_at))),
+    ("activities: user feed", lambda db: db.query(ActivityLog).filter(
+        ActivityLog.user_id == 3
+    ).order_by(desc(ActivityLog.created_at)).limit(10)),
+    ("comments: for lead", lambda db: db.query(Comment).filter(Comment.lead_id == 1)),
+    ("submissions: by form type", lambda db: db.query(Submission).filter(
+        Submission.form_type.in_(['talk', 'talk_to_sales'])
+    ).order_by(Submission.submitted.desc())),
+    ("submissions: for lead", lambda db: db.query(Submission).filter(Submission.lead_id == 1)),
+    ("users: team of manager", lambda db: db.query(User).filter(User.manager_id == 2)),
+]
+
+# "SCAN leads" / "SCAN TABLE leads" without "USING ... INDEX" is a full table scan
+_SQLITE_FULL_SCAN = re.compile(r"^SCAN (TABLE )?(?P<table>\w+)$")
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+def explain(db: Session, query):
+    """Return (plan lines, full-scanned tables) for an ORM query"""
+    bind = db.get_bind()
+    compiled = query.statement.compile(dialect=bind.dialect, compile_kwargs={"render_postcompile": True})
+    params = tuple(_plain(compiled.params[name]) for name in (compiled.positiontup or []))
+    with bind.connect() as conn:
+        if bind.dialect.name == 'sqlite':
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).all()
+            plan = [row[-1] for row in rows]
+            scans = [m.group("table") for m in map(_SQLITE_FULL_SCAN.match, plan) if m]
+        else:
+            result = conn.exec_driver_sql(f"EXPLAIN {compiled}", params)
+            keys = list(result.keys())
+            rows = [dict(zip(keys, row)) for row in result]
+            plan = [f"{row.get('table')}: type={row.get('type')} key={row.get('key')}" for row in rows]
+            scans = [row.get('table') for row in rows if row.get('type') == 'ALL']
+    return plan, scans
+
+def verify(db: Session, verbose: bool = False):
+    """Explain every check; return the names of the queries that full-scan"""
+    failures = []
+    for name, build in QUERY_CHECKS:
+        plan, scans = explain(db, build(db))
+        if scans:
+            failures.append(name)
+            print(f"[ERROR] {name}: full scan of {', '.join(scans)}")
+        else:
+            print(f"[OK] {name}")
+        if verbose or scans:
+            for line in plan:
+                print(f"        {line}")
+    return failures
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that hot queries use indexes")
+    parser.add_argument("--verbose", action="store_true", help="Print every query plan")
+    args = parser.parse_args()
+    session = Session(bind=engine)
+    try:
+        failed = verify(session, verbose=args.verbose)
+    finally:
+        session.close()
+    if failed:
+        print(f"[ERROR] {len(failed)} queries fall back to a full table scan. Run: python -m migrations.add_query_indexes")
+        sys.exit(1)
+    print("[SUCCESS] All checked queries use an index.")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.sql import func
 from database import Base
 
@@ -12,4 +12,10 @@ class ActivityLog(Base):
     user_id = Column(Integer, ForeignKey('users.id'))
     meta_data = Column(JSON, nullable=True)  # Additional context (renamed from 'metadata' to avoid SQLAlchemy conflict)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Entity timelines and per-user feeds, both newest first
+    __table_args__ = (
+        Index('ix_activity_logs_entity_created', 'entity_type', 'entity_id', 'created_at'),
+        Index('ix_activity_logs_user_created', 'user_id', 'created_at'),
+    )
 
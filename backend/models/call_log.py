@@ -1,7 +1,7 @@
 """
 CallLog model for tracking sales calls and meetings
 """
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Text, Float, Date
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Text, Float, Date, Index
 from sqlalchemy.sql import func
 from database import Base
 
@@ -9,7 +9,7 @@ class CallLog(Base):
     __tablename__ = 'call_logs'
     
     id = Column(Integer, primary_key=True, index=True)
-    lead_id = Column(Integer, ForeignKey('leads.id'), nullable=False)
+    lead_id = Column(Integer, ForeignKey('leads.id'), nullable=False, index=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
     stage = Column(String(10), nullable=True)  # A-H pipeline stages
     activity_type = Column(String(100), nullable=True)  # e.g., "Face to Face (In Person)", "Phone Call", etc.
@@ -25,8 +25,8 @@ class CallLog(Base):
     is_cancelled = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
-
-
-
-
-
+    
+    # Per-user call lists are ordered by meeting date
+    __table_args__ = (
+        Index('ix_call_logs_user_meeting_date', 'user_id', 'meeting_date'),
+    )
@@ -5,7 +5,7 @@ from database import Base
 class Comment(Base):
     __tablename__ = 'comments'
     id = Column(Integer, primary_key=True, index=True)
-    lead_id = Column(Integer, ForeignKey('leads.id'))
+    lead_id = Column(Integer, ForeignKey('leads.id'), index=True)
     text = Column(String(1000))
     status = Column(String(50), nullable=True)
     created_by = Column(Integer, ForeignKey('users.id'), nullable=True)
@@ -0,0 +1,12 @@
+"""
+High-water marks for copying spars_forms.db tables into submissions
+"""
+from sqlalchemy import Column, Integer, String, DateTime
+from database import Base
+
+class FormSyncState(Base):
+    __tablename__ = 'form_sync_state'
+    
+    source_table = Column(String(64), primary_key=True)
+    last_id = Column(Integer, nullable=False, default=0, server_default='0')  # Highest source id copied so far
+    synced_at = Column(DateTime(timezone=True), nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Date
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Date, Index
 from sqlalchemy.sql import func
 from database import Base
 
@@ -6,20 +6,30 @@ class Lead(Base):
     __tablename__ = 'leads'
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255))
-    email = Column(String(255))
+    email = Column(String(255), index=True)
     phone = Column(String(255), nullable=True)
     company = Column(String(255))
     source_type = Column(String(255), nullable=True)  # Website, Trade Show, Referral, etc.
     source = Column(String(255), nullable=True)  # Free-text: "Talk To Sales", "Request a Demo | XYZ Trade Show"
     designation = Column(String(255), nullable=True)
-    status = Column(String(50), default='New')
+    status = Column(String(50), default='New', index=True)
     stage = Column(String(10), nullable=True)  # A-H pipeline stages
-    assigned = Column(String(255), default='Unassigned')  # Keep for backward compatibility during migration
-    assigned_to = Column(Integer, ForeignKey('users.id'), nullable=True)  # New FK relationship
+    assigned = Column(String(255), default='Unassigned', index=True)  # Keep for backward compatibility during migration
+    assigned_to = Column(Integer, ForeignKey('users.id'), nullable=True, index=True)  # New FK relationship
     created_by = Column(Integer, ForeignKey('users.id'), nullable=True)
     follow_up_required = Column(Boolean, default=False)
     follow_up_date = Column(Date, nullable=True)
     follow_up_time = Column(String(10), nullable=True)  # HH:MM format
     follow_up_status = Column(String(20), nullable=True, default='Pending')  # Pending, Completed, Cancelled
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Normalized email/company for duplicate detection (services/lead_dedup.py keeps them current)
+    email_key = Column(String(255), nullable=True, index=True)
+    company_key = Column(String(255), nullable=True, index=True)
+    
+    # Source breakdown (GROUP BY source_type, source) is served from this index,
+    # per-assignee status counts (performance reports) from the second
+    __table_args__ = (
+        Index('ix_leads_source_type_source', 'source_type', 'source'),
+        Index('ix_leads_assigned_to_status', 'assigned_to', 'status'),
+    )
@@ -1,7 +1,7 @@
 """
 Reminder model for follow-up reminders on leads
 """
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Index
 from sqlalchemy.sql import func
 from database import Base
 
@@ -18,4 +18,9 @@ class Reminder(Base):
     completed = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     completed_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # "My reminders" lists filter on user and completion and order by due date
+    __table_args__ = (
+        Index('ix_reminders_user_completed_due', 'user_id', 'completed', 'due_date'),
+    )
 
@@ -0,0 +1,24 @@
+"""
+Report rollups: per-user lead and call-log totals for the performance reports
+Maintained by database triggers (services/report_rollups.py); never written by
+the application. A NULL status or stage is stored as '' so it can be part of
+the primary key.
+"""
+from sqlalchemy import Column, Float, Integer, String
+from database import Base
+
+class LeadStatusRollup(Base):
+    __tablename__ = 'lead_status_rollups'
+
+    user_id = Column(Integer, primary_key=True)  # leads.assigned_to
+    status = Column(String(50), primary_key=True)
+    lead_count = Column(Integer, nullable=False, default=0, server_default='0')
+
+class CallStageRollup(Base):
+    __tablename__ = 'call_stage_rollups'
+
+    user_id = Column(Integer, primary_key=True)  # call_logs.user_id
+    stage = Column(String(10), primary_key=True)
+    call_count = Column(Integer, nullable=False, default=0, server_default='0')
+    secured_orders = Column(Integer, nullable=False, default=0, server_default='0')
+    dollar_value = Column(Float, nullable=False, default=0, server_default='0')
@@ -0,0 +1,22 @@
+"""
+Daily performance report snapshots: one row per executive and per manager's
+team per day, with the metrics /reports/team-performance computes as they
+stood that day
+"""
+from sqlalchemy import Column, Date, Float, Integer, JSON, String
+from database import Base
+
+class ReportSnapshot(Base):
+    __tablename__ = 'report_snapshots'
+
+    snapshot_date = Column(Date, primary_key=True)
+    scope = Column(String(10), primary_key=True)  # 'executive' or 'team' (a manager's whole team)
+    user_id = Column(Integer, primary_key=True)  # the executive, or the manager for 'team' rows
+    manager_id = Column(Integer, nullable=True)  # an executive's manager on that day
+    total_leads = Column(Integer, nullable=False, default=0)
+    closed_won = Column(Integer, nullable=False, default=0)
+    total_calls = Column(Integer, nullable=False, default=0)
+    secured_orders = Column(Integer, nullable=False, default=0)
+    total_dollar_value = Column(Float, nullable=False, default=0)
+    status_counts = Column(JSON, nullable=True)
+    stage_distribution = Column(JSON, nullable=True)
@@ -1,15 +1,25 @@
-from sqlalchemy import Column, Integer, String, DateTime, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, JSON, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.sql import func
 from database import Base
 
 class Submission(Base):
     __tablename__ = 'submissions'
     id = Column(Integer, primary_key=True, index=True)
-    form_type = Column(String(255), index=True)
+    form_type = Column(String(255))
     name = Column(String(255))
     email = Column(String(255))
     company = Column(String(255))
     submitted = Column(DateTime(timezone=True), server_default=func.now())
     status = Column(String(50), default='New')  # New | Converted | Archived
-    lead_id = Column(Integer, ForeignKey('leads.id'), nullable=True)
+    lead_id = Column(Integer, ForeignKey('leads.id'), nullable=True, index=True)
     data = Column(JSON)  # dynamic form payload
+    # Where a submission copied from spars_forms.db came from (NULL for our own)
+    source_table = Column(String(64), nullable=True)
+    source_id = Column(Integer, nullable=True)
+    
+    # Per-form submission lists are ordered by submission time (also serves form_type lookups)
+    __table_args__ = (
+        Index('ix_submissions_form_type_submitted', 'form_type', 'submitted'),
+        # A forms-database row is copied at most once
+        UniqueConstraint('source_table', 'source_id', name='uq_submissions_source'),
+    )
@@ -0,0 +1,11 @@
+"""
+Per-table change counter used to validate conditional GETs
+"""
+from sqlalchemy import Column, Integer, String
+from database import Base
+
+class TableVersion(Base):
+    __tablename__ = 'table_versions'
+    
+    table_name = Column(String(64), primary_key=True)
+    version = Column(Integer, nullable=False, default=0, server_default='0')
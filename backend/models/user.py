@@ -8,4 +8,5 @@ class User(Base):
     email = Column(String(255), unique=True)
     hashed_password = Column(String(255))
     role_id = Column(Integer, ForeignKey('roles.id'))
-    manager_id = Column(Integer, ForeignKey('users.id'), nullable=True)  # Self-referential for hierarchy
\ No newline at end of file
+    manager_id = Column(Integer, ForeignKey('users.id'), nullable=True, index=True)  # Self-referential for hierarchy
+    token_version = Column(Integer, default=0, server_default='0', nullable=False)  # Bumped to revoke issued JWTs
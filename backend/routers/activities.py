@@ -6,6 +6,8 @@ from models.activity_log import ActivityLog
 from models.user import User
 from schemas.activity_log import ActivityLogOut
 from routers.auth import get_current_active_user
+from services.principal_cache import Principal
+from services.permissions import has
 
 router = APIRouter(prefix="/activities", tags=["Activities"])
 
@@ -23,7 +25,7 @@ def list_activities(
     entity_type: str | None = Query(None, description="Filter by entity type"),
     action_type: str | None = Query(None, description="Filter by action type"),
     db: Session = Depends(db_session),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """List activities with pagination and filtering. Users see only their own activities unless Admin/Sales Manager."""
     from models.role import Role
@@ -31,8 +33,8 @@ def list_activities(
     query = db.query(ActivityLog)
     
     # Check if user is Admin or Sales Manager (they can see all activities)
-    role = db.query(Role).filter(Role.id == current_user.role_id).first()
-    if not role or (role.role_name not in ["Admin", "Sales Manager"] and not role.permissions.get("all")):
+    role = current_user.role
+    if not role or (role.role_name not in ["Admin", "Sales Manager"] and not has(current_user, "all")):
         # Regular users (Sales Executive, Marketing, etc.) only see their own activities
         query = query.filter(ActivityLog.user_id == current_user.id)
     
@@ -49,7 +51,7 @@ def list_activities(
 def get_lead_activities(
     lead_id: int,
     db: Session = Depends(db_session),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Get all activities for a specific lead. Users see only their own activities unless Admin/Sales Manager."""
     from models.role import Role
@@ -60,8 +62,8 @@ def get_lead_activities(
     )
     
     # Check if user is Admin or Sales Manager (they can see all activities)
-    role = db.query(Role).filter(Role.id == current_user.role_id).first()
-    if not role or (role.role_name not in ["Admin", "Sales Manager"] and not role.permissions.get("all")):
+    role = current_user.role
+    if not role or (role.role_name not in ["Admin", "Sales Manager"] and not has(current_user, "all")):
         # Regular users (Sales Executive, Marketing, etc.) only see their own activities
         query = query.filter(ActivityLog.user_id == current_user.id)
     
@@ -73,7 +75,7 @@ def get_lead_activities(
 def get_user_activities(
     user_id: int,
     db: Session = Depends(db_session),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Get all activities performed by a specific user"""
     activities = db.query(ActivityLog).filter(
@@ -86,7 +88,7 @@ def get_user_activities(
 def get_recent_activities(
     limit: int = Query(10, ge=1, le=50),
     db: Session = Depends(db_session),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Get recent activities. Users see only their own activities unless Admin/Sales Manager."""
     from models.role import Role
@@ -94,8 +96,8 @@ def get_recent_activities(
     query = db.query(ActivityLog)
     
     # Check if user is Admin or Sales Manager (they can see all activities)
-    role = db.query(Role).filter(Role.id == current_user.role_id).first()
-    if not role or (role.role_name not in ["Admin", "Sales Manager"] and not role.permissions.get("all")):
+    role = current_user.role
+    if not role or (role.role_name not in ["Admin", "Sales Manager"] and not has(current_user, "all")):
         # Regular users (Sales Executive, Marketing, etc.) only see their own activities
         query = query.filter(ActivityLog.user_id == current_user.id)
     
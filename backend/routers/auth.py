@@ -1,15 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
-from passlib.hash import bcrypt
 from database import SessionLocal
 from models.user import User
 from models.role import Role
 from schemas.user import UserOut, PasswordChange
-from config import SECRET_KEY, ALGORITHM
+from config import SECRET_KEY, ALGORITHM, AUTH_MODE
 from services.activity_logger import log_login
+from services.principal_cache import Principal, principal_cache
+from services.token_registry import token_registry
+from services.permissions import has
+from services.passwords import hash_password, verify_password as _verify_password, verify_password_async, hash_password_async
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -23,10 +27,10 @@ def db_session():
         db.close()
 
 def verify_password(plain_password, hashed_password):
-    return bcrypt.verify(plain_password, hashed_password)
+    return _verify_password(plain_password, hashed_password)
 
 def get_password_hash(password):
-    return bcrypt.hash(password)
+    return hash_password(password)
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
@@ -38,6 +42,23 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def build_token_claims(user: User, role: Role | None) -> dict:
+    """
+    Claims embedded in access tokens. In AUTH_MODE=stateless these are trusted
+    as-is, so they carry everything a Principal needs plus the token version.
+    """
+    return {
+        "sub": user.email,
+        "user_id": user.id,
+        "name": user.name,
+        "manager_id": user.manager_id,
+        "role_id": user.role_id,
+        "role_name": role.role_name if role else None,
+        "hierarchy_level": role.hierarchy_level if role else None,
+        "permissions": role.permissions if role else {},
+        "tv": user.token_version or 0
+    }
+
 def get_user_by_email(db: Session, email: str):
     return db.query(User).filter(User.email == email).first()
 
@@ -49,38 +70,42 @@ def authenticate_user(db: Session, email: str, password: str):
         return False
     return user
 
-@router.post("/login")
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(db_session)):
-    user = authenticate_user(db, form_data.username, form_data.password)
+def _load_user_and_role(db: Session, email: str):
+    user = get_user_by_email(db, email)
     if not user:
+        return None, None
+    role = db.query(Role).filter(Role.id == user.role_id).first() if user.role_id else None
+    return user, role
+
+def _record_login(db: Session, user_id: int):
+    # Log successful login (wrap in try-except to prevent login failure if logging fails)
+    try:
+        log_login(db, user_id, success=True)
+    except Exception as e:
+        # Log error but don't fail login
+        print(f"Warning: Failed to log login activity: {e}")
+
+@router.post("/login")
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(db_session)):
+    # Database work runs in the threadpool and bcrypt on the hashing pool,
+    # so a burst of logins never blocks the event loop
+    user, role = await run_in_threadpool(_load_user_and_role, db, form_data.username)
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Get user role and permissions
-    role = db.query(Role).filter(Role.id == user.role_id).first()
     permissions = role.permissions if role else {}
     
     access_token_expires = timedelta(hours=24)
     access_token = create_access_token(
-        data={
-            "sub": user.email,
-            "user_id": user.id,
-            "role_id": user.role_id,
-            "role_name": role.role_name if role else None,
-            "permissions": permissions
-        },
+        data=build_token_claims(user, role),
         expires_delta=access_token_expires
     )
     
-    # Log successful login (wrap in try-except to prevent login failure if logging fails)
-    try:
-        log_login(db, user.id, success=True)
-    except Exception as e:
-        # Log error but don't fail login
-        print(f"Warning: Failed to log login activity: {e}")
+    await run_in_threadpool(_record_login, db, user.id)
     
     return {
         "access_token": access_token,
@@ -96,6 +121,12 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
     }
 
 async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(db_session)):
+    """
+    Resolve the bearer token to a Principal (user + role snapshot).
+    Warm requests are served from the principal cache without touching the database.
+    With AUTH_MODE=stateless the signed claims are trusted and only the in-memory
+    token version is checked.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -109,12 +140,39 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     except JWTError:
         raise credentials_exception
     
-    user = get_user_by_email(db, email)
-    if user is None:
+    user_id = payload.get("user_id")
+    if AUTH_MODE == "stateless":
+        principal = Principal.from_claims(payload)
+        if principal is not None:
+            is_current = token_registry.check_cached(principal.id, principal.email, payload["tv"])
+            if is_current is None:
+                is_current = await run_in_threadpool(
+                    token_registry.is_current, principal.id, principal.email, payload["tv"], db
+                )
+            if not is_current:
+                raise credentials_exception
+            return principal
+    
+    principal = principal_cache.get(user_id, token)
+    if principal is not None:
+        return principal
+    
+    # Cache miss: resolve from the database off the event loop
+    principal = await run_in_threadpool(_resolve_principal, db, email, payload.get("tv"))
+    if principal is None:
         raise credentials_exception
-    return user
+    principal_cache.put(user_id, token, principal)
+    return principal
 
-async def get_current_active_user(current_user: User = Depends(get_current_user)):
+def _resolve_principal(db: Session, email: str, token_version: int | None):
+    user, role = _load_user_and_role(db, email)
+    if user is None:
+        return None
+    if token_version is not None and token_version != (user.token_version or 0):
+        return None
+    return Principal(user, role)
+
+async def get_current_active_user(current_user: Principal = Depends(get_current_user)):
     return current_user
 
 # Optional authentication - doesn't fail if no token
@@ -127,19 +185,17 @@ async def get_optional_user(
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
         if email:
-            return get_user_by_email(db, email)
+            return await run_in_threadpool(get_user_by_email, db, email)
     except:
         pass
     return None
 
-def can_manage_role(current_user: User, target_role, db: Session):
+def can_manage_role(current_user: Principal, target_role, db: Session = None):
     """
     Check if current user can manage/create users with the target role based on hierarchy
     Returns True if user can manage the role, False otherwise
     """
-    from models.role import Role
-    
-    current_user_role = db.query(Role).filter(Role.id == current_user.role_id).first()
+    current_user_role = current_user.role
     if not current_user_role:
         return False
     
@@ -161,47 +217,20 @@ def check_permission(required_permission: str, write_access: bool = False):
         - Depends(check_permission("leads")) for read access (allows view-only)
         - Depends(check_permission("leads", write_access=True)) for write access (requires explicit permission)
     """
-    async def permission_checker(
-        current_user: User = Depends(get_current_user),
-        db: Session = Depends(db_session)
-    ):
-        role = db.query(Role).filter(Role.id == current_user.role_id).first()
-        if not role:
+    async def permission_checker(current_user: Principal = Depends(get_current_user)):
+        if not current_user.role:
             raise HTTPException(status_code=403, detail="No role assigned")
         
-        permissions = role.permissions or {}
-        
-        # Admin has all permissions
-        if permissions.get("all") == True:
+        # Compiled masks already fold in "all", the "view" read fallback and the
+        # lead sub-permissions (see services/permissions.py)
+        if has(current_user, required_permission, write=write_access):
             return current_user
         
-        # For write operations, require explicit permission (not just view)
         if write_access:
-            if permissions.get(required_permission) == True:
-                return current_user
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Not enough permissions. Write access required for: {required_permission}"
             )
-        
-        # Check specific permission
-        if permissions.get(required_permission) == True:
-            return current_user
-        
-        # Check for view permission (read-only access) - only for read operations
-        # Note: Marketing role has "submissions" permission but not "leads"
-        if required_permission in ["leads", "submissions", "reports"] and permissions.get("view") == True:
-            return current_user
-        
-        # Special handling: lead_status_update, lead_comments, lead_assignment are sub-permissions
-        # If user has "leads" permission, they can do these operations
-        if required_permission in ["lead_status_update", "lead_comments"] and permissions.get("leads") == True:
-            return current_user
-        
-        # lead_assignment requires explicit permission or "leads" permission
-        if required_permission == "lead_assignment" and (permissions.get("lead_assignment") == True or permissions.get("leads") == True):
-            return current_user
-        
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=f"Not enough permissions. Required: {required_permission}"
@@ -209,13 +238,13 @@ def check_permission(required_permission: str, write_access: bool = False):
     return permission_checker
 
 @router.get("/me", response_model=UserOut)
-async def read_users_me(current_user: User = Depends(get_current_active_user)):
+async def read_users_me(current_user: Principal = Depends(get_current_active_user)):
     return current_user
 
 @router.post("/change-password")
 async def change_password(
     payload: PasswordChange,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: Session = Depends(db_session)
 ):
     """Change password for the current user"""
@@ -231,17 +260,29 @@ async def change_password(
             detail="New password must be at least 6 characters long"
         )
     
+    user, role = await run_in_threadpool(_load_user_and_role, db, current_user.email)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    
     # Verify old password
-    if not verify_password(payload.old_password, current_user.hashed_password):
+    if not await verify_password_async(payload.old_password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect old password"
         )
     
-    # Update password
-    current_user.hashed_password = get_password_hash(payload.new_password)
-    db.add(current_user)
-    db.commit()
+    # Update password and revoke previously issued tokens
+    user.hashed_password = await hash_password_async(payload.new_password)
+    await run_in_threadpool(_save_password, db, user)
+    principal_cache.invalidate_user(user.id)
+    
+    # Hand back a token for the new version so the current session stays signed in
+    access_token = create_access_token(data=build_token_claims(user, role), expires_delta=timedelta(hours=24))
     
-    return {"message": "Password changed successfully"}
+    return {"message": "Password changed successfully", "access_token": access_token, "token_type": "bearer"}
 
+def _save_password(db: Session, user: User):
+    token_registry.bump(db, user)
+    db.add(user)
+    db.commit()
+    db.refresh(user)
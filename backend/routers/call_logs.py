@@ -11,6 +11,8 @@ from models.user import User
 from models.role import Role
 from schemas.call_log import CallLogCreate, CallLogOut, CallLogUpdate
 from routers.auth import get_current_active_user, check_permission
+from services.principal_cache import Principal
+from services.permissions import has
 
 router = APIRouter(prefix="/call-logs", tags=["Call Logs"])
 
@@ -26,7 +28,7 @@ def list_call_logs(
     lead_id: Optional[int] = Query(None),
     user_id: Optional[int] = Query(None),
     db: Session = Depends(db_session),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """List call logs with optional filters"""
     query = db.query(CallLog)
@@ -40,8 +42,7 @@ def list_call_logs(
         query = query.filter(CallLog.user_id == user_id)
     else:
         # Non-admin users only see their own call logs
-        role = db.query(Role).filter(Role.id == current_user.role_id).first()
-        if not role or not role.permissions.get("all"):
+        if not has(current_user, "all"):
             query = query.filter(CallLog.user_id == current_user.id)
     
     # Filter out call logs linked to deleted leads
@@ -56,7 +57,7 @@ def list_call_logs(
 def create_call_log(
     payload: CallLogCreate,
     db: Session = Depends(db_session),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Create a new call log"""
     # Verify lead exists
@@ -65,11 +66,8 @@ def create_call_log(
         raise HTTPException(status_code=404, detail="Lead not found")
     
     # Check permissions - user must have access to the lead
-    role = db.query(Role).filter(Role.id == current_user.role_id).first()
-    permissions = role.permissions if role else {}
-    
     # Admin and users with "leads" permission can create logs for any lead
-    if not (permissions.get("all") == True or permissions.get("leads") == True):
+    if not has(current_user, "leads", write=True):
         # For read-only users, only allow if lead is assigned to them
         if lead.assigned_to != current_user.id and lead.assigned != current_user.name:
             raise HTTPException(
@@ -97,7 +95,7 @@ def create_call_log(
 def get_call_log(
     id: int,
     db: Session = Depends(db_session),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Get a specific call log"""
     call_log = db.query(CallLog).filter(CallLog.id == id).first()
@@ -105,8 +103,7 @@ def get_call_log(
         raise HTTPException(status_code=404, detail="Call log not found")
     
     # Check if user has access (own log or admin)
-    role = db.query(Role).filter(Role.id == current_user.role_id).first()
-    if not role or not role.permissions.get("all"):
+    if not has(current_user, "all"):
         if call_log.user_id != current_user.id:
             raise HTTPException(status_code=403, detail="Not authorized to view this call log")
     
@@ -117,7 +114,7 @@ def update_call_log(
     id: int,
     payload: CallLogUpdate,
     db: Session = Depends(db_session),
-    current_user: User = Depends(check_permission("leads", write_access=True))
+    current_user: Principal = Depends(check_permission("leads", write_access=True))
 ):
     """Update a call log"""
     call_log = db.query(CallLog).filter(CallLog.id == id).first()
@@ -125,8 +122,7 @@ def update_call_log(
         raise HTTPException(status_code=404, detail="Call log not found")
     
     # Check if user has access
-    role = db.query(Role).filter(Role.id == current_user.role_id).first()
-    if not role or not role.permissions.get("all"):
+    if not has(current_user, "all"):
         if call_log.user_id != current_user.id:
             raise HTTPException(status_code=403, detail="Not authorized to update this call log")
     
@@ -151,7 +147,7 @@ def update_call_log(
 def delete_call_log(
     id: int,
     db: Session = Depends(db_session),
-    current_user: User = Depends(check_permission("leads", write_access=True))
+    current_user: Principal = Depends(check_permission("leads", write_access=True))
 ):
     """Delete a call log"""
     call_log = db.query(CallLog).filter(CallLog.id == id).first()
@@ -159,8 +155,7 @@ def delete_call_log(
         raise HTTPException(status_code=404, detail="Call log not found")
     
     # Check if user has access
-    role = db.query(Role).filter(Role.id == current_user.role_id).first()
-    if not role or not role.permissions.get("all"):
+    if not has(current_user, "all"):
         if call_log.user_id != current_user.id:
             raise HTTPException(status_code=403, detail="Not authorized to delete this call log")
     
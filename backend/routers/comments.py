@@ -7,6 +7,8 @@ from models.lead import Lead
 from models.role import Role
 from schemas.comment import CommentCreate, CommentOut
 from routers.auth import get_current_active_user, check_permission
+from services.principal_cache import Principal
+from services.permissions import has
 from services.activity_logger import log_comment_added
 
 router = APIRouter(prefix="/comments", tags=["Comments"])
@@ -22,7 +24,7 @@ def db_session():
 def add_comment(
     request: CommentCreate, 
     db: Session = Depends(db_session),
-    current_user: User = Depends(get_current_active_user)  # Allow all authenticated users
+    current_user: Principal = Depends(get_current_active_user)  # Allow all authenticated users
 ):
     # Check if user has access to the lead
     lead = db.query(Lead).filter(Lead.id == request.lead_id).first()
@@ -30,11 +32,8 @@ def add_comment(
         raise HTTPException(status_code=404, detail="Lead not found")
     
     # Check if user has permission or if lead is assigned to them
-    role = db.query(Role).filter(Role.id == current_user.role_id).first()
-    permissions = role.permissions if role else {}
-    
     # Admin and users with "leads" permission can comment on any lead
-    if not (permissions.get("all") == True or permissions.get("leads") == True):
+    if not has(current_user, "leads", write=True):
         # For read-only users, only allow if lead is assigned to them
         if lead.assigned_to != current_user.id and lead.assigned != current_user.name:
             raise HTTPException(
@@ -58,6 +57,6 @@ def add_comment(
 def list_comments(
     lead_id: int, 
     db: Session = Depends(db_session),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     return db.query(Comment).filter(Comment.lead_id==lead_id).all()
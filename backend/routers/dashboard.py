@@ -0,0 +1,55 @@
+"""
+Dashboard router: the whole dashboard in one scoped, aggregated response
+"""
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from schemas.dashboard import DashboardSummary
+from routers.auth import get_current_active_user
+from services.principal_cache import Principal
+from services.permissions import has
+from services.dashboard import lead_summary, submission_summary, forms_db_submission_summary, reminder_summary
+from config import FORMS_DB_DIRECT_READS
+
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+
+def db_session():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@router.get("/summary", response_model=DashboardSummary)
+def get_dashboard_summary(
+    days: int = Query(30, ge=1, le=365, description="Days covered by the per-day submission series"),
+    db: Session = Depends(db_session),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Lead and submission counts, breakdowns and latest items plus the caller's
+    upcoming reminders. Leads are scoped like GET /leads; each section is only
+    included with the permission its list endpoint requires.
+    """
+    now = datetime.utcnow()
+    week_ago = now - timedelta(days=7)
+    start = now.date() - timedelta(days=days - 1)
+    
+    summary = {"days": days}
+    if has(current_user, "reminders"):
+        summary["reminders"] = reminder_summary(db, current_user, now)
+    if has(current_user, "leads"):
+        summary["leads"] = lead_summary(db, current_user, week_ago)
+    if has(current_user, "submissions"):
+        if FORMS_DB_DIRECT_READS:
+            # The website's forms database, counted table by table
+            from database_forms import get_forms_session
+            forms_db = get_forms_session()
+            try:
+                summary["submissions"] = forms_db_submission_summary(db, forms_db, current_user, week_ago, start, days)
+            finally:
+                forms_db.close()
+        else:
+            summary["submissions"] = submission_summary(db, current_user, week_ago, start, days)
+    return summary
@@ -0,0 +1,121 @@
+"""
+Export router: streams leads, form submissions and call logs as CSV or NDJSON
+Each export applies the same visibility rules and filters as the matching list
+endpoint, but rows are streamed from the database instead of being built into
+one response body (services/exporter.py).
+"""
+from datetime import date
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import exists
+from sqlalchemy.orm import aliased
+from database import SessionLocal
+from models.call_log import CallLog
+from models.lead import Lead
+from models.submission import Submission
+from models.user import User
+from routers.auth import get_current_active_user, check_permission
+from routers.form_submissions import filter_form_type
+from services.principal_cache import Principal
+from services.permissions import has
+from services.lead_queries import scope_leads, filter_leads
+from services.lead_serializer import LEAD_LIST_COLUMNS, LEAD_LIST_FIELDS
+from services.exporter import EXPORT_FORMATS, export_rows, export_items
+from services.submission_feed import forms_db_submissions
+from config import FORMS_DB_DIRECT_READS
+
+router = APIRouter(prefix="/export", tags=["Export"])
+
+_FORMAT_PATTERN = f"^({'|'.join(EXPORT_FORMATS)})$"
+
+LEAD_EXPORT_FIELDS = LEAD_LIST_FIELDS + ("created_by_name",)
+SUBMISSION_EXPORT_FIELDS = ("id", "form_type", "name", "email", "company", "submitted_at", "status", "lead_id", "data")
+SUBMISSION_EXPORT_COLUMNS = (
+    Submission.id, Submission.form_type, Submission.name, Submission.email, Submission.company,
+    Submission.submitted, Submission.status, Submission.lead_id, Submission.data,
+)
+CALL_LOG_EXPORT_FIELDS = tuple(CallLog.__table__.columns.keys())
+
+def _streaming_response(entity: str, fmt: str, body):
+    filename = f"{entity}-{date.today().isoformat()}.{fmt}"
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "Cache-Control": "no-store"}
+    )
+
+@router.get("/leads")
+def export_leads(
+    fmt: str = Query("csv", alias="format", pattern=_FORMAT_PATTERN),
+    status: list[str] | None = Query(None),
+    stage: list[str] | None = Query(None),
+    source_type: list[str] | None = Query(None),
+    assigned_to: int | None = Query(None),
+    follow_up_required: bool | None = Query(None),
+    created_from: date | None = Query(None),
+    created_to: date | None = Query(None),
+    follow_up_from: date | None = Query(None),
+    follow_up_to: date | None = Query(None),
+    current_user: Principal = Depends(check_permission("leads"))
+):
+    """Export the leads GET /leads would list with the same filters, in id order"""
+    creator = aliased(User)
+
+    def build_query(db):
+        query = db.query(*LEAD_LIST_COLUMNS, creator.name).outerjoin(creator, creator.id == Lead.created_by)
+        query = filter_leads(
+            scope_leads(query, db, current_user),
+            status=status,
+            stage=stage,
+            source_type=source_type,
+            assigned_to=assigned_to,
+            follow_up_required=follow_up_required,
+            created_from=created_from,
+            created_to=created_to,
+            follow_up_from=follow_up_from,
+            follow_up_to=follow_up_to,
+        )
+        return query.order_by(Lead.id)
+
+    return _streaming_response("leads", fmt, export_rows(SessionLocal, build_query, LEAD_EXPORT_FIELDS, fmt))
+
+@router.get("/submissions")
+def export_submissions(
+    fmt: str = Query("csv", alias="format", pattern=_FORMAT_PATTERN),
+    form_type: str | None = Query(None),
+    current_user: Principal = Depends(check_permission("submissions"))
+):
+    """Export the form submissions GET /form-submissions would list, in id order"""
+    if FORMS_DB_DIRECT_READS:
+        # The website's forms database has one table per form; they are streamed merged, newest first
+        from database_forms import get_forms_session
+        items = (dict(item) for item in forms_db_submissions(get_forms_session, form_type))
+        return _streaming_response("submissions", fmt, export_items(items, SUBMISSION_EXPORT_FIELDS, fmt))
+
+    def build_query(db):
+        return filter_form_type(db.query(*SUBMISSION_EXPORT_COLUMNS), form_type).order_by(Submission.id)
+
+    return _streaming_response("submissions", fmt, export_rows(SessionLocal, build_query, SUBMISSION_EXPORT_FIELDS, fmt))
+
+@router.get("/call-logs")
+def export_call_logs(
+    fmt: str = Query("csv", alias="format", pattern=_FORMAT_PATTERN),
+    lead_id: int | None = Query(None),
+    user_id: int | None = Query(None),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Export call logs of existing leads, in id order. Only admins export other
+    users' call logs; everyone else gets their own.
+    """
+    def build_query(db):
+        query = db.query(CallLog.__table__).filter(exists().where(Lead.id == CallLog.lead_id))
+        if lead_id:
+            query = query.filter(CallLog.lead_id == lead_id)
+        if user_id:
+            query = query.filter(CallLog.user_id == user_id)
+        if not has(current_user, "all"):
+            query = query.filter(CallLog.user_id == current_user.id)
+        return query.order_by(CallLog.id)
+
+    return _streaming_response("call-logs", fmt, export_rows(SessionLocal, build_query, CALL_LOG_EXPORT_FIELDS, fmt))
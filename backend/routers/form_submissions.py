@@ -1,17 +1,23 @@
 """
 Unified form submissions router
-Reads from either spars_forms.db (when USE_FORMS_DB=true) or Submission table (when USE_FORMS_DB=false)
+Reads the Submission table, which spars_forms.db is copied into when USE_FORMS_DB=true,
+or spars_forms.db itself when its sync is turned off (FORMS_DB_SYNC=false)
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from database import SessionLocal
 from models.submission import Submission
 from models.user import User
+from schemas.submission import FormSubmissionOut, SubmissionStatsOut
 from routers.auth import get_current_active_user, check_permission
-from config import USE_FORMS_DB
-from pydantic import BaseModel
-from datetime import datetime
+from services.principal_cache import Principal
+from services.change_tracker import list_etag, etag_matches, cache_headers, current_versions
+from services.lead_queries import InvalidCursor, MAX_PAGE_SIZE
+from services.submission_feed import crm_feed, forms_db_feed, forms_page_cache, take_page
+from services.form_sync import sync_forms_db
+from services.submission_stats import cached_stats, crm_stats, forms_db_stats, stats_as_of
+from config import USE_FORMS_DB, FORMS_DB_SYNC, FORMS_DB_DIRECT_READS
 
 router = APIRouter(prefix="/form-submissions", tags=["Form Submissions"])
 
@@ -22,21 +28,6 @@ def db_session():
     finally:
         db.close()
 
-# Pydantic schemas for form submissions
-class FormSubmissionOut(BaseModel):
-    id: int
-    form_type: str
-    name: str
-    email: str
-    company: str
-    submitted_at: datetime
-    data: dict
-    status: str = 'New'  # New | Converted | Archived
-    lead_id: Optional[int] = None
-    
-    class Config:
-        from_attributes = True
-
 def _convert_submission_to_form_submission(sub: Submission) -> FormSubmissionOut:
     """Convert Submission model to FormSubmissionOut"""
     return FormSubmissionOut(
@@ -51,9 +42,8 @@ def _convert_submission_to_form_submission(sub: Submission) -> FormSubmissionOut
         lead_id=sub.lead_id
     )
 
-def _get_submissions_from_crm_db(form_type: Optional[str], db: Session) -> List[FormSubmissionOut]:
-    """Get submissions from CRM database (Submission table)"""
-    query = db.query(Submission)
+def filter_form_type(query, form_type: Optional[str]):
+    """Restrict a Submission query to form_type, including the names it's also stored under"""
     if form_type:
         # Handle form type aliases (bidirectional mapping)
         if form_type == 'product-profile':
@@ -73,169 +63,142 @@ def _get_submissions_from_crm_db(form_type: Optional[str], db: Session) -> List[
             query = query.filter(Submission.form_type.in_(['general', 'contact']))
         else:
             query = query.filter(Submission.form_type == form_type)
-    submissions = query.order_by(Submission.submitted.desc()).all()
-    return [_convert_submission_to_form_submission(sub) for sub in submissions]
+    return query
 
-def _get_submissions_from_forms_db(form_type: Optional[str]) -> List[FormSubmissionOut]:
-    """Get submissions from spars_forms.db"""
-    from database_forms import get_forms_session
-    from models.external.contact_forms import ContactForm
-    from models.external.brochure_forms import BrochureForm
-    from models.external.product_profile_forms import ProductProfileForm
-    from models.external.talk_to_sales_forms import TalkToSalesForm
-    from models.external.newsletter_subscriptions import NewsletterSubscription
+def _get_submissions_from_crm_db(form_type: Optional[str], db: Session, cursor: Optional[str] = None, limit: Optional[int] = None):
+    """Get a page of submissions from CRM database (Submission table), newest first, and the next page's cursor"""
+    query = filter_form_type(db.query(Submission), form_type)
+    submissions, next_cursor = take_page(crm_feed(query, cursor=cursor, limit=limit), limit)
+    return [_convert_submission_to_form_submission(sub) for sub in submissions], next_cursor
+
+def _get_submissions_from_forms_db(form_type: Optional[str], cursor: Optional[str] = None, limit: Optional[int] = None):
+    """
+    Get a page of submissions from spars_forms.db, newest first across its form
+    tables, and the next page's cursor; pages are reused until the file changes
+    """
+    from database_forms import get_forms_session, forms_db_changes
     
+    version = forms_db_changes.version()
+    key = (form_type, cursor, limit)
+    page = forms_page_cache.get(version, key)
+    if page is not None:
+        return page
     db = get_forms_session()
-    results = []
-    
     try:
-        # Map form_type to model
-        form_type_map = {
-            'contact': ContactForm,  # General inquiry (demo_date = NULL)
-            'general': ContactForm,  # General inquiry (alias for contact, demo_date = NULL)
-            'demo': ContactForm,  # Request demo (demo_date set) - same table, different data
-            'brochure': BrochureForm,
-            'product-profile': ProductProfileForm,
-            'product_profile': ProductProfileForm,  # Support both formats
-            'talk': TalkToSalesForm,
-            'talk_to_sales': TalkToSalesForm,  # Support both formats
-            'newsletter': NewsletterSubscription
-        }
-        
-        if form_type:
-            # Get specific form type
-            if form_type not in form_type_map:
-                return []
-            model = form_type_map[form_type]
-            query = db.query(model)
-            # For contact/general/demo, filter by demo_date to distinguish
-            if form_type == 'contact' or form_type == 'general':
-                query = query.filter(model.demo_date == None)
-            elif form_type == 'demo':
-                query = query.filter(model.demo_date != None)
-            forms = query.order_by(model.submitted_at.desc()).all()
-            
-            for form in forms:
-                # Convert to unified format
-                if form_type == 'newsletter':
-                    results.append(FormSubmissionOut(
-                        id=form.id,
-                        form_type='newsletter',
-                        name='',  # Newsletter doesn't have name
-                        email=form.email,
-                        company='',
-                        submitted_at=form.subscribed_at,
-                        data={'email': form.email}
-                    ))
-                else:
-                    # Extract name from first_name + last_name
-                    name = f"{getattr(form, 'first_name', '')} {getattr(form, 'last_name', '')}".strip()
-                    # Build data dict from all attributes
-                    data = {}
-                    for key in form.__table__.columns.keys():
-                        if key not in ['id', 'submitted_at']:
-                            value = getattr(form, key, None)
-                            if value is not None:
-                                data[key] = value
-                    
-                    results.append(FormSubmissionOut(
-                        id=form.id,
-                        form_type=form_type,
-                        name=name,
-                        email=getattr(form, 'email', ''),
-                        company=getattr(form, 'company', '') or getattr(form, 'company_name', ''),
-                        submitted_at=getattr(form, 'submitted_at', datetime.now()),
-                        data=data,
-                        status='New',  # External forms are always 'New' until converted
-                        lead_id=None
-                    ))
-        else:
-            # Get all form types
-            for ft, model in form_type_map.items():
-                # Skip duplicate mappings (product-profile/product_profile, talk/talk_to_sales)
-                if ft in ['product_profile', 'talk_to_sales']:
-                    continue
-                query = db.query(model)
-                # For contact/demo, filter by demo_date to distinguish
-                if ft == 'contact':
-                    query = query.filter(model.demo_date == None)
-                elif ft == 'demo':
-                    query = query.filter(model.demo_date != None)
-                forms = query.order_by(model.submitted_at.desc()).all()
-                for form in forms:
-                    if ft == 'newsletter':
-                        results.append(FormSubmissionOut(
-                            id=form.id,
-                            form_type='newsletter',
-                            name='',
-                            email=form.email,
-                            company='',
-                            submitted_at=form.subscribed_at,
-                            data={'email': form.email},
-                            status='New',  # External forms are always 'New' until converted
-                            lead_id=None
-                        ))
-                    else:
-                        name = f"{getattr(form, 'first_name', '')} {getattr(form, 'last_name', '')}".strip()
-                        data = {}
-                        for key in form.__table__.columns.keys():
-                            if key not in ['id', 'submitted_at']:
-                                value = getattr(form, key, None)
-                                if value is not None:
-                                    data[key] = value
-                        
-                        results.append(FormSubmissionOut(
-                            id=form.id,
-                            form_type=ft,
-                            name=name,
-                            email=getattr(form, 'email', ''),
-                            company=getattr(form, 'company', '') or getattr(form, 'company_name', ''),
-                            submitted_at=getattr(form, 'submitted_at', datetime.now()),
-                            data=data,
-                            status='New',  # External forms are always 'New' until converted
-                            lead_id=None
-                        ))
+        page = take_page(forms_db_feed(db, form_type, cursor=cursor, limit=limit), limit)
     finally:
         db.close()
-    
-    # Sort by submitted_at descending
-    results.sort(key=lambda x: x.submitted_at, reverse=True)
-    return results
+    forms_page_cache.put(version, key, page)
+    return page
+
+def _list_submissions(
+    request: Request,
+    response: Response,
+    form_type: Optional[str],
+    db: Session,
+    current_user: Principal,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None
+):
+    from fastapi import status
+    try:
+        if FORMS_DB_DIRECT_READS:
+            # Written by the website, not through our sessions: validated against the file's data version
+            from database_forms import forms_db_changes
+            etag = list_etag(db, (), current_user, request, extra=forms_db_changes.version())
+        else:
+            etag = list_etag(db, ("submissions",), current_user, request)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=cache_headers(etag))
+        response.headers.update(cache_headers(etag))
+        if FORMS_DB_DIRECT_READS:
+            submissions, next_cursor = _get_submissions_from_forms_db(form_type, cursor=cursor, limit=limit)
+        else:
+            submissions, next_cursor = _get_submissions_from_crm_db(form_type, db, cursor=cursor, limit=limit)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return submissions
 
 @router.get("/", response_model=List[FormSubmissionOut])
 def list_all_form_submissions(
+    request: Request,
+    response: Response,
     form_type: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; omit to return every submission"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
     db: Session = Depends(db_session),
-    current_user: User = Depends(check_permission("submissions"))
+    current_user: Principal = Depends(check_permission("submissions"))
 ):
-    """List all form submissions from either source based on USE_FORMS_DB"""
-    if USE_FORMS_DB:
-        return _get_submissions_from_forms_db(form_type)
+    """
+    List all form submissions from either source (see the module docstring), newest
+    first. Pass limit, then follow the X-Next-Cursor response header until it
+    is absent.
+    """
+    return _list_submissions(request, response, form_type, db, current_user, cursor=cursor, limit=limit)
+
+@router.get("/stats", response_model=SubmissionStatsOut)
+def form_submission_stats(
+    db: Session = Depends(db_session),
+    current_user: Principal = Depends(check_permission("submissions"))
+):
+    """
+    Total, New, Converted and last 7/30 days counts per form type, from the
+    same source as the lists; recounted only when the data changes (or, for
+    the windows, each minute)
+    """
+    as_of = stats_as_of()
+    if FORMS_DB_DIRECT_READS:
+        from database_forms import get_forms_session, forms_db_changes
+
+        def count():
+            forms_db = get_forms_session()
+            try:
+                return forms_db_stats(forms_db, as_of)
+            finally:
+                forms_db.close()
+        form_types = cached_stats("forms_db", forms_db_changes.version(), as_of, count)
     else:
-        return _get_submissions_from_crm_db(form_type, db)
+        version = current_versions(db, ("submissions",))["submissions"]
+        form_types = cached_stats("submissions", version, as_of, lambda: crm_stats(db, as_of))
+    return {"as_of": as_of, "form_types": form_types}
 
 @router.get("/{form_type}", response_model=List[FormSubmissionOut])
 def list_form_submissions_by_type(
+    request: Request,
+    response: Response,
     form_type: str,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; omit to return every submission"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
     db: Session = Depends(db_session),
-    current_user: User = Depends(check_permission("submissions"))
+    current_user: Principal = Depends(check_permission("submissions"))
 ):
-    """List form submissions by type"""
-    if USE_FORMS_DB:
-        return _get_submissions_from_forms_db(form_type)
-    else:
-        return _get_submissions_from_crm_db(form_type, db)
+    """List form submissions by type, newest first, paginated like the full list"""
+    return _list_submissions(request, response, form_type, db, current_user, cursor=cursor, limit=limit)
 
 @router.get("/newsletter/all", response_model=List[FormSubmissionOut])
 def list_newsletter_subscriptions(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; omit to return every subscription"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
     db: Session = Depends(db_session),
-    current_user: User = Depends(check_permission("submissions"))
+    current_user: Principal = Depends(check_permission("submissions"))
 ):
-    """List all newsletter subscriptions"""
-    return list_form_submissions_by_type('newsletter', db, current_user)
-
-
-
-
-
+    """List all newsletter subscriptions, newest first, paginated like the full list"""
+    return _list_submissions(request, response, 'newsletter', db, current_user, cursor=cursor, limit=limit)
 
+@router.post("/sync")
+def sync_form_submissions(
+    current_user: Principal = Depends(check_permission("submissions", write_access=True))
+):
+    """
+    Copy new spars_forms.db rows into the submission list now instead of waiting
+    for the background sync; returns the rows copied per forms-database table
+    """
+    from fastapi import status
+    from database_forms import get_forms_session
+    if not (USE_FORMS_DB and FORMS_DB_SYNC):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Forms database sync is not enabled")
+    return {"copied": sync_forms_db(SessionLocal, get_forms_session)}
@@ -5,6 +5,7 @@ from models.form_field import FormField
 from models.user import User
 from schemas.form_field import FormFieldCreate, FormFieldOut
 from routers.auth import get_current_active_user, check_permission
+from services.principal_cache import Principal
 
 router = APIRouter(prefix="/forms", tags=["Forms"])
 
@@ -19,7 +20,7 @@ def db_session():
 def get_fields(
     form_type: str, 
     db: Session = Depends(db_session),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     return db.query(FormField).filter(FormField.form_type==form_type).all()
 
@@ -27,7 +28,7 @@ def get_fields(
 def create_field(
     payload: FormFieldCreate, 
     db: Session = Depends(db_session),
-    current_user: User = Depends(check_permission("configuration"))
+    current_user: Principal = Depends(check_permission("configuration"))
 ):
     f = FormField(**payload.dict())
     db.add(f)
@@ -1,15 +1,41 @@
-from fastapi import APIRouter, Depends
+from datetime import date
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy import func, desc
 from sqlalchemy.orm import Session
 from database import SessionLocal
+from models.activity_log import ActivityLog
+from models.call_log import CallLog
+from models.comment import Comment
+from models.entity_tag import EntityTag
 from models.lead import Lead
+from models.reminder import Reminder
 from models.submission import Submission
+from models.tag import Tag
 from models.user import User
-from schemas.lead import LeadCreate, LeadOut, ConvertRequest, LeadUpdate
+from schemas.lead import (
+    LeadCreate, LeadOut, LeadDetailOut, ConvertRequest, ConvertedLeadOut, LeadUpdate, LeadBulkRequest, BatchConvertRequest, BatchConvertOut,
+    DuplicateCluster, LeadMergeRequest
+)
 from routers.auth import get_current_active_user, check_permission, get_current_user
-from services.activity_logger import log_lead_conversion, log_status_change
+from services.principal_cache import Principal
+from config import BULK_LEADS_MAX
+from services.permissions import has
+from services.activity_logger import log_lead_conversion, log_status_change, log_activities
+from services.team_index import team_index
+from services.lead_sources import apply_normalized_source, source_for_form_type
+from services.change_tracker import list_etag, etag_matches, cache_headers
+from services.lead_bulk import chunked, update_leads, delete_leads, merge_leads, leads_from_submissions
+from services.lead_dedup import DUPLICATE_KEYS, normalize_email, existing_lead_ids, duplicate_clusters
+from services.lead_serializer import LEAD_LIST_COLUMNS, LEAD_LIST_FIELDS, serialize_lead_rows
+from services.lead_queries import (
+    SORT_COLUMNS, DEFAULT_SORT, DEFAULT_ORDER, MAX_PAGE_SIZE, InvalidCursor,
+    scope_leads, scope_lead_deletes, filter_leads, paginate_leads, count_leads
+)
 
 router = APIRouter(prefix="/leads", tags=["Leads"])
 
+_CREATED_BY = LEAD_LIST_FIELDS.index("created_by")
+
 def db_session():
     db = SessionLocal()
     try:
@@ -17,101 +43,134 @@ def db_session():
     finally:
         db.close()
 
-def normalize_lead_source(lead: Lead) -> Lead:
-    """
-    Normalize lead source: Ensure form-based leads have source_type='Website' and source=form name.
-    This ensures all form-based leads are grouped under 'Website' in reports/dashboards.
-    This function modifies the lead object in-place for response normalization only.
-    """
-    form_source_names = [
-        'Brochure Download',
-        'Product Profile Download',
-        'Talk to Sales',
-        'General Inquiry',
-        'Request a Demo'
-    ]
-    
-    # If source is a form name but source_type is not 'Website', normalize it
-    if lead.source and lead.source in form_source_names:
-        if lead.source_type != 'Website':
-            # Set source_type to 'Website' (category)
-            lead.source_type = 'Website'
-            # Keep source as form name (specific source)
-            # lead.source stays as is
-    
-    # Legacy: If source_type is a form name (old data structure), normalize it
-    elif lead.source_type and lead.source_type in form_source_names:
-        # Move form name to source, set source_type to 'Website'
-        form_name = lead.source_type
-        lead.source_type = 'Website'
-        lead.source = form_name if not lead.source or lead.source == 'Website' else lead.source
-    
-    return lead
+# Tables GET /leads reads from, besides the scope tables (users, roles)
+LEAD_LIST_TABLES = ("leads",)
 
 @router.get("/", response_model=list[LeadOut])
 def get_leads(
+    request: Request,
     db: Session = Depends(db_session),
-    current_user: User = Depends(check_permission("leads"))
+    current_user: Principal = Depends(check_permission("leads")),
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; omit to return every matching lead"),
+    cursor: str | None = Query(None, description="X-Next-Cursor value from the previous page"),
+    sort: str = Query(DEFAULT_SORT, description="created_at, updated_at, follow_up_date, name, company, status, stage or id"),
+    order: str = Query(DEFAULT_ORDER, pattern="^(asc|desc)$"),
+    status: list[str] | None = Query(None),
+    stage: list[str] | None = Query(None),
+    source_type: list[str] | None = Query(None),
+    assigned_to: int | None = Query(None),
+    follow_up_required: bool | None = Query(None),
+    created_from: date | None = Query(None),
+    created_to: date | None = Query(None),
+    follow_up_from: date | None = Query(None),
+    follow_up_to: date | None = Query(None),
+    include_total: bool = Query(False, description="Return the matching row count in X-Total-Count")
 ):
+    """
+    List the leads visible to the current user, filtered and sorted server-side.
+    Pages are keyset-paginated on (sort, id): pass limit, then follow the
+    X-Next-Cursor response header until it is absent.
+    Responses carry an ETag; a matching If-None-Match gets 304 without
+    running the list query.
+    """
+    from fastapi import HTTPException, status as http_status
+    if sort not in SORT_COLUMNS:
+        raise HTTPException(status_code=http_status.HTTP_400_BAD_REQUEST, detail=f"Cannot sort leads by '{sort}'")
+    
+    etag = list_etag(db, LEAD_LIST_TABLES, current_user, request)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cache_headers(etag))
+    
     # Viewing leads requires "leads" permission (Admin, Sales Manager, Sales Executive can view)
-    from models.role import Role
+    query = scope_leads(db.query(*LEAD_LIST_COLUMNS), db, current_user)
+    query = filter_leads(
+        query,
+        status=status,
+        stage=stage,
+        source_type=source_type,
+        assigned_to=assigned_to,
+        follow_up_required=follow_up_required,
+        created_from=created_from,
+        created_to=created_to,
+        follow_up_from=follow_up_from,
+        follow_up_to=follow_up_to,
+    )
     
-    query = db.query(Lead)
-    
-    # Check if user is Admin or Sales Manager
-    role = db.query(Role).filter(Role.id == current_user.role_id).first()
-    if role and (role.role_name == "Admin" or role.permissions.get("all")):
-        # Admin sees all leads
-        leads = query.all()
-    elif role and role.role_name == "Sales Manager":
-        # Sales Manager: only see leads assigned to their own Sales Executives
-        # Get IDs of Sales Executives under this manager
-        sales_executive_role = db.query(Role).filter(Role.role_name == "Sales Executive").first()
-        if sales_executive_role:
-            team_executive_ids = db.query(User.id).filter(
-                User.manager_id == current_user.id,
-                User.role_id == sales_executive_role.id
-            ).all()
-            team_executive_ids = [id[0] for id in team_executive_ids]
-            
-            if team_executive_ids:
-                query = query.filter(Lead.assigned_to.in_(team_executive_ids))
-            else:
-                # No team members, return empty list
-                query = query.filter(Lead.id == -1)  # Impossible condition
-        
-        leads = query.all()
-    else:
-        # Sales Executive and other users only see leads assigned to them
-        query = query.filter(
-            (Lead.assigned_to == current_user.id) | (Lead.assigned == current_user.name)
-        )
-        leads = query.all()
+    headers = cache_headers(etag)
+    if include_total:
+        headers["X-Total-Count"] = str(count_leads(query))
+    try:
+        rows, next_cursor = paginate_leads(query, sort=sort, order=order, cursor=cursor, limit=limit)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=http_status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
     
     # Build a cache of user names for created_by lookup
-    created_by_ids = set(lead.created_by for lead in leads if lead.created_by)
-    creator_names = {}
-    if created_by_ids:
-        creators = db.query(User).filter(User.id.in_(created_by_ids)).all()
-        creator_names = {u.id: u.name for u in creators}
-    
-    # Normalize sources and attach created_by_name
-    result = []
-    for lead in leads:
-        lead = normalize_lead_source(lead)
-        lead_dict = LeadOut.model_validate(lead).model_dump()
-        lead_dict['created_by_name'] = creator_names.get(lead.created_by) if lead.created_by else None
-        result.append(lead_dict)
-    return result
+    created_by_ids = set(row[_CREATED_BY] for row in rows if row[_CREATED_BY])
+    creator_names = {u.id: u.name for u in team_index.users(db, created_by_ids)}
+    
+    # Serialized in one pass; returning a Response skips response_model revalidation
+    return Response(content=serialize_lead_rows(rows, creator_names), media_type="application/json", headers=headers)
+
+@router.get("/stats/sources")
+def get_lead_source_stats(
+    db: Session = Depends(db_session),
+    current_user: Principal = Depends(check_permission("leads"))
+):
+    """
+    Lead counts by source for the leads visible to the current user.
+    source_types groups by category (e.g. Website); sources breaks each
+    category down by specific source (e.g. the form name).
+    """
+    query = scope_leads(
+        db.query(Lead.source_type, Lead.source, func.count(Lead.id)),
+        db,
+        current_user
+    ).group_by(Lead.source_type, Lead.source)
+    
+    sources = []
+    type_counts = {}
+    total = 0
+    for source_type, source, count in query.all():
+        sources.append({"source_type": source_type, "source": source, "count": count})
+        type_counts[source_type] = type_counts.get(source_type, 0) + count
+        total += count
+    
+    sources.sort(key=lambda item: item["count"], reverse=True)
+    source_types = [
+        {"source_type": source_type, "count": count}
+        for source_type, count in sorted(type_counts.items(), key=lambda item: item[1], reverse=True)
+    ]
+    return {"total": total, "source_types": source_types, "sources": sources}
+
+@router.get("/duplicates", response_model=list[DuplicateCluster])
+def get_duplicate_leads(
+    by: str = Query("email", description=f"Duplicate key: {' or '.join(DUPLICATE_KEYS)}"),
+    limit: int = Query(50, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(db_session),
+    current_user: Principal = Depends(check_permission("leads"))
+):
+    """
+    Leads visible to the current user that share a normalized email (by=email)
+    or company (by=company), grouped, largest groups first
+    """
+    from fastapi import HTTPException, status
+    if by not in DUPLICATE_KEYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid duplicate key '{by}'. Use one of: {', '.join(DUPLICATE_KEYS)}"
+        )
+    return duplicate_clusters(db, current_user, by, limit, offset)
 
 @router.post("/", response_model=LeadOut)
 def create_lead(
     request: LeadCreate, 
     db: Session = Depends(db_session),
-    current_user: User = Depends(check_permission("leads", write_access=True))
+    current_user: Principal = Depends(check_permission("leads", write_access=True))
 ):
     from fastapi import HTTPException, status
-    from models.role import Role
     
     lead_data = request.dict()
     lead_data['created_by'] = current_user.id
@@ -122,13 +181,13 @@ def create_lead(
     
     if assigned_to_id:
         # Validate that the user exists and is assignable (not Admin/Manager)
-        assigned_user = db.query(User).filter(User.id == assigned_to_id).first()
+        assigned_user = team_index.user(db, assigned_to_id)
         if assigned_user:
-            user_role = db.query(Role).filter(Role.id == assigned_user.role_id).first()
+            user_role = team_index.role(db, assigned_user.role_id)
             # Only allow assignment to Sales Executive (level 2) and Marketing (level 3)
             if user_role and user_role.hierarchy_level >= 2:
                 # Additional validation for Sales Managers: can only assign to their own team
-                current_role = db.query(Role).filter(Role.id == current_user.role_id).first()
+                current_role = current_user.role
                 if current_role and current_role.role_name == "Sales Manager":
                     if assigned_user.manager_id != current_user.id:
                         raise HTTPException(
@@ -151,35 +210,90 @@ def create_lead(
     
     lead_data['assigned'] = assigned_name
     
-    lead = Lead(**lead_data)
+    lead = apply_normalized_source(Lead(**lead_data))
     db.add(lead)
     db.commit()
     db.refresh(lead)
-    # Normalize source before returning
-    return normalize_lead_source(lead)
+    return lead
 
 @router.get("/{id}", response_model=LeadOut)
 def get_lead(
     id: int, 
     db: Session = Depends(db_session),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     lead = db.query(Lead).filter(Lead.id==id).first()
     if not lead:
         from fastapi import HTTPException, status
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lead not found")
-    # Normalize source before returning
-    return normalize_lead_source(lead)
+    return lead
+
+@router.get("/{id}/full", response_model=LeadDetailOut)
+def get_lead_detail(
+    id: int,
+    activity_limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(db_session),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    The lead with its comments, call logs, reminders, tags and latest
+    activities in one response: one authentication and one query per part,
+    however many rows each part has. Each part is filtered exactly as its own
+    endpoint filters it.
+    """
+    from fastapi import HTTPException, status
+    lead = db.query(Lead).filter(Lead.id == id).first()
+    if not lead:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lead not found")
+    lead_out = LeadOut.model_validate(lead)
+    if lead.created_by:
+        creator = team_index.user(db, lead.created_by)
+        lead_out.created_by_name = creator.name if creator else None
+    
+    sees_all = has(current_user, "all")
+    comments = db.query(Comment).filter(Comment.lead_id == id).order_by(Comment.id).all()
+    
+    # Call logs and reminders are private to their owner unless the user sees everything
+    call_logs = db.query(CallLog).filter(CallLog.lead_id == id)
+    if not sees_all:
+        call_logs = call_logs.filter(CallLog.user_id == current_user.id)
+    call_logs = call_logs.order_by(CallLog.meeting_date.desc(), CallLog.created_at.desc()).all()
+    
+    reminders = []
+    if has(current_user, "reminders"):
+        query = db.query(Reminder).filter(Reminder.lead_id == id)
+        if not sees_all:
+            query = query.filter(Reminder.user_id == current_user.id)
+        reminders = query.order_by(Reminder.due_date.asc()).all()
+    
+    tags = db.query(Tag).join(EntityTag, EntityTag.tag_id == Tag.id).filter(
+        EntityTag.entity_type == 'lead', EntityTag.entity_id == id
+    ).order_by(Tag.id).all()
+    
+    activities = db.query(ActivityLog).filter(ActivityLog.entity_type == 'lead', ActivityLog.entity_id == id)
+    role = current_user.role
+    if not role or (role.role_name not in ["Admin", "Sales Manager"] and not sees_all):
+        # As GET /activities/lead/{id}: regular users only see their own activities
+        activities = activities.filter(ActivityLog.user_id == current_user.id)
+    activities = activities.order_by(desc(ActivityLog.created_at)).limit(activity_limit).all()
+    
+    return {
+        "lead": lead_out,
+        "comments": comments,
+        "call_logs": call_logs,
+        "reminders": reminders,
+        "tags": tags,
+        "activities": activities,
+    }
 
 @router.patch("/{id}", response_model=LeadOut)
 def update_lead(
     id: int, 
     payload: LeadUpdate, 
     db: Session = Depends(db_session),
-    current_user: User = Depends(check_permission("lead_status_update", write_access=True))
+    current_user: Principal = Depends(check_permission("lead_status_update", write_access=True))
 ):
     from fastapi import HTTPException, status
-    from models.role import Role
     lead = db.query(Lead).filter(Lead.id==id).first()
     if not lead:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lead not found")
@@ -193,13 +307,13 @@ def update_lead(
         assigned_to_id = update_data.pop('assigned_to_id')
         if assigned_to_id:
             # Validate that the user exists and is assignable
-            assigned_user = db.query(User).filter(User.id == assigned_to_id).first()
+            assigned_user = team_index.user(db, assigned_to_id)
             if assigned_user:
-                user_role = db.query(Role).filter(Role.id == assigned_user.role_id).first()
+                user_role = team_index.role(db, assigned_user.role_id)
                 # Only allow assignment to Sales Executive (level 2)
                 if user_role and user_role.hierarchy_level == 2:
                     # Additional validation for Sales Managers: can only assign to their own team
-                    current_role = db.query(Role).filter(Role.id == current_user.role_id).first()
+                    current_role = current_user.role
                     if current_role and current_role.role_name == "Sales Manager":
                         if assigned_user.manager_id != current_user.id:
                             raise HTTPException(
@@ -232,10 +346,10 @@ def update_lead(
         if assigned_name and assigned_name != 'Unassigned':
             assigned_user = db.query(User).filter(User.name == assigned_name).first()
             if assigned_user:
-                user_role = db.query(Role).filter(Role.id == assigned_user.role_id).first()
+                user_role = team_index.role(db, assigned_user.role_id)
                 if user_role and user_role.hierarchy_level == 2:
                     # Additional validation for Sales Managers: can only assign to their own team
-                    current_role = db.query(Role).filter(Role.id == current_user.role_id).first()
+                    current_role = current_user.role
                     if current_role and current_role.role_name == "Sales Manager":
                         if assigned_user.manager_id != current_user.id:
                             raise HTTPException(
@@ -264,6 +378,8 @@ def update_lead(
     for key, value in update_data.items():
         if key not in ['assigned']:  # Skip 'assigned' if we already handled it
             setattr(lead, key, value)
+    if 'source_type' in update_data or 'source' in update_data:
+        apply_normalized_source(lead)
     
     db.add(lead)
     db.commit()
@@ -273,38 +389,11 @@ def update_lead(
     if 'status' in update_data and old_status != lead.status:
         log_status_change(db, current_user.id, lead.id, old_status, lead.status)
     
-    # Normalize source before returning
-    return normalize_lead_source(lead)
+    return lead
 
-@router.post("/convert/{submission_id}", response_model=LeadOut)
-def convert_submission(
-    submission_id: int, 
-    request: ConvertRequest, 
-    db: Session = Depends(db_session),
-    current_user: User = Depends(check_permission("convert_to_lead", write_access=True))
-):
+def _resolve_convert_assignee(db: Session, current_user: Principal, request: ConvertRequest):
+    """(assigned_to, assigned) for leads converted from submissions on request"""
     from fastapi import HTTPException, status
-    sub = db.query(Submission).filter(Submission.id==submission_id).first()
-    if not sub:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Submission not found")
-    
-    # Map form_type to source name (handle variations)
-    form_type_to_source = {
-        'contact': 'General Inquiry',
-        'talk_to_sales': 'Talk to Sales',
-        'talk': 'Talk to Sales',
-        'brochure': 'Brochure Download',
-        'product_profile': 'Product Profile Download',
-        'product-profile': 'Product Profile Download',
-        'demo': 'Request a Demo'
-    }
-    
-    # Normalize form_type (handle variations)
-    normalized_form_type = sub.form_type.lower().replace('-', '_') if sub.form_type else ''
-    
-    # Set source_type to 'Website' (category) and source to form name (specific source)
-    source_type = 'Website'  # Category: always 'Website' for form submissions
-    source = form_type_to_source.get(sub.form_type) or form_type_to_source.get(normalized_form_type) or 'Website Form'  # Specific form name
     
     # Find assigned user - prefer assigned_to_id, fallback to name lookup
     assigned_to_id = None
@@ -312,14 +401,13 @@ def convert_submission(
     
     if request.assigned_to_id:
         # Validate that the user exists and is assignable (only Sales Executive)
-        assigned_user = db.query(User).filter(User.id == request.assigned_to_id).first()
+        assigned_user = team_index.user(db, request.assigned_to_id)
         if assigned_user:
-            from models.role import Role
-            user_role = db.query(Role).filter(Role.id == assigned_user.role_id).first()
+            user_role = team_index.role(db, assigned_user.role_id)
             # Only allow assignment to Sales Executive (hierarchy_level = 2), reject Marketing (level 3)
             if user_role and user_role.hierarchy_level == 2:
                 # Additional validation for Sales Managers: can only assign to their own team
-                current_role = db.query(Role).filter(Role.id == current_user.role_id).first()
+                current_role = current_user.role
                 if current_role and current_role.role_name == "Sales Manager":
                     if assigned_user.manager_id != current_user.id:
                         raise HTTPException(
@@ -338,11 +426,10 @@ def convert_submission(
         # Fallback: lookup by name (for backward compatibility)
         assigned_user = db.query(User).filter(User.name == request.assigned).first()
         if assigned_user:
-            from models.role import Role
-            user_role = db.query(Role).filter(Role.id == assigned_user.role_id).first()
+            user_role = team_index.role(db, assigned_user.role_id)
             if user_role and user_role.hierarchy_level == 2:
                 # Additional validation for Sales Managers: can only assign to their own team
-                current_role = db.query(Role).filter(Role.id == current_user.role_id).first()
+                current_role = current_user.role
                 if current_role and current_role.role_name == "Sales Manager":
                     if assigned_user.manager_id != current_user.id:
                         raise HTTPException(
@@ -353,6 +440,29 @@ def convert_submission(
                 assigned_to_id = assigned_user.id
                 assigned_name = assigned_user.name
     
+    return assigned_to_id, assigned_name
+
+@router.post("/convert/{submission_id}", response_model=ConvertedLeadOut)
+def convert_submission(
+    submission_id: int, 
+    request: ConvertRequest, 
+    db: Session = Depends(db_session),
+    current_user: Principal = Depends(check_permission("convert_to_lead", write_access=True))
+):
+    from fastapi import HTTPException, status
+    sub = db.query(Submission).filter(Submission.id==submission_id).first()
+    if not sub:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Submission not found")
+    
+    # Set source_type to 'Website' (category) and source to form name (specific source)
+    source_type = 'Website'  # Category: always 'Website' for form submissions
+    source = source_for_form_type(sub.form_type)  # Specific form name
+    
+    assigned_to_id, assigned_name = _resolve_convert_assignee(db, current_user, request)
+    
+    # Converting anyway is allowed; the response flags the leads this one duplicates
+    existing = existing_lead_ids(db, [sub.email]).get(normalize_email(sub.email), [])
+    
     lead = Lead(
         name=sub.name, 
         email=sub.email, 
@@ -378,14 +488,86 @@ def convert_submission(
     # Log the conversion
     log_lead_conversion(db, current_user.id, submission_id, lead.id)
     
-    # Normalize source before returning (should already be correct, but ensure consistency)
-    return normalize_lead_source(lead)
+    # With the ids of earlier leads sharing its email
+    return ConvertedLeadOut.model_validate(lead).model_copy(update={"existing_lead_ids": existing})
+
+@router.post("/convert", response_model=BatchConvertOut)
+def convert_submissions(
+    request: BatchConvertRequest,
+    db: Session = Depends(db_session),
+    current_user: Principal = Depends(check_permission("convert_to_lead", write_access=True))
+):
+    """
+    Convert many submissions into leads in one transaction, all with the same
+    assignee and designation. Submissions already linked to a lead are left
+    as they are; results reports what happened to each requested id, in order.
+    """
+    from fastapi import HTTPException, status
+    submission_ids = list(dict.fromkeys(request.submission_ids))
+    if not submission_ids or len(submission_ids) > BULK_LEADS_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"submission_ids must contain between 1 and {BULK_LEADS_MAX} ids"
+        )
+    
+    # Validated once for the whole batch
+    assigned_to_id, assigned_name = _resolve_convert_assignee(db, current_user, request)
+    
+    submissions = {}
+    for chunk in chunked(submission_ids):
+        submissions.update((sub.id, sub) for sub in db.query(Submission).filter(Submission.id.in_(chunk)))
+    to_convert = [submissions[sid] for sid in submission_ids if sid in submissions and submissions[sid].lead_id is None]
+    
+    # Leads that already have these emails, looked up before the new ones exist
+    taken = {}
+    for chunk in chunked([sub.email for sub in to_convert]):
+        taken.update(existing_lead_ids(db, chunk))
+    
+    lead_ids = leads_from_submissions(
+        db,
+        to_convert,
+        assigned=assigned_name,
+        assigned_to=assigned_to_id,
+        created_by=current_user.id,
+        designation=request.designation
+    )
+    
+    log_activities(db, [
+        {
+            'user_id': current_user.id,
+            'action_type': 'lead_converted',
+            'description': f"Converted form submission to lead #{lead_id} (Form: {sub.form_type}, Name: {sub.name})",
+            'entity_type': 'lead',
+            'entity_id': lead_id,
+            'metadata': {
+                'submission_id': sub.id,
+                'lead_id': lead_id,
+                'lead_name': sub.name,
+                'form_type': sub.form_type
+            }
+        }
+        for sub, lead_id in zip(to_convert, lead_ids)
+    ])
+    
+    # Built before commit: reading the expired submissions afterwards would reload each one
+    converted = {sub.id: (lead_id, taken.get(normalize_email(sub.email), [])) for sub, lead_id in zip(to_convert, lead_ids)}
+    results = []
+    for sid in submission_ids:
+        if sid in converted:
+            lead_id, existing = converted[sid]
+            results.append({"submission_id": sid, "status": "converted", "lead_id": lead_id, "existing_lead_ids": existing})
+        elif sid in submissions:
+            results.append({"submission_id": sid, "status": "already_converted", "lead_id": submissions[sid].lead_id})
+        else:
+            results.append({"submission_id": sid, "status": "not_found"})
+    db.commit()
+    return {"converted": len(lead_ids), "results": results}
 
 @router.delete("/{id}")
 def delete_lead(
     id: int,
     db: Session = Depends(db_session),
-    current_user: User = Depends(check_permission("leads", write_access=True))
+    current_user: Principal = Depends(check_permission("leads", write_access=True))
 ):
     """Delete a lead and all related data"""
     from fastapi import HTTPException, status
@@ -407,8 +589,8 @@ def delete_lead(
     
     # Check permissions - Admin and Sales Manager can delete any lead
     # Sales Executive can only delete leads assigned to them
-    role = db.query(Role).filter(Role.id == current_user.role_id).first()
-    if role and (role.role_name == "Admin" or role.role_name == "Sales Manager" or role.permissions.get("all")):
+    role = current_user.role
+    if role and (role.role_name == "Admin" or role.role_name == "Sales Manager" or has(current_user, "all")):
         # Admin/Sales Manager can delete any lead
         pass
     else:
@@ -482,3 +664,205 @@ def delete_lead(
             "submissions_updated": submissions_updated
         }
     }
+
+def _visible_leads(db: Session, current_user: Principal, lead_ids, scope=scope_leads) -> dict:
+    """
+    Lead id -> (id, name, email, company, status) row for a set of leads that
+    must all exist and be within scope(query, db, current_user), by default the
+    leads current_user can see. Scope is checked once for the whole set, not
+    per lead.
+    """
+    from fastapi import HTTPException, status
+    leads = {}
+    for chunk in chunked(lead_ids):
+        query = db.query(Lead.id, Lead.name, Lead.email, Lead.company, Lead.status).filter(Lead.id.in_(chunk))
+        leads.update((row.id, row) for row in scope(query, db, current_user))
+    if len(leads) != len(lead_ids):
+        hidden = [lead_id for lead_id in lead_ids if lead_id not in leads]
+        existing = set()
+        for chunk in chunked(hidden):
+            existing.update(lead_id for (lead_id,) in db.query(Lead.id).filter(Lead.id.in_(chunk)))
+        missing = [lead_id for lead_id in hidden if lead_id not in existing]
+        if missing:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Leads not found: {missing}")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Not authorized to modify leads: {[lead_id for lead_id in hidden if lead_id in existing]}"
+        )
+    return leads
+
+# Bulk operation -> permission it needs (the same as the single-lead endpoint)
+BULK_OPERATIONS = {
+    "assign": "lead_status_update",
+    "set_status": "lead_status_update",
+    "set_stage": "lead_status_update",
+    "set_follow_up": "lead_status_update",
+    "delete": "leads",
+}
+_FOLLOW_UP_FIELDS = ("follow_up_required", "follow_up_date", "follow_up_time", "follow_up_status")
+
+@router.post("/bulk")
+def bulk_update_leads(
+    payload: LeadBulkRequest,
+    db: Session = Depends(db_session),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Apply one operation (assign, set_status, set_stage, set_follow_up or delete)
+    to many leads in a single transaction. Every lead must exist and be visible
+    to the current user (for delete: deletable by them, as for a single lead),
+    otherwise nothing is changed.
+    """
+    from fastapi import HTTPException, status
+    permission = BULK_OPERATIONS.get(payload.operation)
+    if permission is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown bulk operation '{payload.operation}'. Use one of: {', '.join(BULK_OPERATIONS)}"
+        )
+    if not has(current_user, permission, write=True):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Not enough permissions. Write access required for: {permission}"
+        )
+    lead_ids = sorted(set(payload.lead_ids))
+    if not lead_ids or len(lead_ids) > BULK_LEADS_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"lead_ids must contain between 1 and {BULK_LEADS_MAX} ids"
+        )
+    
+    # Deleting follows DELETE /leads/{id}: Sales Managers may delete leads outside their team
+    scope = scope_lead_deletes if payload.operation == "delete" else scope_leads
+    leads = _visible_leads(db, current_user, lead_ids, scope)
+    
+    fields = payload.dict(exclude_unset=True)
+    activities = []
+    result = {"ok": True, "operation": payload.operation}
+    
+    if payload.operation == "delete":
+        related = delete_leads(db, lead_ids)
+        totals = {}
+        for lead_id in lead_ids:
+            lead = leads[lead_id]
+            for key, count in related[lead_id].items():
+                totals[key] = totals.get(key, 0) + count
+            activities.append({
+                'user_id': current_user.id,
+                'action_type': 'lead_deleted',
+                'description': f"Deleted lead #{lead_id}: {lead.name} ({lead.email})",
+                'entity_type': 'lead',
+                'entity_id': lead_id,
+                'metadata': {
+                    'lead_id': lead_id,
+                    'lead_name': lead.name,
+                    'lead_email': lead.email,
+                    'lead_company': lead.company,
+                    'related_data_deleted': related[lead_id]
+                }
+            })
+        result["deleted"] = len(lead_ids)
+        result["related_data_deleted"] = totals
+    else:
+        if payload.operation == "assign":
+            if payload.assigned_to_id:
+                # Validate the assignee once for the whole batch
+                assigned_user = team_index.user(db, payload.assigned_to_id)
+                if not assigned_user:
+                    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Assigned user not found")
+                user_role = team_index.role(db, assigned_user.role_id)
+                if not user_role or user_role.hierarchy_level != 2:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Can only assign leads to Sales Executives"
+                    )
+                current_role = current_user.role
+                if current_role and current_role.role_name == "Sales Manager" and assigned_user.manager_id != current_user.id:
+                    raise HTTPException(
+                        status_code=status.HTTP_403_FORBIDDEN,
+                        detail="You can only assign leads to your own Sales Executives"
+                    )
+                # Whoever assigns is recorded as "Assigned By", as in update_lead
+                values = {Lead.assigned_to: assigned_user.id, Lead.assigned: assigned_user.name, Lead.created_by: current_user.id}
+            else:
+                values = {Lead.assigned_to: None, Lead.assigned: 'Unassigned'}
+        elif payload.operation == "set_status":
+            if not payload.status:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="status is required for set_status")
+            values = {Lead.status: payload.status}
+            for lead_id in lead_ids:
+                lead = leads[lead_id]
+                if lead.status != payload.status:
+                    activities.append({
+                        'user_id': current_user.id,
+                        'action_type': 'status_changed',
+                        'description': f"Changed lead #{lead_id} status from '{lead.status}' to '{payload.status}' (Lead: {lead.name})",
+                        'entity_type': 'lead',
+                        'entity_id': lead_id,
+                        'metadata': {
+                            'lead_id': lead_id,
+                            'lead_name': lead.name,
+                            'old_status': lead.status,
+                            'new_status': payload.status
+                        }
+                    })
+        elif payload.operation == "set_stage":
+            if "stage" not in fields:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="stage is required for set_stage")
+            values = {Lead.stage: payload.stage}
+        else:
+            values = {getattr(Lead, key): fields[key] for key in _FOLLOW_UP_FIELDS if key in fields}
+            if not values:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"set_follow_up needs at least one of: {', '.join(_FOLLOW_UP_FIELDS)}"
+                )
+        result["updated"] = update_leads(db, lead_ids, values)
+    
+    log_activities(db, activities)
+    db.commit()
+    return result
+
+@router.post("/{id}/merge")
+def merge_duplicate_leads(
+    id: int,
+    payload: LeadMergeRequest,
+    db: Session = Depends(db_session),
+    current_user: Principal = Depends(check_permission("leads", write_access=True))
+):
+    """
+    Merge duplicate leads into lead id in one transaction: their comments,
+    call logs, reminders, tags and submissions move to it and the duplicates
+    are deleted. All the leads must be visible to the current user.
+    """
+    from fastapi import HTTPException, status
+    duplicate_ids = sorted(set(payload.duplicate_ids))
+    if id in duplicate_ids:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="A lead cannot be merged into itself")
+    if not duplicate_ids or len(duplicate_ids) > BULK_LEADS_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"duplicate_ids must contain between 1 and {BULK_LEADS_MAX} ids"
+        )
+    leads = _visible_leads(db, current_user, [id, *duplicate_ids])
+    survivor = leads[id]
+    
+    moved = merge_leads(db, id, duplicate_ids)
+    log_activities(db, [{
+        'user_id': current_user.id,
+        'action_type': 'leads_merged',
+        'description': f"Merged {len(duplicate_ids)} duplicate lead(s) into lead #{id} (Lead: {survivor.name})",
+        'entity_type': 'lead',
+        'entity_id': id,
+        'metadata': {
+            'lead_id': id,
+            'lead_name': survivor.name,
+            'merged_leads': [
+                {'id': lead_id, 'name': leads[lead_id].name, 'email': leads[lead_id].email, 'company': leads[lead_id].company}
+                for lead_id in duplicate_ids
+            ],
+            'moved': moved
+        }
+    }])
+    db.commit()
+    return {"ok": True, "lead_id": id, "merged": duplicate_ids, "moved": moved}
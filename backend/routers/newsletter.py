@@ -5,6 +5,7 @@ from models.newsletter import Newsletter
 from models.user import User
 from schemas.newsletter import NewsletterCreate, NewsletterOut
 from routers.auth import get_current_active_user
+from services.principal_cache import Principal
 
 router = APIRouter(prefix="/newsletter", tags=["Newsletter"])
 
@@ -18,7 +19,7 @@ def db_session():
 @router.get("/", response_model=list[NewsletterOut])
 def list_all(
     db: Session = Depends(db_session),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     return db.query(Newsletter).all()
 
@@ -26,7 +27,7 @@ def list_all(
 def add(
     item: NewsletterCreate, 
     db: Session = Depends(db_session),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     entry = Newsletter(**item.dict())
     db.add(entry)
@@ -38,7 +39,7 @@ def add(
 def toggle(
     id: int, 
     db: Session = Depends(db_session),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     sub = db.query(Newsletter).filter(Newsletter.id==id).first()
     sub.active = not sub.active
@@ -11,6 +11,9 @@ from models.reminder import Reminder
 from models.user import User
 from schemas.reminder import ReminderCreate, ReminderOut, ReminderUpdate
 from routers.auth import get_current_active_user, check_permission
+from services.principal_cache import Principal
+from services.permissions import has
+from services.lead_queries import reminders_on_live_leads
 from models.lead import Lead
 from models.role import Role
 
@@ -30,7 +33,7 @@ def list_reminders(
     completed: Optional[bool] = Query(None),
     upcoming_only: bool = Query(False),
     db: Session = Depends(db_session),
-    current_user: User = Depends(check_permission("reminders"))
+    current_user: Principal = Depends(check_permission("reminders"))
 ):
     """List reminders with optional filters"""
     from models.lead import Lead
@@ -46,9 +49,7 @@ def list_reminders(
         query = query.filter(Reminder.user_id == user_id)
     else:
         # Non-admin users only see their own reminders
-        from models.role import Role
-        role = db.query(Role).filter(Role.id == current_user.role_id).first()
-        if not role or not role.permissions.get("all"):
+        if not has(current_user, "all"):
             query = query.filter(Reminder.user_id == current_user.id)
     
     # Filter by completion status
@@ -63,12 +64,7 @@ def list_reminders(
         )
     
     # Filter out reminders linked to deleted leads
-    # Only show reminders where lead_id is NULL or the lead still exists
-    from sqlalchemy import exists
-    lead_exists = exists().where(Lead.id == Reminder.lead_id)
-    query = query.filter(
-        (Reminder.lead_id == None) | lead_exists
-    )
+    query = reminders_on_live_leads(query)
     
     return query.order_by(Reminder.due_date.asc()).all()
 
@@ -76,7 +72,7 @@ def list_reminders(
 def create_reminder(
     payload: ReminderCreate,
     db: Session = Depends(db_session),
-    current_user: User = Depends(get_current_active_user)  # Allow all authenticated users
+    current_user: Principal = Depends(get_current_active_user)  # Allow all authenticated users
 ):
     """Create a new reminder"""
     # Validate status
@@ -91,11 +87,8 @@ def create_reminder(
             raise HTTPException(status_code=404, detail="Lead not found")
         
         # Check if user has permission or if lead is assigned to them
-        role = db.query(Role).filter(Role.id == current_user.role_id).first()
-        permissions = role.permissions if role else {}
-        
         # Admin and users with "leads" permission can create reminders for any lead
-        if not (permissions.get("all") == True or permissions.get("leads") == True):
+        if not has(current_user, "leads", write=True):
             # For read-only users, only allow if lead is assigned to them
             if lead.assigned_to != current_user.id and lead.assigned != current_user.name:
                 raise HTTPException(
@@ -120,7 +113,7 @@ def create_reminder(
 def get_reminder(
     id: int,
     db: Session = Depends(db_session),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Get a specific reminder"""
     reminder = db.query(Reminder).filter(Reminder.id == id).first()
@@ -128,9 +121,7 @@ def get_reminder(
         raise HTTPException(status_code=404, detail="Reminder not found")
     
     # Check if user has access (own reminder or admin)
-    from models.role import Role
-    role = db.query(Role).filter(Role.id == current_user.role_id).first()
-    if not role or not role.permissions.get("all"):
+    if not has(current_user, "all"):
         if reminder.user_id != current_user.id:
             raise HTTPException(status_code=403, detail="Not authorized to view this reminder")
     
@@ -141,7 +132,7 @@ def update_reminder(
     id: int,
     payload: ReminderUpdate,
     db: Session = Depends(db_session),
-    current_user: User = Depends(check_permission("reminders", write_access=True))
+    current_user: Principal = Depends(check_permission("reminders", write_access=True))
 ):
     """Update a reminder"""
     reminder = db.query(Reminder).filter(Reminder.id == id).first()
@@ -149,9 +140,7 @@ def update_reminder(
         raise HTTPException(status_code=404, detail="Reminder not found")
     
     # Check if user has access
-    from models.role import Role
-    role = db.query(Role).filter(Role.id == current_user.role_id).first()
-    if not role or not role.permissions.get("all"):
+    if not has(current_user, "all"):
         if reminder.user_id != current_user.id:
             raise HTTPException(status_code=403, detail="Not authorized to update this reminder")
     
@@ -190,7 +179,7 @@ def update_reminder(
 def delete_reminder(
     id: int,
     db: Session = Depends(db_session),
-    current_user: User = Depends(check_permission("reminders", write_access=True))
+    current_user: Principal = Depends(check_permission("reminders", write_access=True))
 ):
     """Delete a reminder"""
     reminder = db.query(Reminder).filter(Reminder.id == id).first()
@@ -198,9 +187,7 @@ def delete_reminder(
         raise HTTPException(status_code=404, detail="Reminder not found")
     
     # Check if user has access
-    from models.role import Role
-    role = db.query(Role).filter(Role.id == current_user.role_id).first()
-    if not role or not role.permissions.get("all"):
+    if not has(current_user, "all"):
         if reminder.user_id != current_user.id:
             raise HTTPException(status_code=403, detail="Not authorized to delete this reminder")
     
@@ -211,7 +198,7 @@ def delete_reminder(
 @router.get("/my/upcoming", response_model=List[ReminderOut])
 def get_my_upcoming_reminders(
     db: Session = Depends(db_session),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Get current user's upcoming reminders"""
     now = datetime.utcnow()
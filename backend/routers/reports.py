@@ -1,16 +1,15 @@
 """
 Reports router for team and organization performance metrics
 """
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
-from typing import Dict, List
 from database import SessionLocal
-from models.lead import Lead
-from models.call_log import CallLog
-from models.user import User
-from models.role import Role
 from routers.auth import get_current_active_user, check_permission
+from services.team_index import team_index, MANAGER_ROLE_NAME
+from services.principal_cache import Principal
+from services.performance import user_metrics, combine_metrics
+from services.report_snapshots import TREND_BUCKETS, trend_series
 
 router = APIRouter(prefix="/reports", tags=["Reports"])
 
@@ -24,16 +23,14 @@ def db_session():
 @router.get("/team-performance")
 def get_team_performance(
     db: Session = Depends(db_session),
-    current_user: User = Depends(check_permission("reports"))
+    current_user: Principal = Depends(check_permission("reports"))
 ):
     """
     Get team performance metrics for Sales Manager.
     Returns performance data for all sales executives under the manager's team.
     """
-    from models.role import Role
-    
     # Get current user's role
-    role = db.query(Role).filter(Role.id == current_user.role_id).first()
+    role = current_user.role
     if not role:
         raise HTTPException(status_code=404, detail="Role not found")
     
@@ -41,64 +38,29 @@ def get_team_performance(
     if role.role_name not in ["Sales Manager", "Admin"]:
         raise HTTPException(status_code=403, detail="Only Sales Managers and Admins can view team performance")
     
-    # Get all Sales Executive users (hierarchy_level = 2) under this manager
-    sales_exec_role = db.query(Role).filter(Role.hierarchy_level == 2).first()
-    if not sales_exec_role:
-        return []
-    
-    # Filter executives by manager_id if current user is Sales Manager
+    # Sales Executives under this manager (Admin sees all executives)
     if role.role_name == "Sales Manager":
-        sales_executives = db.query(User).filter(
-            User.role_id == sales_exec_role.id,
-            User.manager_id == current_user.id
-        ).all()
+        executive_ids = team_index.team_of(db, current_user.id)
     else:
-        # Admin can see all executives
-        sales_executives = db.query(User).filter(User.role_id == sales_exec_role.id).all()
+        executive_ids = team_index.executive_ids(db)
+    sales_executives = sorted(team_index.users(db, executive_ids), key=lambda u: u.id)
     
+    metrics = user_metrics(db, (exec_user.id for exec_user in sales_executives))
     team_data = []
     for exec_user in sales_executives:
-        # Get leads assigned to this executive
-        leads = db.query(Lead).filter(Lead.assigned_to == exec_user.id).all()
-        total_leads = len(leads)
-        
-        # Count leads by status
-        status_counts = {}
-        for lead in leads:
-            status_counts[lead.status] = status_counts.get(lead.status, 0) + 1
-        
-        # Get call logs for this executive
-        call_logs = db.query(CallLog).filter(CallLog.user_id == exec_user.id).all()
-        total_calls = len(call_logs)
-        
-        # Calculate conversion rate (Closed Won / Total Leads)
-        closed_won = status_counts.get("Closed Won", 0) + status_counts.get("Won", 0)
-        conversion_rate = (closed_won / total_leads * 100) if total_leads > 0 else 0
-        
-        # Calculate total Project Value from call logs
-        total_dollar_value = sum(log.dollar_value or 0 for log in call_logs if log.dollar_value)
-        
-        # Count secured orders
-        secured_orders = sum(1 for log in call_logs if log.secured_order)
-        
-        # Get stage distribution
-        stage_counts = {}
-        for log in call_logs:
-            if log.stage:
-                stage_counts[log.stage] = stage_counts.get(log.stage, 0) + 1
-        
+        exec_metrics = metrics[exec_user.id]
         team_data.append({
             "user_id": exec_user.id,
             "user_name": exec_user.name,
             "user_email": exec_user.email,
-            "total_leads": total_leads,
-            "total_calls": total_calls,
-            "conversion_rate": round(conversion_rate, 2),
-            "total_dollar_value": round(total_dollar_value, 2),
-            "secured_orders": secured_orders,
-            "status_counts": status_counts,
-            "stage_distribution": stage_counts,
-            "closed_won": closed_won
+            "total_leads": exec_metrics["total_leads"],
+            "total_calls": exec_metrics["total_calls"],
+            "conversion_rate": round(exec_metrics["conversion_rate"], 2),
+            "total_dollar_value": round(exec_metrics["total_dollar_value"], 2),
+            "secured_orders": exec_metrics["secured_orders"],
+            "status_counts": exec_metrics["status_counts"],
+            "stage_distribution": exec_metrics["stage_distribution"],
+            "closed_won": exec_metrics["closed_won"]
         })
     
     return team_data
@@ -106,16 +68,14 @@ def get_team_performance(
 @router.get("/org-performance")
 def get_org_performance(
     db: Session = Depends(db_session),
-    current_user: User = Depends(check_permission("reports"))
+    current_user: Principal = Depends(check_permission("reports"))
 ):
     """
     Get organization-wide performance metrics for Admin.
     Returns performance data grouped by Sales Manager and their teams.
     """
-    from models.role import Role
-    
     # Get current user's role
-    role = db.query(Role).filter(Role.id == current_user.role_id).first()
+    role = current_user.role
     if not role:
         raise HTTPException(status_code=404, detail="Role not found")
     
@@ -124,100 +84,81 @@ def get_org_performance(
         raise HTTPException(status_code=403, detail="Only Admins can view organization performance")
     
     # Get all Sales Managers
-    manager_role = db.query(Role).filter(Role.role_name == "Sales Manager").first()
-    if not manager_role:
-        return []
+    managers = sorted(team_index.users_with_role(db, MANAGER_ROLE_NAME), key=lambda u: u.id)
     
-    managers = db.query(User).filter(User.role_id == manager_role.id).all()
-    
-    # Get all Sales Executives
-    exec_role = db.query(Role).filter(Role.hierarchy_level == 2).first()
-    if not exec_role:
-        return []
-    
-    sales_executives = db.query(User).filter(User.role_id == exec_role.id).all()
+    teams = {
+        manager.id: sorted(team_index.users(db, team_index.team_of(db, manager.id)), key=lambda u: u.id)
+        for manager in managers
+    }
+    # One set of grouped queries for every executive in the organization
+    metrics = user_metrics(db, (exec_user.id for team in teams.values() for exec_user in team))
     
     org_data = []
     for manager in managers:
-        # For each manager, aggregate data from sales executives under this manager
-        # Filter executives by manager_id
-        manager_executives = [exec for exec in sales_executives if exec.manager_id == manager.id]
-        
+        manager_executives = teams[manager.id]
         manager_team_data = []
-        total_leads = 0
-        total_calls = 0
-        total_dollar_value = 0
-        total_secured_orders = 0
-        total_closed_won = 0
-        all_status_counts = {}
-        all_stage_counts = {}
-        
         for exec_user in manager_executives:
-            # Get leads assigned to this executive
-            leads = db.query(Lead).filter(Lead.assigned_to == exec_user.id).all()
-            exec_leads = len(leads)
-            total_leads += exec_leads
-            
-            # Count leads by status for this executive
-            exec_status_counts = {}
-            for lead in leads:
-                exec_status_counts[lead.status] = exec_status_counts.get(lead.status, 0) + 1
-                all_status_counts[lead.status] = all_status_counts.get(lead.status, 0) + 1
-            
-            # Get call logs for this executive
-            call_logs = db.query(CallLog).filter(CallLog.user_id == exec_user.id).all()
-            exec_calls = len(call_logs)
-            total_calls += exec_calls
-            
-            # Calculate Project Value
-            exec_dollar_value = sum(log.dollar_value or 0 for log in call_logs if log.dollar_value)
-            total_dollar_value += exec_dollar_value
-            
-            # Count secured orders
-            exec_secured = sum(1 for log in call_logs if log.secured_order)
-            total_secured_orders += exec_secured
-            
-            # Get stage distribution
-            for log in call_logs:
-                if log.stage:
-                    all_stage_counts[log.stage] = all_stage_counts.get(log.stage, 0) + 1
-            
-            # Calculate conversion rate for this executive (using exec-specific status counts)
-            exec_closed_won = exec_status_counts.get("Closed Won", 0) + exec_status_counts.get("Won", 0)
-            exec_conversion_rate = (exec_closed_won / exec_leads * 100) if exec_leads > 0 else 0
-            
+            exec_metrics = metrics[exec_user.id]
             manager_team_data.append({
                 "user_id": exec_user.id,
                 "user_name": exec_user.name,
                 "user_email": exec_user.email,
-                "total_leads": exec_leads,
-                "total_calls": exec_calls,
-                "conversion_rate": round(exec_conversion_rate, 2),
-                "total_dollar_value": round(exec_dollar_value, 2),
-                "secured_orders": exec_secured,
-                "closed_won": exec_closed_won
+                "total_leads": exec_metrics["total_leads"],
+                "total_calls": exec_metrics["total_calls"],
+                "conversion_rate": round(exec_metrics["conversion_rate"], 2),
+                "total_dollar_value": round(exec_metrics["total_dollar_value"], 2),
+                "secured_orders": exec_metrics["secured_orders"],
+                "closed_won": exec_metrics["closed_won"]
             })
         
-        # Calculate overall conversion rate
-        total_closed_won = all_status_counts.get("Closed Won", 0) + all_status_counts.get("Won", 0)
-        overall_conversion_rate = (total_closed_won / total_leads * 100) if total_leads > 0 else 0
-        
+        # Team totals; the conversion rate is over the whole team's leads
+        team_metrics = combine_metrics(metrics[exec_user.id] for exec_user in manager_executives)
         org_data.append({
             "manager_id": manager.id,
             "manager_name": manager.name,
             "manager_email": manager.email,
-            "total_leads": total_leads,
-            "total_calls": total_calls,
-            "conversion_rate": round(overall_conversion_rate, 2),
-            "total_dollar_value": round(total_dollar_value, 2),
-            "secured_orders": total_secured_orders,
-            "closed_won": total_closed_won,
-            "status_counts": all_status_counts,
-            "stage_distribution": all_stage_counts,
+            "total_leads": team_metrics["total_leads"],
+            "total_calls": team_metrics["total_calls"],
+            "conversion_rate": round(team_metrics["conversion_rate"], 2),
+            "total_dollar_value": round(team_metrics["total_dollar_value"], 2),
+            "secured_orders": team_metrics["secured_orders"],
+            "closed_won": team_metrics["closed_won"],
+            "status_counts": team_metrics["status_counts"],
+            "stage_distribution": team_metrics["stage_distribution"],
             "team": manager_team_data
         })
     
     return org_data
 
-
-
+@router.get("/trends")
+def get_trends(
+    date_from: date | None = Query(None, alias="from"),
+    date_to: date | None = Query(None, alias="to"),
+    bucket: str = Query("day", pattern=f"^({'|'.join(TREND_BUCKETS)})$"),
+    db: Session = Depends(db_session),
+    current_user: Principal = Depends(check_permission("reports"))
+):
+    """
+    Performance metrics over time, from the daily report snapshots: the last
+    snapshot of each day, week or month between from and to (default: the
+    last 30 days). Sales Managers get their own executives and team totals,
+    Admins every executive and team.
+    """
+    role = current_user.role
+    if not role:
+        raise HTTPException(status_code=404, detail="Role not found")
+    if role.role_name not in ["Sales Manager", "Admin"]:
+        raise HTTPException(status_code=403, detail="Only Sales Managers and Admins can view performance trends")
+    
+    date_to = date_to or date.today()
+    date_from = date_from or date_to - timedelta(days=30)
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    
+    manager_id = current_user.id if role.role_name == "Sales Manager" else None
+    return {
+        "from": date_from.isoformat(),
+        "to": date_to.isoformat(),
+        "bucket": bucket,
+        "series": trend_series(db, date_from, date_to, bucket, manager_id=manager_id)
+    }
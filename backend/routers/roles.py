@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.orm import Session
 from database import SessionLocal
 from models.role import Role
 from models.user import User
 from schemas.role import RoleCreate, RoleOut, RoleUpdate
 from routers.auth import get_current_active_user, check_permission
+from services.principal_cache import Principal, principal_cache
+from services.token_registry import token_registry
+from services.permissions import permission_registry
+from services.team_index import team_index
+from services.change_tracker import list_etag, etag_matches, cache_headers
+from config import AUTH_MODE
 
 router = APIRouter(prefix="/roles", tags=["Roles"])
 
@@ -17,21 +23,29 @@ def db_session():
 
 @router.get("/", response_model=list[RoleOut])
 def list_roles(
+    request: Request,
+    response: Response,
     db: Session = Depends(db_session),
-    current_user: User = Depends(check_permission("roles"))
+    current_user: Principal = Depends(check_permission("roles"))
 ):
+    etag = list_etag(db, ("roles",), current_user, request)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cache_headers(etag))
+    response.headers.update(cache_headers(etag))
     return db.query(Role).all()
 
 @router.post("/", response_model=RoleOut)
 def create_role(
     payload: RoleCreate, 
     db: Session = Depends(db_session),
-    current_user: User = Depends(check_permission("roles"))
+    current_user: Principal = Depends(check_permission("roles"))
 ):
     r = Role(**payload.dict())
     db.add(r)
     db.commit()
     db.refresh(r)
+    permission_registry.compile_role(r)
+    team_index.upsert_role(r)
     return r
 
 @router.patch("/{id}", response_model=RoleOut)
@@ -39,7 +53,7 @@ def update_role(
     id: int, 
     payload: RoleUpdate, 
     db: Session = Depends(db_session),
-    current_user: User = Depends(check_permission("roles"))
+    current_user: Principal = Depends(check_permission("roles"))
 ):
     r = db.query(Role).filter(Role.id==id).first()
     if not r:
@@ -49,19 +63,30 @@ def update_role(
     for key, value in update_data.items():
         setattr(r, key, value)
     
+    # Stateless tokens embed the role name and permissions, so revoke those issued for this role
+    if AUTH_MODE == "stateless":
+        token_registry.bump_role(db, r.id)
     db.add(r)
     db.commit()
     db.refresh(r)
+    permission_registry.compile_role(r)
+    team_index.upsert_role(r)
+    principal_cache.invalidate_role(r.id)
     return r
 
 @router.delete("/{id}")
 def delete_role(
     id: int, 
     db: Session = Depends(db_session),
-    current_user: User = Depends(check_permission("roles"))
+    current_user: Principal = Depends(check_permission("roles"))
 ):
     r = db.query(Role).filter(Role.id==id).first()
     if r:
+        if AUTH_MODE == "stateless":
+            token_registry.bump_role(db, r.id)
         db.delete(r)
         db.commit()
+        permission_registry.drop_role(id)
+        team_index.remove_role(id)
+        principal_cache.invalidate_role(id)
     return {"ok": True}
@@ -0,0 +1,39 @@
+"""
+Search router: full-text search over leads, comments and call-log notes
+"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from schemas.search import SearchResults
+from routers.auth import check_permission
+from services.principal_cache import Principal
+from services.search_index import search
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+MAX_SEARCH_PAGE_SIZE = 100
+
+def db_session():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@router.get("/", response_model=SearchResults)
+def search_leads(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=MAX_SEARCH_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(db_session),
+    current_user: Principal = Depends(check_permission("leads"))
+):
+    """
+    Search lead names, emails and companies, comments and call-log notes.
+    Every word must match (as a prefix); results are ranked by relevance and
+    limited to the leads, and the call logs, the current user can see.
+    """
+    # One extra row tells whether there is a next page
+    hits = search(db, current_user, q, limit=limit + 1, offset=offset)
+    next_offset = offset + limit if len(hits) > limit else None
+    return {"query": q, "results": hits[:limit], "next_offset": next_offset}
@@ -6,6 +6,7 @@ from models.submission import Submission
 from models.user import User
 from schemas.submission import SubmissionCreate, SubmissionOut, FilterRequest
 from routers.auth import get_current_active_user, check_permission
+from services.principal_cache import Principal
 
 router = APIRouter(prefix="/submissions", tags=["Submissions"])
 
@@ -28,7 +29,7 @@ def create_submission(payload: SubmissionCreate, db: Session = Depends(db_sessio
 def list_submissions(
     form_type: str, 
     db: Session = Depends(db_session),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     return db.query(Submission).filter(Submission.form_type==form_type).all()
 
@@ -36,7 +37,7 @@ def list_submissions(
 def filter_submissions(
     req: FilterRequest, 
     db: Session = Depends(db_session),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     q = db.query(Submission).filter(Submission.form_type==req.form_type)
     # naive JSON filtering: match exact key=value in data
@@ -1,7 +1,7 @@
 """
 Tags router for managing custom tags
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from database import SessionLocal
@@ -10,6 +10,8 @@ from models.entity_tag import EntityTag
 from models.user import User
 from schemas.tag import TagCreate, TagOut, TagUpdate, EntityTagCreate, EntityTagOut
 from routers.auth import get_current_active_user, check_permission
+from services.principal_cache import Principal
+from services.change_tracker import list_etag, etag_matches, cache_headers
 
 router = APIRouter(prefix="/tags", tags=["Tags"])
 
@@ -22,11 +24,18 @@ def db_session():
 
 @router.get("/", response_model=List[TagOut])
 def list_tags(
+    request: Request,
+    response: Response,
     entity_type: Optional[str] = None,
     db: Session = Depends(db_session),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """List all tags, optionally filtered by entity_type"""
+    etag = list_etag(db, ("tags",), current_user, request)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cache_headers(etag))
+    response.headers.update(cache_headers(etag))
+    
     query = db.query(Tag)
     if entity_type:
         query = query.filter(Tag.entity_type == entity_type)
@@ -36,7 +45,7 @@ def list_tags(
 def create_tag(
     payload: TagCreate,
     db: Session = Depends(db_session),
-    current_user: User = Depends(check_permission("leads", write_access=True))
+    current_user: Principal = Depends(check_permission("leads", write_access=True))
 ):
     """Create a new tag"""
     # Check if tag with same name already exists
@@ -57,7 +66,7 @@ def update_tag(
     id: int,
     payload: TagUpdate,
     db: Session = Depends(db_session),
-    current_user: User = Depends(check_permission("leads", write_access=True))
+    current_user: Principal = Depends(check_permission("leads", write_access=True))
 ):
     """Update a tag"""
     tag = db.query(Tag).filter(Tag.id == id).first()
@@ -77,7 +86,7 @@ def update_tag(
 def delete_tag(
     id: int,
     db: Session = Depends(db_session),
-    current_user: User = Depends(check_permission("leads", write_access=True))
+    current_user: Principal = Depends(check_permission("leads", write_access=True))
 ):
     """Delete a tag and all its entity associations"""
     tag = db.query(Tag).filter(Tag.id == id).first()
@@ -97,7 +106,7 @@ def get_entity_tags(
     entity_type: str,
     entity_id: int,
     db: Session = Depends(db_session),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Get all tags for a specific entity"""
     entity_tags = db.query(EntityTag).filter(
@@ -118,7 +127,7 @@ def add_tag_to_entity(
     entity_id: int,
     tag_id: int = Query(..., description="Tag ID to add"),
     db: Session = Depends(db_session),
-    current_user: User = Depends(check_permission("leads", write_access=True))
+    current_user: Principal = Depends(check_permission("leads", write_access=True))
 ):
     """Add a tag to an entity"""
     # Check if tag exists
@@ -152,7 +161,7 @@ def remove_tag_from_entity(
     entity_id: int,
     tag_id: int,
     db: Session = Depends(db_session),
-    current_user: User = Depends(check_permission("leads", write_access=True))
+    current_user: Principal = Depends(check_permission("leads", write_access=True))
 ):
     """Remove a tag from an entity"""
     entity_tag = db.query(EntityTag).filter(
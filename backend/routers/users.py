@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from database import SessionLocal
 from models.user import User
 from schemas.user import UserCreate, UserOut, UserUpdate
-from passlib.hash import bcrypt
 from routers.auth import get_current_active_user, check_permission, get_current_user, can_manage_role
+from services.principal_cache import Principal, principal_cache
+from services.permissions import has
+from services.token_registry import token_registry
+from config import AUTH_MODE
 from services.activity_logger import log_user_action
+from services.passwords import hash_password
+from services.team_index import team_index
+from services.change_tracker import list_etag, etag_matches, cache_headers
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -16,10 +22,25 @@ def db_session():
     finally:
         db.close()
 
+def _user_dict(db: Session, user) -> dict:
+    """User listing entry with role_name and manager_name resolved from the team index"""
+    user_role = team_index.role(db, user.role_id)
+    return {
+        "id": user.id,
+        "name": user.name,
+        "email": user.email,
+        "role_id": user.role_id,
+        "role_name": user_role.role_name if user_role else None,
+        "manager_id": user.manager_id,
+        "manager_name": team_index.user_name(db, user.manager_id) if user.manager_id else None
+    }
+
 @router.get("/")
 def list_users(
+    request: Request,
+    response: Response,
     db: Session = Depends(db_session),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     role: str | None = None,
     manager_id: int | None = None
 ):
@@ -30,18 +51,14 @@ def list_users(
     - Sales Manager: Can only view their own team members (when manager_id matches their ID)
     - Others: Require "users" permission
     """
-    from models.role import Role
     from fastapi import HTTPException, status
     
     # Get current user's role
-    current_role = db.query(Role).filter(Role.id == current_user.role_id).first()
+    current_role = current_user.role
     current_role_name = current_role.role_name if current_role else None
     
     # Check permissions
-    has_users_permission = False
-    if current_role:
-        permissions = current_role.permissions if current_role.permissions else {}
-        has_users_permission = permissions.get("all") == True or permissions.get("users") == True
+    has_users_permission = has(current_user, "users", write=True)
     
     # Admin can view all users
     if current_role_name == "Admin":
@@ -63,105 +80,56 @@ def list_users(
             detail="You don't have permission to view users"
         )
     
-    query = db.query(User)
+    etag = list_etag(db, ("users",), current_user, request)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cache_headers(etag))
+    response.headers.update(cache_headers(etag))
+    
+    # Served from the team index: no users/roles queries on a warm index
+    users = team_index.users(db, team_index.all_user_ids(db))
     
     if role:
-        role_obj = db.query(Role).filter(Role.role_name == role).first()
+        role_obj = team_index.role_by_name(db, role)
         if role_obj:
-            query = query.filter(User.role_id == role_obj.id)
+            users = [user for user in users if user.role_id == role_obj.id]
     
     if manager_id is not None:
-        query = query.filter(User.manager_id == manager_id)
-    
-    users = query.all()
-    
-    # Add manager_name and role_name to each user
-    result = []
-    roles_dict = {r.id: r for r in db.query(Role).all()}
-    for user in users:
-        user_role = roles_dict.get(user.role_id)
-        user_dict = {
-            "id": user.id,
-            "name": user.name,
-            "email": user.email,
-            "role_id": user.role_id,
-            "role_name": user_role.role_name if user_role else None,
-            "manager_id": user.manager_id,
-            "manager_name": None
-        }
-        if user.manager_id:
-            manager = db.query(User).filter(User.id == user.manager_id).first()
-            if manager:
-                user_dict["manager_name"] = manager.name
-        result.append(user_dict)
+        users = [user for user in users if user.manager_id == manager_id]
     
-    return result
+    return [_user_dict(db, user) for user in users]
 
 @router.get("/assignable", response_model=list[UserOut])
 def list_assignable_users(
+    request: Request,
+    response: Response,
     db: Session = Depends(db_session),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Get list of users that can be assigned leads.
     Only returns Sales Executives (hierarchy_level = 2), excludes Marketing (level 3).
     Includes manager information.
     """
-    from models.role import Role
-    # Only get Sales Executives (hierarchy_level = 2), exclude Marketing (level 3)
-    # Filter by both hierarchy_level and role_name to be extra safe
-    assignable_roles = db.query(Role).filter(
-        Role.hierarchy_level == 2,
-        Role.role_name == 'Sales Executive'
-    ).all()
-    role_ids = [role.id for role in assignable_roles]
-    
-    if not role_ids:
-        return []
-    
-    # Check if current user is a Sales Manager - if so, filter by manager_id
-    current_role = db.query(Role).filter(Role.id == current_user.role_id).first()
-    users_query = db.query(User).filter(User.role_id.in_(role_ids))
+    etag = list_etag(db, ("users",), current_user, request)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cache_headers(etag))
+    response.headers.update(cache_headers(etag))
     
+    # Only Sales Executives are assignable (Marketing is never included).
     # For Sales Managers: only show their own team members
+    current_role = current_user.role
     if current_role and current_role.role_name == "Sales Manager":
-        users_query = users_query.filter(User.manager_id == current_user.id)
-    
-    users = users_query.all()
+        user_ids = team_index.assignable_ids(db, manager_id=current_user.id)
+    else:
+        user_ids = team_index.assignable_ids(db)
     
-    # Add manager_name and role_name to each user, and double-check to exclude Marketing
-    result = []
-    for user in users:
-        # Get role name for filtering
-        user_role = db.query(Role).filter(Role.id == user.role_id).first()
-        role_name = user_role.role_name if user_role else None
-        
-        # Double-check: exclude Marketing users explicitly
-        if role_name == 'Marketing':
-            continue
-        
-        user_dict = {
-            "id": user.id,
-            "name": user.name,
-            "email": user.email,
-            "role_id": user.role_id,
-            "role_name": role_name,
-            "manager_id": user.manager_id,
-            "manager_name": None
-        }
-        if user.manager_id:
-            manager = db.query(User).filter(User.id == user.manager_id).first()
-            if manager:
-                user_dict["manager_name"] = manager.name
-        result.append(user_dict)
-    
-    return result
+    return [_user_dict(db, user) for user in team_index.users(db, sorted(user_ids))]
 
 @router.post("/", response_model=UserOut)
 def create_user(
     payload: UserCreate, 
     db: Session = Depends(db_session),
-    current_user: User = Depends(check_permission("users"))
+    current_user: Principal = Depends(check_permission("users"))
 ):
     from models.role import Role
     
@@ -181,7 +149,7 @@ def create_user(
     
     # If creating Sales Executive and current user is Sales Manager, auto-set manager_id
     if new_role.role_name == 'Sales Executive':
-        current_user_role = db.query(Role).filter(Role.id == current_user.role_id).first()
+        current_user_role = current_user.role
         if current_user_role and current_user_role.role_name == 'Sales Manager':
             manager_id = current_user.id  # Sales Managers can only create under themselves
     
@@ -189,7 +157,7 @@ def create_user(
     if new_role.role_name == 'Marketing':
         manager_id = None
     
-    hashed = bcrypt.hash(payload.password)
+    hashed = hash_password(payload.password)
     u = User(
         name=payload.name, 
         email=payload.email, 
@@ -200,6 +168,8 @@ def create_user(
     db.add(u)
     db.commit()
     db.refresh(u)
+    token_registry.register(u)
+    team_index.upsert_user(u)
     
     # Log user creation
     log_user_action(db, current_user.id, 'user_created', u.id, u.name)
@@ -214,9 +184,7 @@ def create_user(
         "manager_name": None
     }
     if u.manager_id:
-        manager = db.query(User).filter(User.id == u.manager_id).first()
-        if manager:
-            result["manager_name"] = manager.name
+        result["manager_name"] = team_index.user_name(db, u.manager_id)
     
     return result
 
@@ -225,7 +193,7 @@ def update_user(
     id: int, 
     payload: UserUpdate, 
     db: Session = Depends(db_session),
-    current_user: User = Depends(check_permission("users"))
+    current_user: Principal = Depends(check_permission("users"))
 ):
     from models.role import Role
     
@@ -247,14 +215,25 @@ def update_user(
     
     update_data = payload.dict(exclude_unset=True)
     if 'password' in update_data:
-        update_data['hashed_password'] = bcrypt.hash(update_data.pop('password'))
+        update_data['hashed_password'] = hash_password(update_data.pop('password'))
+    
+    # Password and role changes revoke issued tokens. In stateless mode every
+    # field here is trusted from the JWT claims, so any change does.
+    changed_fields = {key for key, value in update_data.items() if getattr(u, key) != value}
+    if AUTH_MODE != "stateless":
+        changed_fields &= {"hashed_password", "role_id"}
     
     for key, value in update_data.items():
         setattr(u, key, value)
     
+    if changed_fields:
+        token_registry.bump(db, u)
+    
     db.add(u)
     db.commit()
     db.refresh(u)
+    principal_cache.invalidate_user(u.id)
+    team_index.upsert_user(u)
     
     # Log user update
     log_user_action(db, current_user.id, 'user_updated', u.id, u.name)
@@ -269,16 +248,14 @@ def update_user(
         "manager_name": None
     }
     if u.manager_id:
-        manager = db.query(User).filter(User.id == u.manager_id).first()
-        if manager:
-            result["manager_name"] = manager.name
+        result["manager_name"] = team_index.user_name(db, u.manager_id)
     
     return result
 
 @router.get("/hierarchy", response_model=dict)
 def get_user_hierarchy(
     db: Session = Depends(db_session),
-    current_user: User = Depends(check_permission("users"))
+    current_user: Principal = Depends(check_permission("users"))
 ):
     """
     Get hierarchical structure of users.
@@ -354,7 +331,7 @@ def get_user_hierarchy(
 def delete_user(
     id: int, 
     db: Session = Depends(db_session),
-    current_user: User = Depends(check_permission("users"))
+    current_user: Principal = Depends(check_permission("users"))
 ):
     u = db.query(User).filter(User.id==id).first()
     if u:
@@ -362,6 +339,9 @@ def delete_user(
         user_id = u.id
         db.delete(u)
         db.commit()
+        principal_cache.invalidate_user(user_id)
+        token_registry.revoke_user(user_id)
+        team_index.remove_user(user_id)
         
         # Log user deletion
         log_user_action(db, current_user.id, 'user_deleted', user_id, user_name)
@@ -8,6 +8,7 @@ from pydantic import BaseModel
 from database import SessionLocal
 from models.user import User
 from routers.auth import check_permission
+from services.principal_cache import Principal
 from services.workflow_engine import (
     execute_demo_request_workflow,
     execute_brochure_workflow,
@@ -34,7 +35,7 @@ class WorkflowRequest(BaseModel):
 def run_demo_request_workflow(
     request: WorkflowRequest,
     db: Session = Depends(db_session),
-    current_user: User = Depends(check_permission("convert_to_lead", write_access=True))
+    current_user: Principal = Depends(check_permission("convert_to_lead", write_access=True))
 ):
     """Execute Demo Request Workflow"""
     if not request.submission_id:
@@ -58,7 +59,7 @@ def run_demo_request_workflow(
 def run_brochure_workflow(
     request: WorkflowRequest,
     db: Session = Depends(db_session),
-    current_user: User = Depends(check_permission("convert_to_lead", write_access=True))
+    current_user: Principal = Depends(check_permission("convert_to_lead", write_access=True))
 ):
     """Execute Brochure/Product Profile Download Workflow"""
     if not request.submission_id:
@@ -82,7 +83,7 @@ def run_brochure_workflow(
 def run_newsletter_workflow(
     request: WorkflowRequest,
     db: Session = Depends(db_session),
-    current_user: User = Depends(check_permission("submissions", write_access=True))
+    current_user: Principal = Depends(check_permission("submissions", write_access=True))
 ):
     """Execute Newsletter Signup Workflow"""
     if not request.email:
@@ -103,7 +104,7 @@ def run_newsletter_workflow(
 def run_inactive_lead_workflow(
     request: WorkflowRequest,
     db: Session = Depends(db_session),
-    current_user: User = Depends(check_permission("leads", write_access=True))
+    current_user: Principal = Depends(check_permission("leads", write_access=True))
 ):
     """Execute Inactive Lead Workflow"""
     if not request.lead_id:
@@ -124,7 +125,7 @@ def run_inactive_lead_workflow(
 @router.post("/process-inactive-leads")
 def process_all_inactive_leads(
     db: Session = Depends(db_session),
-    current_user: User = Depends(check_permission("leads", write_access=True))
+    current_user: Principal = Depends(check_permission("leads", write_access=True))
 ):
     """Process all inactive leads (7+ days with no activity)"""
     from models.lead import Lead
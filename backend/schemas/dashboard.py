@@ -0,0 +1,63 @@
+"""
+Pydantic schemas for the dashboard summary
+"""
+from datetime import datetime
+from pydantic import BaseModel
+from schemas.lead import LeadOut
+from schemas.reminder import ReminderOut
+
+class StatusCount(BaseModel):
+    status: str | None = None
+    count: int
+
+class SourceTypeCount(BaseModel):
+    source_type: str  # source_type, else source, else 'Unknown'
+    count: int
+
+class FormTypeCount(BaseModel):
+    form_type: str | None = None
+    count: int
+
+class DayCount(BaseModel):
+    date: str  # YYYY-MM-DD
+    total: int
+    converted: int
+    newsletter: int = 0  # Newsletter sign-ups that day, not part of total
+
+class RecentSubmission(BaseModel):
+    id: int
+    form_type: str | None = None
+    name: str | None = None
+    email: str | None = None
+    company: str | None = None
+    submitted_at: datetime | None = None
+    status: str = 'New'
+    lead_id: int | None = None
+
+class LeadSummary(BaseModel):
+    total: int
+    new: int
+    new_this_week: int
+    by_status: list[StatusCount]
+    by_source_type: list[SourceTypeCount]
+    recent: list[LeadOut]
+
+class SubmissionSummary(BaseModel):
+    total: int  # Newsletter sign-ups excluded
+    converted: int  # Submissions whose email is already one of the caller's leads
+    conversion_rate: float  # Percent
+    new_this_week: int
+    newsletter: int
+    by_form_type: list[FormTypeCount]
+    per_day: list[DayCount]  # Oldest first, one entry per day
+    recent: list[RecentSubmission]
+
+class ReminderSummary(BaseModel):
+    upcoming: int
+    next: list[ReminderOut]
+
+class DashboardSummary(BaseModel):
+    days: int
+    leads: LeadSummary | None = None  # Absent without "leads" permission
+    submissions: SubmissionSummary | None = None  # Absent without "submissions" permission
+    reminders: ReminderSummary | None = None  # Absent without "reminders" permission
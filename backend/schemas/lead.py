@@ -1,5 +1,10 @@
 from pydantic import BaseModel
 from datetime import datetime, date
+from schemas.activity_log import ActivityLogOut
+from schemas.call_log import CallLogOut
+from schemas.comment import CommentOut
+from schemas.reminder import ReminderOut
+from schemas.tag import TagOut
 
 class LeadBase(BaseModel):
     name: str
@@ -30,6 +35,18 @@ class LeadOut(LeadBase):
     class Config:
         from_attributes = True
 
+class LeadDetailOut(BaseModel):
+    """Everything the lead detail page shows, from GET /leads/{id}/full"""
+    lead: LeadOut
+    comments: list[CommentOut]
+    call_logs: list[CallLogOut]
+    reminders: list[ReminderOut]
+    tags: list[TagOut]
+    activities: list[ActivityLogOut]  # Most recent first
+
+class ConvertedLeadOut(LeadOut):
+    existing_lead_ids: list[int] = []  # Other leads that already had the submission's email
+
 class ConvertRequest(BaseModel):
     source_type: str | None = None
     source: str | None = None
@@ -37,6 +54,19 @@ class ConvertRequest(BaseModel):
     assigned: str | None = None  # Keep for backward compatibility
     assigned_to_id: int | None = None  # New: user ID for assignment
 
+class BatchConvertRequest(ConvertRequest):
+    submission_ids: list[int]
+
+class ConvertResult(BaseModel):
+    submission_id: int
+    status: str  # converted, already_converted, not_found
+    lead_id: int | None = None
+    existing_lead_ids: list[int] = []  # converted: other leads that already had the submission's email
+
+class BatchConvertOut(BaseModel):
+    converted: int
+    results: list[ConvertResult]
+
 class LeadUpdate(BaseModel):
     name: str | None = None
     email: str | None = None
@@ -52,4 +82,23 @@ class LeadUpdate(BaseModel):
     follow_up_required: bool | None = None
     follow_up_date: date | None = None
     follow_up_time: str | None = None
-    follow_up_status: str | None = None  # Pending, Completed, Cancelled
\ No newline at end of file
+    follow_up_status: str | None = None  # Pending, Completed, Cancelled
+
+class LeadBulkRequest(BaseModel):
+    lead_ids: list[int]
+    operation: str  # assign, set_status, set_stage, set_follow_up, delete
+    assigned_to_id: int | None = None  # assign: None unassigns
+    status: str | None = None  # set_status
+    stage: str | None = None  # set_stage: None clears the stage
+    follow_up_required: bool | None = None  # set_follow_up: only the fields sent are changed
+    follow_up_date: date | None = None
+    follow_up_time: str | None = None
+    follow_up_status: str | None = None
+
+class DuplicateCluster(BaseModel):
+    key: str  # The normalized email or company the leads share
+    count: int
+    leads: list[LeadOut]
+
+class LeadMergeRequest(BaseModel):
+    duplicate_ids: list[int]  # Merged into the lead in the path, then deleted
@@ -0,0 +1,16 @@
+"""
+Pydantic schemas for full-text search
+"""
+from pydantic import BaseModel
+
+class SearchHit(BaseModel):
+    entity_type: str  # lead, comment, call_log
+    entity_id: int
+    lead_id: int
+    lead_name: str | None = None
+    snippet: str | None = None
+
+class SearchResults(BaseModel):
+    query: str
+    results: list[SearchHit]
+    next_offset: int | None = None  # Pass as offset for the next page; absent on the last page
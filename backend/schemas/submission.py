@@ -23,3 +23,30 @@ class SubmissionOut(SubmissionBase):
 class FilterRequest(BaseModel):
     form_type: str
     filters: Dict[str, Any] = {}
+
+class FormSubmissionOut(BaseModel):
+    """A submission as the /form-submissions endpoints list it, from either database"""
+    id: int
+    form_type: str
+    name: str
+    email: str
+    company: str
+    submitted_at: datetime
+    data: dict
+    status: str = 'New'  # New | Converted | Archived
+    lead_id: Optional[int] = None
+    
+    class Config:
+        from_attributes = True
+
+class FormTypeStats(BaseModel):
+    form_type: str
+    total: int
+    new: int
+    converted: int
+    last_7_days: int
+    last_30_days: int
+
+class SubmissionStatsOut(BaseModel):
+    as_of: datetime  # UTC minute the 7/30 day windows end at
+    form_types: List[FormTypeStats]
@@ -1,6 +1,7 @@
 """
 Activity logging service for tracking all system activities
 """
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from models.activity_log import ActivityLog
 from models.user import User
@@ -30,6 +31,26 @@ def log_activity(
     db.refresh(activity)
     return activity
 
+def log_activities(db: Session, entries: list[dict]):
+    """
+    Batch variant of log_activity for bulk operations: one multi-row INSERT.
+    Each entry takes log_activity's keyword arguments. Doesn't commit, so the
+    entries land in the same transaction as the changes they describe.
+    """
+    if not entries:
+        return
+    db.execute(insert(ActivityLog), [
+        {
+            'user_id': entry['user_id'],
+            'action_type': entry['action_type'],
+            'description': entry['description'],
+            'entity_type': entry['entity_type'],
+            'entity_id': entry.get('entity_id'),
+            'meta_data': entry.get('metadata') or {}
+        }
+        for entry in entries
+    ])
+
 def log_lead_conversion(db: Session, user_id: int, submission_id: int, lead_id: int):
     """Log when a form submission is converted to a lead"""
     submission = db.query(Submission).filter(Submission.id == submission_id).first()
@@ -0,0 +1,117 @@
+"""
+Per-table change counters for conditional GETs
+Every write to a TRACKED_TABLES table made through a tracked session bumps its
+table's counter in table_versions inside the same transaction, so a counter
+only moves when the write commits. Other tables (activity logs, call logs,
+...) have no counter, so their writers don't queue on a counter row. List endpoints hash the counters they read from, together with
+the caller's identity and query string, into an ETag and answer a matching
+If-None-Match with 304 without loading the data.
+"""
+import hashlib
+from sqlalchemy import event, insert, inspect, select, update
+from sqlalchemy.orm import Session
+from models.table_version import TableVersion
+
+_versions = TableVersion.__table__
+
+# Every list response depends on these: they decide the caller's role,
+# permissions and team, i.e. which rows the caller can see
+SCOPE_TABLES = ("users", "roles")
+
+# Tables an ETagged list reads from; a new list_etag caller adds its tables here
+TRACKED_TABLES = frozenset(SCOPE_TABLES + ("leads", "submissions", "tags"))
+
+CACHE_CONTROL = "private, no-cache"
+
+def _table_of(obj) -> str:
+    return inspect(obj).mapper.local_table.name
+
+def bump_tables(db: Session, tables):
+    """Increment the counters of the given tables that are tracked, in the session's transaction"""
+    names = sorted(set(tables) & TRACKED_TABLES)
+    if not names:
+        return
+    # Sorted so concurrent writers take the counter row locks in the same order
+    conn = db.connection()
+    result = conn.execute(
+        update(_versions).where(_versions.c.table_name.in_(names)).values(version=_versions.c.version + 1)
+    )
+    if result.rowcount != len(names):
+        existing = set(conn.execute(select(_versions.c.table_name).where(_versions.c.table_name.in_(names))).scalars())
+        conn.execute(insert(_versions), [{"table_name": name, "version": 1} for name in names if name not in existing])
+
+def _after_flush(session: Session, flush_context):
+    tables = {_table_of(obj) for obj in session.new}
+    tables.update(_table_of(obj) for obj in session.deleted)
+    tables.update(
+        _table_of(obj) for obj in session.dirty
+        if session.is_modified(obj, include_collections=False)
+    )
+    if tables:
+        bump_tables(session, tables)
+
+def _on_execute(orm_execute_state):
+    """Bulk writes (query.update(), insert()/update()/delete() statements) skip the flush"""
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        name = getattr(table, "name", None)
+        if name:
+            bump_tables(orm_execute_state.session, [name])
+
+def track_changes(session_factory):
+    """Bump table counters for every write made through sessions from session_factory"""
+    if not event.contains(session_factory, "after_flush", _after_flush):
+        event.listen(session_factory, "after_flush", _after_flush)
+        event.listen(session_factory, "do_orm_execute", _on_execute)
+
+def ensure_version_rows(db: Session):
+    """Create a zero counter for every tracked table that doesn't have one yet"""
+    existing = set(db.execute(select(_versions.c.table_name)).scalars())
+    missing = sorted(TRACKED_TABLES - existing)
+    if missing:
+        db.execute(insert(_versions), [{"table_name": name, "version": 0} for name in missing])
+        db.commit()
+
+def current_versions(db: Session, tables) -> dict:
+    """Counter per table (0 for tables that have never been written)"""
+    names = sorted(set(tables))
+    untracked = set(names) - TRACKED_TABLES
+    if untracked:
+        # Their counters never move, so an ETag built on them would never change
+        raise ValueError(f"Tables without change counters: {sorted(untracked)}")
+    rows = db.execute(
+        select(_versions.c.table_name, _versions.c.version).where(_versions.c.table_name.in_(names))
+    ).all()
+    versions = dict.fromkeys(names, 0)
+    versions.update(rows)
+    return versions
+
+def list_etag(db: Session, tables, principal, request, extra=None) -> str:
+    """
+    Weak ETag for a list response: the counters of the tables it reads and of
+    SCOPE_TABLES, the caller's identity and the request path and query string;
+    extra is any other version the response depends on (e.g. another database's)
+    """
+    versions = current_versions(db, set(tables) | set(SCOPE_TABLES))
+    key = (
+        request.url.path,
+        sorted(request.query_params.multi_items()),
+        principal.id,
+        principal.role_id,
+        sorted(versions.items()),
+        extra,
+    )
+    return 'W/"%s"' % hashlib.sha1(repr(key).encode()).hexdigest()
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match check using the weak comparison RFC 9110 requires for GET"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+def cache_headers(etag: str) -> dict:
+    """Headers that make browsers revalidate the list with If-None-Match"""
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Authorization"}
@@ -0,0 +1,217 @@
+"""
+Dashboard summary aggregates
+Everything the dashboard shows is computed in the database with GROUP BY and
+date-bucket queries over indexed columns, scoped the way the list endpoints
+scope them. The result is a small, fixed-size document whatever the number of
+leads and submissions.
+"""
+import heapq
+from datetime import date, datetime, timedelta
+from itertools import islice
+from sqlalchemy import case, func, literal
+from sqlalchemy.orm import Session
+from models.lead import Lead
+from models.reminder import Reminder
+from models.submission import Submission
+from services.lead_bulk import chunked
+from services.lead_queries import reminders_on_live_leads, scope_leads
+from services.lead_serializer import LEAD_LIST_COLUMNS, LEAD_LIST_FIELDS, lead_rows_to_dicts
+from services.lead_sources import FORM_TYPE_SOURCES
+from services.submission_feed import FORM_TABLES, form_models, forms_db_feed
+from services.team_index import team_index
+
+# Form types the dashboard counts as submissions; newsletter sign-ups are reported separately
+DASHBOARD_FORM_TYPES = tuple(FORM_TYPE_SOURCES) + ('general',)
+NEWSLETTER_FORM_TYPE = 'newsletter'
+RECENT_ITEMS = 5
+
+_CREATED_BY = LEAD_LIST_FIELDS.index("created_by")
+
+def _day_series(counts: dict, newsletter: dict, start: date, days: int) -> list:
+    """[{date, total, converted, newsletter}] for every day from start, zero-filled"""
+    series = []
+    for offset in range(days):
+        day = (start + timedelta(days=offset)).isoformat()
+        total, converted = counts.get(day, (0, 0))
+        series.append({"date": day, "total": total, "converted": converted, "newsletter": newsletter.get(day, 0)})
+    return series
+
+def lead_summary(db: Session, current_user, since: datetime) -> dict:
+    """Status and source breakdowns, new-lead counts and the latest leads among those current_user can see"""
+    by_status = scope_leads(db.query(Lead.status, func.count(Lead.id)), db, current_user).group_by(Lead.status).all()
+    total = sum(count for _, count in by_status)
+
+    # Categories as on the dashboard: source_type, else the source itself
+    by_source_type = {}
+    sources = scope_leads(db.query(Lead.source_type, Lead.source, func.count(Lead.id)), db, current_user)
+    for source_type, source, count in sources.group_by(Lead.source_type, Lead.source):
+        name = source_type or source or 'Unknown'
+        by_source_type[name] = by_source_type.get(name, 0) + count
+
+    new_this_week = scope_leads(db.query(func.count(Lead.id)), db, current_user).filter(Lead.created_at >= since).scalar()
+
+    recent = scope_leads(db.query(*LEAD_LIST_COLUMNS), db, current_user).order_by(
+        Lead.created_at.desc(), Lead.id.desc()
+    ).limit(RECENT_ITEMS).all()
+    creator_names = {u.id: u.name for u in team_index.users(db, {row[_CREATED_BY] for row in recent if row[_CREATED_BY]})}
+
+    return {
+        "total": total,
+        "new": sum(count for status, count in by_status if status == 'New'),
+        "new_this_week": new_this_week,
+        "by_status": [{"status": status, "count": count} for status, count in sorted(by_status, key=lambda item: -item[1])],
+        "by_source_type": [
+            {"source_type": name, "count": count}
+            for name, count in sorted(by_source_type.items(), key=lambda item: -item[1])
+        ],
+        "recent": lead_rows_to_dicts(recent, creator_names),
+    }
+
+def submission_summary(db: Session, current_user, since: datetime, start: date, days: int) -> dict:
+    """
+    Submission counts by form type and by day since start, with how many came
+    from an email that is already a lead current_user can see
+    """
+    # Uncorrelated, so it's evaluated once into a lookup table rather than probed per submission
+    # with whichever index the scope filter makes the planner prefer
+    lead_emails = scope_leads(db.query(Lead.email_key), db, current_user).filter(Lead.email_key.isnot(None))
+    converted = func.lower(func.trim(Submission.email)).in_(lead_emails.scalar_subquery())
+    forms = db.query(Submission).filter(Submission.form_type.in_(DASHBOARD_FORM_TYPES))
+
+    by_form_type = forms.with_entities(Submission.form_type, func.count(Submission.id)).group_by(Submission.form_type).all()
+    total, converted_total, new_this_week = forms.with_entities(
+        func.count(Submission.id),
+        func.coalesce(func.sum(case((converted, 1), else_=0)), 0),
+        func.coalesce(func.sum(case((Submission.submitted >= since, 1), else_=0)), 0),
+    ).one()
+
+    day = func.date(Submission.submitted)
+    start_at = datetime.combine(start, datetime.min.time())
+    per_day = forms.with_entities(day, func.count(Submission.id), func.sum(case((converted, 1), else_=0))).filter(
+        Submission.submitted >= start_at
+    ).group_by(day).all()
+
+    newsletters = db.query(Submission).filter(Submission.form_type == NEWSLETTER_FORM_TYPE)
+    newsletter = newsletters.with_entities(func.count(Submission.id)).scalar()
+    newsletter_per_day = newsletters.with_entities(day, func.count(Submission.id)).filter(
+        Submission.submitted >= start_at
+    ).group_by(day).all()
+    recent = forms.order_by(Submission.submitted.desc(), Submission.id.desc()).limit(RECENT_ITEMS).all()
+
+    return {
+        "total": total,
+        "converted": converted_total,
+        "conversion_rate": round(converted_total * 100 / total, 1) if total else 0,
+        "new_this_week": new_this_week,
+        "newsletter": newsletter,
+        "by_form_type": [
+            {"form_type": form_type, "count": count}
+            for form_type, count in sorted(by_form_type, key=lambda item: -item[1])
+        ],
+        "per_day": _day_series({str(d): (t, c) for d, t, c in per_day}, {str(d): c for d, c in newsletter_per_day}, start, days),
+        "recent": [
+            {
+                "id": sub.id, "form_type": sub.form_type, "name": sub.name, "email": sub.email,
+                "company": sub.company, "submitted_at": sub.submitted, "status": sub.status or 'New', "lead_id": sub.lead_id,
+            }
+            for sub in recent
+        ],
+    }
+
+def _form_label(model, form_type: str, has_demo_date):
+    """SQL expression naming a form table's rows as FORM_TABLES lists them"""
+    if has_demo_date is None:
+        return literal(form_type)
+    # Contact forms and demo requests share a table: demo requests have a demo date
+    by_kind = {kind: name for name, (model_name, _, kind) in FORM_TABLES.items() if model_name == model.__name__}
+    return case((model.demo_date.isnot(None), by_kind[True]), else_=by_kind[False])
+
+def forms_db_submission_summary(db: Session, forms_db: Session, current_user, since: datetime, start: date, days: int) -> dict:
+    """
+    submission_summary for submissions that aren't in our database (the
+    website's forms database): GROUP BY queries on each form table, with the
+    distinct emails looked up against the leads current_user can see and only
+    the latest few rows read through the feed
+    """
+    models = form_models()
+    start_at = datetime.combine(start, datetime.min.time())
+    by_form_type = {}
+    by_email = {}
+    by_day = {}
+    new_this_week = 0
+    newsletter = 0
+    newsletter_per_day = {}
+    read = set()
+    for form_type, (model_name, time_name, has_demo_date) in FORM_TABLES.items():
+        if model_name in read:
+            continue
+        read.add(model_name)
+        model = models[model_name]
+        submitted = getattr(model, time_name)
+        day = func.date(submitted)
+        if form_type == NEWSLETTER_FORM_TYPE:
+            newsletter += forms_db.query(func.count(model.id)).scalar()
+            for day_value, count in forms_db.query(day, func.count(model.id)).filter(submitted >= start_at).group_by(day):
+                newsletter_per_day[str(day_value)] = newsletter_per_day.get(str(day_value), 0) + count
+            continue
+
+        label = _form_label(model, form_type, has_demo_date)
+        counts = forms_db.query(label, func.count(model.id), func.coalesce(func.sum(case((submitted >= since, 1), else_=0)), 0))
+        for name, count, recent_count in counts.group_by(label):
+            by_form_type[name] = by_form_type.get(name, 0) + count
+            new_this_week += recent_count
+
+        email_key = func.lower(func.trim(model.email))
+        for key, count in forms_db.query(email_key, func.count(model.id)).group_by(email_key):
+            by_email[key] = by_email.get(key, 0) + count
+        per_day = forms_db.query(day, email_key, func.count(model.id)).filter(submitted >= start_at).group_by(day, email_key)
+        for day_value, key, count in per_day:
+            keys = by_day.setdefault(str(day_value), {})
+            keys[key] = keys.get(key, 0) + count
+
+    lead_emails = set()
+    visible = scope_leads(db.query(Lead.email_key), db, current_user)
+    for chunk in chunked(sorted(by_email.keys() - {None, ''})):
+        lead_emails.update(key for (key,) in visible.filter(Lead.email_key.in_(chunk)).distinct())
+
+    total = sum(by_form_type.values())
+    converted_total = sum(count for key, count in by_email.items() if key in lead_emails)
+    feeds = [forms_db_feed(forms_db, form_type, limit=RECENT_ITEMS) for form_type in FORM_TABLES if form_type in DASHBOARD_FORM_TYPES]
+    recent = [entry[3] for entry in islice(heapq.merge(*feeds, key=lambda entry: entry[:3], reverse=True), RECENT_ITEMS)]
+    return {
+        "total": total,
+        "converted": converted_total,
+        "conversion_rate": round(converted_total * 100 / total, 1) if total else 0,
+        "new_this_week": new_this_week,
+        "newsletter": newsletter,
+        "by_form_type": [
+            {"form_type": form_type, "count": count}
+            for form_type, count in sorted(by_form_type.items(), key=lambda item: -item[1]) if count
+        ],
+        "per_day": _day_series(
+            {
+                day: (sum(keys.values()), sum(count for key, count in keys.items() if key in lead_emails))
+                for day, keys in by_day.items()
+            },
+            newsletter_per_day, start, days,
+        ),
+        "recent": [
+            {
+                "id": item.id, "form_type": item.form_type, "name": item.name, "email": item.email,
+                "company": item.company, "submitted_at": item.submitted_at, "status": item.status, "lead_id": item.lead_id,
+            }
+            for item in recent
+        ],
+    }
+
+def reminder_summary(db: Session, current_user, now: datetime) -> dict:
+    """How many upcoming, open reminders current_user has, and the next few"""
+    upcoming = reminders_on_live_leads(db.query(Reminder)).filter(
+        Reminder.user_id == current_user.id,
+        Reminder.due_date >= now,
+        Reminder.completed == False
+    )
+    return {
+        "upcoming": upcoming.with_entities(func.count(Reminder.id)).scalar(),
+        "next": upcoming.order_by(Reminder.due_date.asc()).limit(RECENT_ITEMS).all(),
+    }
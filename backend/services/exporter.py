@@ -0,0 +1,81 @@
+"""
+Streaming CSV / NDJSON export
+An export runs its query with yield_per, so rows come from the database in
+batches of EXPORT_BATCH_SIZE (through a server-side cursor where the driver has
+one) and each batch is encoded and handed to the response before the next is
+fetched. Memory use is one batch plus one output chunk, however many rows the
+export has.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from config import EXPORT_BATCH_SIZE
+
+# format -> media type
+EXPORT_FORMATS = {'csv': 'text/csv; charset=utf-8', 'ndjson': 'application/x-ndjson'}
+
+# Encoded output is handed to the response in chunks of about this size
+FLUSH_BYTES = 64 * 1024
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=_json_default)
+    return value
+
+def encode_csv(fields, rows):
+    """CSV lines for rows (tuples in fields order), header first, in chunks of bytes"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for row in rows:
+        writer.writerow([_csv_value(value) for value in row])
+        if buffer.tell() >= FLUSH_BYTES:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+def encode_ndjson(fields, rows):
+    """One JSON object per row (tuples in fields order), in chunks of bytes"""
+    lines = []
+    size = 0
+    for row in rows:
+        line = json.dumps(dict(zip(fields, row)), default=_json_default)
+        lines.append(line)
+        size += len(line) + 1
+        if size >= FLUSH_BYTES:
+            yield ('\n'.join(lines) + '\n').encode()
+            lines = []
+            size = 0
+    if lines:
+        yield ('\n'.join(lines) + '\n').encode()
+
+_ENCODERS = {'csv': encode_csv, 'ndjson': encode_ndjson}
+
+def export_rows(session_factory, build_query, fields, fmt: str, batch_size: int | None = None):
+    """
+    Stream build_query(db)'s rows encoded as fmt. The session is opened here
+    rather than taken from the request: a streamed body is still being read
+    after the endpoint (and its dependencies) have returned.
+    """
+    encode = _ENCODERS[fmt]
+    db = session_factory()
+    try:
+        query = build_query(db).yield_per(batch_size or EXPORT_BATCH_SIZE)
+        yield from encode(fields, query)
+    finally:
+        db.close()
+
+def export_items(items, fields, fmt: str):
+    """Stream already-loaded dicts (sources that aren't queried through SQLAlchemy)"""
+    yield from _ENCODERS[fmt](fields, (tuple(item.get(field) for field in fields) for item in items))
@@ -0,0 +1,68 @@
+"""
+Row converters for the website's form tables
+Each form model gets a converter compiled once, on first use: the column
+positions it needs (name parts, email, company or company_name, the time
+column and the columns that go into data) are resolved up front, so turning a
+column tuple into a FormSubmissionOut is a handful of index lookups instead of
+a getattr per column on an ORM object. Rows are read with
+db.query(*form_columns(model)), i.e. as plain tuples in table column order.
+"""
+from schemas.submission import FormSubmissionOut
+
+# Columns left out of a submission's data
+_NOT_DATA = ('id', 'submitted_at')
+
+_converters = {}
+
+def form_columns(model) -> tuple:
+    """The columns a converter expects its rows in"""
+    return tuple(model.__table__.columns)
+
+def _compile_subscription(names: list):
+    id_at, email_at, time_at = names.index('id'), names.index('email'), names.index('subscribed_at')
+
+    def convert(row, form_type: str) -> FormSubmissionOut:
+        email = row[email_at]
+        return FormSubmissionOut(
+            id=row[id_at], form_type='newsletter', name='', email=email, company='',
+            submitted_at=row[time_at], data={'email': email}, status='New', lead_id=None,
+        )
+    return convert
+
+def _compile_form(names: list):
+    def position(name):
+        return names.index(name) if name in names else None
+
+    id_at, time_at = names.index('id'), names.index('submitted_at')
+    first_at, last_at, email_at = position('first_name'), position('last_name'), position('email')
+    company_at, company_name_at = position('company'), position('company_name')
+    data_fields = [(name, at) for at, name in enumerate(names) if name not in _NOT_DATA]
+
+    def convert(row, form_type: str) -> FormSubmissionOut:
+        first = '' if first_at is None else row[first_at]
+        last = '' if last_at is None else row[last_at]
+        company = '' if company_at is None else row[company_at]
+        if not company:
+            company = '' if company_name_at is None else row[company_name_at]
+        return FormSubmissionOut(
+            id=row[id_at],
+            form_type=form_type,
+            name=f"{first} {last}".strip(),
+            email='' if email_at is None else row[email_at],
+            company=company,
+            submitted_at=row[time_at],
+            data={name: row[at] for name, at in data_fields if row[at] is not None},
+            status='New',  # External forms are always 'New' until converted
+            lead_id=None,
+        )
+    return convert
+
+def converter_for(model):
+    """convert(row, form_type) -> FormSubmissionOut for rows of form_columns(model)"""
+    convert = _converters.get(model)
+    if convert is None:
+        names = [column.name for column in form_columns(model)]
+        # Newsletter sign-ups only have an email and a subscription time
+        convert = _compile_subscription(names) if 'subscribed_at' in names else _compile_form(names)
+        _converters[model] = convert
+    return convert
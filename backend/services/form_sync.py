@@ -0,0 +1,143 @@
+"""
+Incremental copy of spars_forms.db into the submissions table
+The website writes each form to its own table, where a submission can't be
+converted, tagged or marked Converted. Each table's new rows (ids above its
+high-water mark in form_sync_state) are copied into submissions in id order,
+one batch per transaction, so a pass costs O(new rows) and the listings only
+read the one indexed submissions table. Copied rows keep their source table
+and id, unique together: a batch some of whose rows are already there (copied
+by another worker, restored from a backup or copied by hand) fails instead of
+duplicating them, and is retried without those rows so the mark moves past them.
+"""
+import threading
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from models.form_sync_state import FormSyncState
+from models.submission import Submission
+from services.form_converters import converter_for, form_columns
+from services.submission_feed import FORM_TABLES, form_models
+from config import FORMS_SYNC_BATCH_SIZE, FORMS_SYNC_INTERVAL_SECONDS
+
+# One pass at a time per process (background thread and on-demand runs)
+_sync_lock = threading.Lock()
+_stop = threading.Event()
+_worker = None
+
+def _form_type_of(model):
+    """form_type(row) for rows of form_columns(model), named as in FORM_TABLES"""
+    types = {has_demo_date: form_type for form_type, (name, _, has_demo_date) in FORM_TABLES.items() if name == model.__name__}
+    if None in types:
+        form_type = types[None]
+        return lambda row: form_type
+    # Contact forms and demo requests share a table: demo requests have a demo date
+    demo_date_at = [column.name for column in form_columns(model)].index('demo_date')
+    return lambda row: types[row[demo_date_at] is not None]
+
+def _save_batch(db: Session, table: str, values: list, last_id: int):
+    """Insert values into submissions and move table's mark up to last_id, in one transaction"""
+    if values:
+        db.execute(insert(Submission), values)
+    state = db.get(FormSyncState, table)
+    if state is None:
+        db.add(FormSyncState(source_table=table, last_id=last_id, synced_at=func.now()))
+    else:
+        state.last_id = max(state.last_id, last_id)
+        state.synced_at = func.now()
+    db.commit()
+
+def _sync_batch(db: Session, forms_db: Session, model, batch_size: int) -> tuple[int, int]:
+    """Copy the next batch of model's new rows into submissions and commit; returns (rows read, rows copied)"""
+    table = model.__table__.name
+    state = db.get(FormSyncState, table)
+    last_id = state.last_id if state else 0
+    rows = forms_db.query(*form_columns(model)).filter(model.id > last_id).order_by(model.id).limit(batch_size).all()
+    if not rows:
+        return 0, 0
+
+    convert, form_type = converter_for(model), _form_type_of(model)
+    values = []
+    for row in rows:
+        item = convert(row, form_type(row))
+        values.append({
+            "form_type": item.form_type, "name": item.name, "email": item.email, "company": item.company,
+            "submitted": item.submitted_at, "status": item.status, "data": item.data,
+            "source_table": table, "source_id": item.id,
+        })
+    last_id = values[-1]["source_id"]
+    try:
+        _save_batch(db, table, values, last_id)
+    except IntegrityError:
+        db.rollback()
+        # Some rows are already copied (another worker, a restore or a manual copy): skip them
+        present = {
+            source_id for (source_id,) in db.query(Submission.source_id).filter(
+                Submission.source_table == table, Submission.source_id.in_([value["source_id"] for value in values])
+            )
+        }
+        values = [value for value in values if value["source_id"] not in present]
+        print(f"[WARNING] Forms sync: {len(present)} {table} rows up to id {last_id} were already in submissions, skipped")
+        try:
+            _save_batch(db, table, values, last_id)
+        except IntegrityError:
+            # Still racing another worker: picked up again next pass
+            db.rollback()
+            return len(rows), 0
+    return len(rows), len(values)
+
+def sync_table(db: Session, forms_db: Session, model, batch_size: int = FORMS_SYNC_BATCH_SIZE) -> int:
+    """Copy the next batch of model's new rows into submissions and commit; returns the number copied"""
+    return _sync_batch(db, forms_db, model, batch_size)[1]
+
+def sync_forms_db(session_factory, forms_session_factory, batch_size: int = FORMS_SYNC_BATCH_SIZE) -> dict:
+    """Copy every form table's new rows into submissions; returns {source table: rows copied}"""
+    copied = {}
+    with _sync_lock:
+        db = session_factory()
+        forms_db = forms_session_factory()
+        try:
+            for model in form_models().values():
+                table = model.__table__.name
+                copied[table] = 0
+                while True:
+                    read, count = _sync_batch(db, forms_db, model, batch_size)
+                    copied[table] += count
+                    if read < batch_size:
+                        break
+                    # Ends the forms-database read transaction between batches
+                    forms_db.rollback()
+        finally:
+            forms_db.close()
+            db.close()
+    return copied
+
+def start_background_sync(session_factory, forms_session_factory, interval: int = FORMS_SYNC_INTERVAL_SECONDS, changes=None):
+    """
+    Run sync_forms_db every interval seconds on a daemon thread; interval <= 0
+    only syncs on demand. With changes (a database_forms.FormsDbChanges), a
+    pass is skipped while the forms file hasn't changed since the last one.
+    """
+    global _worker
+    if interval <= 0 or (_worker is not None and _worker.is_alive()):
+        return
+    _stop.clear()
+
+    def run():
+        synced_version = None
+        while True:
+            try:
+                version = changes.version() if changes is not None else None
+                if version is None or version != synced_version:
+                    sync_forms_db(session_factory, forms_session_factory)
+                    synced_version = version
+            except Exception as e:
+                print(f"[ERROR] Forms database sync failed: {e}")
+            if _stop.wait(interval):
+                return
+
+    _worker = threading.Thread(target=run, name="forms-db-sync", daemon=True)
+    _worker.start()
+
+def stop_background_sync():
+    _stop.set()
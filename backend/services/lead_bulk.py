@@ -0,0 +1,147 @@
+"""
+Set-based bulk operations on leads
+Each operation runs a handful of UPDATE/DELETE statements over the whole id set
+instead of one ORM round trip per lead. Id lists are chunked to stay under the
+database's bound-parameter limit. Nothing is committed here: the caller commits
+once, so a bulk request applies completely or not at all.
+"""
+from sqlalchemy import func, insert, update
+from sqlalchemy.orm import Session
+from models.call_log import CallLog
+from models.comment import Comment
+from models.entity_tag import EntityTag
+from models.lead import Lead
+from models.reminder import Reminder
+from models.submission import Submission
+from services.lead_dedup import dedup_keys
+from services.lead_sources import source_for_form_type
+
+ID_CHUNK_SIZE = 500
+
+# Rows a merge moves to the surviving lead: (key in the moved counts, lead id column)
+_MOVED_TO_SURVIVOR = (
+    ('comments', Comment.lead_id),
+    ('call_logs', CallLog.lead_id),
+    ('reminders', Reminder.lead_id),
+    ('submissions', Submission.lead_id),
+)
+
+# Rows deleted with their lead: (key in related_data_deleted, model, lead id column, extra criteria)
+_DELETED_WITH_LEAD = (
+    ('call_logs', CallLog, CallLog.lead_id, ()),
+    ('reminders', Reminder, Reminder.lead_id, ()),
+    ('comments', Comment, Comment.lead_id, ()),
+    ('entity_tags', EntityTag, EntityTag.entity_id, (EntityTag.entity_type == 'lead',)),
+)
+
+def chunked(ids, size: int | None = None):
+    size = size or ID_CHUNK_SIZE
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+def _counts_by_lead(db: Session, column, lead_ids, criteria=()) -> dict:
+    counts = {}
+    for chunk in chunked(lead_ids):
+        counts.update(db.query(column, func.count()).filter(column.in_(chunk), *criteria).group_by(column).all())
+    return counts
+
+def update_leads(db: Session, lead_ids, values: dict) -> int:
+    """Apply the same column values to every lead in lead_ids; returns rows updated"""
+    updated = 0
+    for chunk in chunked(lead_ids):
+        updated += db.query(Lead).filter(Lead.id.in_(chunk)).update(values, synchronize_session=False)
+    return updated
+
+def delete_leads(db: Session, lead_ids) -> dict:
+    """
+    Delete leads with their call logs, reminders, comments and tags; their
+    submissions are kept and go back to 'New'. Returns, per lead id, the
+    related_data_deleted counts delete_lead reports for a single lead.
+    """
+    counts = {key: _counts_by_lead(db, column, lead_ids, criteria) for key, _, column, criteria in _DELETED_WITH_LEAD}
+    counts['submissions_updated'] = _counts_by_lead(db, Submission.lead_id, lead_ids)
+
+    for chunk in chunked(lead_ids):
+        for _, model, column, criteria in _DELETED_WITH_LEAD:
+            db.query(model).filter(column.in_(chunk), *criteria).delete(synchronize_session=False)
+        # Preserve submission history: unlink instead of deleting
+        db.query(Submission).filter(Submission.lead_id.in_(chunk)).update(
+            {Submission.lead_id: None, Submission.status: 'New'}, synchronize_session=False
+        )
+        db.query(Lead).filter(Lead.id.in_(chunk)).delete(synchronize_session=False)
+
+    return {lead_id: {key: by_lead.get(lead_id, 0) for key, by_lead in counts.items()} for lead_id in lead_ids}
+
+def merge_leads(db: Session, survivor_id: int, duplicate_ids) -> dict:
+    """
+    Move the comments, call logs, reminders, tags and submissions of the
+    duplicate leads to the survivor, then delete the duplicates. Tags the
+    survivor already has are dropped rather than doubled. Returns how many
+    rows of each kind moved.
+    """
+    moved = {
+        key: sum(
+            db.query(column.class_).filter(column.in_(chunk)).update({column: survivor_id}, synchronize_session=False)
+            for chunk in chunked(duplicate_ids)
+        )
+        for key, column in _MOVED_TO_SURVIVOR
+    }
+
+    # Tags are unique per entity, so they're re-created on the survivor instead of re-pointed
+    lead_tags = db.query(EntityTag.tag_id).filter(EntityTag.entity_type == 'lead')
+    kept = {tag_id for (tag_id,) in lead_tags.filter(EntityTag.entity_id == survivor_id)}
+    tag_ids = set()
+    for chunk in chunked(duplicate_ids):
+        tag_ids.update(tag_id for (tag_id,) in lead_tags.filter(EntityTag.entity_id.in_(chunk)))
+        db.query(EntityTag).filter(EntityTag.entity_type == 'lead', EntityTag.entity_id.in_(chunk)).delete(
+            synchronize_session=False
+        )
+    tag_ids -= kept
+    if tag_ids:
+        db.execute(insert(EntityTag), [
+            {'tag_id': tag_id, 'entity_type': 'lead', 'entity_id': survivor_id} for tag_id in sorted(tag_ids)
+        ])
+    moved['entity_tags'] = len(tag_ids)
+
+    for chunk in chunked(duplicate_ids):
+        db.query(Lead).filter(Lead.id.in_(chunk)).delete(synchronize_session=False)
+    return moved
+
+def leads_from_submissions(db: Session, submissions, **values) -> list:
+    """
+    Create a lead for each submission (source fields derived from the form
+    type, the rest from values) and link the submission to it as 'Converted'.
+    Returns the new lead ids in submission order.
+    """
+    if not submissions:
+        return []
+    rows = [
+        {
+            'name': sub.name,
+            'email': sub.email,
+            'company': sub.company,
+            'source_type': 'Website',
+            'source': source_for_form_type(sub.form_type),
+            'status': 'New',
+            # A Core insert skips the mapper events that fill these in
+            **dedup_keys(sub.email, sub.company),
+            **values
+        }
+        for sub in submissions
+    ]
+    if db.get_bind().dialect.insert_executemany_returning:
+        # One multi-row INSERT ... RETURNING, with the ids handed back in rows order
+        lead_ids = db.scalars(insert(Lead).returning(Lead.id, sort_by_parameter_order=True), rows).all()
+    else:
+        # No executemany RETURNING (MySQL): let the flush collect each lastrowid
+        leads = [Lead(**row) for row in rows]
+        db.add_all(leads)
+        db.flush()
+        lead_ids = [lead.id for lead in leads]
+    
+    db.execute(update(Submission), [
+        {'id': sub.id, 'lead_id': lead_id, 'status': 'Converted'}
+        for sub, lead_id in zip(submissions, lead_ids)
+    ])
+    return lead_ids
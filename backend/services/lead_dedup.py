@@ -0,0 +1,78 @@
+"""
+Duplicate detection for leads
+Every lead carries normalized copies of its email and company (email_key,
+company_key), both indexed. Mapper events keep them current on every ORM
+write, so finding duplicate clusters is a GROUP BY over an index and checking
+whether an email is already a lead is a single index probe. Merging the
+duplicates is services/lead_bulk.merge_leads.
+"""
+import re
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session
+from models.lead import Lead
+from services.lead_queries import scope_leads
+
+# Legal-form words dropped from the end of company names: "Acme, Inc." and "ACME" are the same company
+COMPANY_SUFFIXES = {
+    'inc', 'incorporated', 'llc', 'llp', 'ltd', 'limited', 'corp', 'corporation',
+    'co', 'company', 'plc', 'gmbh', 'ag', 'sa', 'pvt', 'pte', 'bv',
+}
+
+# by -> key column
+DUPLICATE_KEYS = {'email': Lead.email_key, 'company': Lead.company_key}
+
+def normalize_email(email: str | None) -> str | None:
+    email = (email or '').strip().lower()
+    return email or None
+
+def normalize_company(company: str | None) -> str | None:
+    words = re.findall(r"\w+", (company or '').lower())
+    while len(words) > 1 and words[-1] in COMPANY_SUFFIXES:
+        words.pop()
+    return ' '.join(words) or None
+
+def dedup_keys(email: str | None, company: str | None) -> dict:
+    """Key column values for a lead with this email and company"""
+    return {'email_key': normalize_email(email), 'company_key': normalize_company(company)}
+
+@event.listens_for(Lead, 'before_insert')
+def _keys_before_insert(mapper, connection, lead):
+    for key, value in dedup_keys(lead.email, lead.company).items():
+        setattr(lead, key, value)
+
+@event.listens_for(Lead, 'before_update')
+def _keys_before_update(mapper, connection, lead):
+    attrs = inspect(lead).attrs
+    if attrs.email.history.has_changes() or attrs.company.history.has_changes():
+        _keys_before_insert(mapper, connection, lead)
+
+def existing_lead_ids(db: Session, emails) -> dict:
+    """
+    Normalized email -> ids of the leads already using it, for those of emails
+    that are taken; one probe of the email_key index per email
+    """
+    keys = sorted({key for key in map(normalize_email, emails) if key})
+    found = {}
+    if keys:
+        for key, lead_id in db.query(Lead.email_key, Lead.id).filter(Lead.email_key.in_(keys)).order_by(Lead.id):
+            found.setdefault(key, []).append(lead_id)
+    return found
+
+def duplicate_clusters(db: Session, current_user, by: str, limit: int, offset: int = 0) -> list:
+    """
+    Groups of two or more leads visible to current_user sharing the same
+    normalized email or company (by), largest first, as dicts with key,
+    count and leads (oldest first)
+    """
+    key = DUPLICATE_KEYS[by]
+    size = func.count(Lead.id)
+    groups = scope_leads(db.query(key, size), db, current_user).filter(key.isnot(None)).group_by(key).having(
+        size > 1
+    ).order_by(size.desc(), key).limit(limit).offset(offset).all()
+    if not groups:
+        return []
+    members = {}
+    leads = scope_leads(db.query(Lead), db, current_user).filter(key.in_([value for value, _ in groups]))
+    for lead in leads.order_by(Lead.created_at, Lead.id):
+        members.setdefault(getattr(lead, key.key), []).append(lead)
+    return [{'key': value, 'count': count, 'leads': members.get(value, [])} for value, count in groups]
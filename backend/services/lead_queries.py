@@ -0,0 +1,202 @@
+"""
+Lead list queries
+Visibility scoping, server-side filters and keyset (cursor) pagination for the
+lead list endpoints. Pages are ordered by (sort column, id) so every row has a
+unique position and the next page starts strictly after the last row returned,
+which keeps page cost independent of how deep into the list the caller is.
+"""
+import base64
+import binascii
+import json
+from datetime import date, timedelta
+from sqlalchemy import String, and_, exists, or_, type_coerce
+from sqlalchemy.orm import Session, Query
+from models.lead import Lead
+from models.reminder import Reminder
+from services.permissions import has
+from services.team_index import team_index
+
+# Sortable columns: (column, compare as text, may be NULL). Date/time columns
+# are compared as their stored text so a cursor value round-trips exactly
+# (SQLite keeps "YYYY-MM-DD HH:MM:SS" strings that never equal a re-serialised
+# datetime with microseconds). created_at is always set by its server default,
+# which lets the resume predicate be a plain index range.
+SORT_COLUMNS = {
+    "created_at": (Lead.created_at, True, False),
+    "updated_at": (Lead.updated_at, True, True),
+    "follow_up_date": (Lead.follow_up_date, True, True),
+    "name": (Lead.name, False, True),
+    "company": (Lead.company, False, True),
+    "status": (Lead.status, False, True),
+    "stage": (Lead.stage, False, True),
+    "id": (Lead.id, False, False),
+}
+DEFAULT_SORT = "created_at"
+DEFAULT_ORDER = "desc"
+MAX_PAGE_SIZE = 500
+
+class InvalidCursor(ValueError):
+    pass
+
+def scope_leads(query: Query, db: Session, current_user) -> Query:
+    """Restrict a lead query to what current_user may see"""
+    role = current_user.role
+    if role and (role.role_name == "Admin" or has(current_user, "all")):
+        # Admin sees all leads
+        return query
+    if role and role.role_name == "Sales Manager":
+        # Sales Manager: only see leads assigned to their own Sales Executives
+        team_executive_ids = team_index.team_of(db, current_user.id)
+        if not team_executive_ids:
+            return query.filter(Lead.id == -1)  # Impossible condition
+        return query.filter(Lead.assigned_to.in_(team_executive_ids))
+    # Sales Executive and other users only see leads assigned to them
+    return query.filter(
+        (Lead.assigned_to == current_user.id) | (Lead.assigned == current_user.name)
+    )
+
+def scope_lead_deletes(query: Query, db: Session, current_user) -> Query:
+    """Restrict a lead query to what current_user may delete, as DELETE /leads/{id} allows"""
+    role = current_user.role
+    if role and (role.role_name in ("Admin", "Sales Manager") or has(current_user, "all")):
+        # Admin and Sales Manager can delete any lead
+        return query
+    # Sales Executive and other users can only delete leads assigned to them
+    return query.filter(
+        (Lead.assigned_to == current_user.id) | (Lead.assigned == current_user.name)
+    )
+
+def reminders_on_live_leads(query: Query) -> Query:
+    """Restrict a reminder query to reminders without a lead or whose lead still exists"""
+    return query.filter((Reminder.lead_id == None) | exists().where(Lead.id == Reminder.lead_id))
+
+def filter_leads(
+    query: Query,
+    status: list[str] | None = None,
+    stage: list[str] | None = None,
+    source_type: list[str] | None = None,
+    assigned_to: int | None = None,
+    follow_up_required: bool | None = None,
+    created_from: date | None = None,
+    created_to: date | None = None,
+    follow_up_from: date | None = None,
+    follow_up_to: date | None = None,
+) -> Query:
+    """Apply the list filters; date ranges are inclusive on both ends"""
+    if status:
+        query = query.filter(Lead.status.in_(status))
+    if stage:
+        query = query.filter(Lead.stage.in_(stage))
+    if source_type:
+        query = query.filter(Lead.source_type.in_(source_type))
+    if assigned_to is not None:
+        query = query.filter(Lead.assigned_to == assigned_to)
+    if follow_up_required is not None:
+        query = query.filter(Lead.follow_up_required == follow_up_required)
+    created_at = type_coerce(Lead.created_at, String)
+    if created_from:
+        query = query.filter(created_at >= created_from.isoformat())
+    if created_to:
+        query = query.filter(created_at < (created_to + timedelta(days=1)).isoformat())
+    follow_up_date = type_coerce(Lead.follow_up_date, String)
+    if follow_up_from:
+        query = query.filter(follow_up_date >= follow_up_from.isoformat())
+    if follow_up_to:
+        query = query.filter(follow_up_date <= follow_up_to.isoformat())
+    return query
+
+def sort_key(sort: str):
+    """SQL expression a page is ordered and resumed by for a sort name"""
+    column, as_text, _ = SORT_COLUMNS[sort]
+    return type_coerce(column, String) if as_text else column
+
+def encode_cursor(sort: str, order: str, key, last_id: int) -> str:
+    raw = json.dumps([sort, order, None if key is None else str(key), last_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort: str, order: str):
+    """Return (key, last_id) from a cursor issued for the same sort/order"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, cursor_order, key, last_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError, binascii.Error):
+        raise InvalidCursor("Malformed cursor")
+    if cursor_sort != sort or cursor_order != order or not isinstance(last_id, int):
+        raise InvalidCursor("Cursor does not match the requested sort order")
+    if key is not None and sort == "id":
+        key = int(key)
+    return key, last_id
+
+def _after(key_expr, key, last_id: int, descending: bool, nullable: bool = True):
+    """
+    Rows strictly after (key, last_id). NULL sorts lowest on SQLite and MySQL,
+    so NULL keys come first ascending and last descending.
+    """
+    if not nullable and key is not None:
+        # Written as a range on the key so the index can seek to the page
+        if descending:
+            return and_(key_expr <= key, or_(key_expr < key, Lead.id < last_id))
+        return and_(key_expr >= key, or_(key_expr > key, Lead.id > last_id))
+    if descending:
+        if key is None:
+            return and_(key_expr.is_(None), Lead.id < last_id)
+        return or_(key_expr < key, and_(key_expr == key, Lead.id < last_id), key_expr.is_(None))
+    if key is None:
+        return or_(and_(key_expr.is_(None), Lead.id > last_id), key_expr.isnot(None))
+    return or_(key_expr > key, and_(key_expr == key, Lead.id > last_id))
+
+def page_query(
+    query: Query,
+    sort: str = DEFAULT_SORT,
+    order: str = DEFAULT_ORDER,
+    cursor: str | None = None,
+    limit: int | None = None,
+) -> Query:
+    """
+    The query paginate_leads() runs: ordered by (sort, id), resumed after the
+    cursor, with sort_key/sort_id columns appended and limit + 1 rows requested
+    so a following page can be detected.
+    """
+    descending = order == "desc"
+    key_expr = sort_key(sort)
+    if cursor:
+        key, last_id = decode_cursor(cursor, sort, order)
+        query = query.filter(_after(key_expr, key, last_id, descending, nullable=SORT_COLUMNS[sort][2]))
+    if sort == "id":
+        ordering = [Lead.id.desc() if descending else Lead.id.asc()]
+    elif descending:
+        ordering = [key_expr.desc(), Lead.id.desc()]
+    else:
+        ordering = [key_expr.asc(), Lead.id.asc()]
+    query = query.add_columns(key_expr.label("sort_key"), Lead.id.label("sort_id")).order_by(*ordering)
+    if limit is not None:
+        query = query.limit(limit + 1)
+    return query
+
+def paginate_leads(
+    query: Query,
+    sort: str = DEFAULT_SORT,
+    order: str = DEFAULT_ORDER,
+    cursor: str | None = None,
+    limit: int | None = None,
+):
+    """
+    Order the query by (sort, id) and return (rows, next_cursor). A query for
+    the Lead entity yields Lead objects; a column query yields column tuples.
+    Without a limit every matching row is returned and next_cursor is None.
+    """
+    width = len(query.column_descriptions)
+    entity_query = width == 1 and query.column_descriptions[0]["expr"] is Lead
+    rows = page_query(query, sort=sort, order=order, cursor=cursor, limit=limit).all()
+
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(sort, order, rows[-1].sort_key, rows[-1].sort_id)
+    if entity_query:
+        return [row[0] for row in rows], next_cursor
+    return [tuple(row[:width]) for row in rows], next_cursor
+
+def count_leads(query: Query) -> int:
+    """Total matching rows for the filtered, scoped query (no ordering/paging)"""
+    return query.order_by(None).count()
@@ -0,0 +1,37 @@
+"""
+Lead list serialization fast path
+List endpoints select only the LeadOut columns as plain tuples and serialize
+the whole page in one pass through a pre-built TypeAdapter, instead of loading
+ORM objects, validating each one into a LeadOut, dumping it back to a dict and
+letting response_model validate the list a second time.
+"""
+from pydantic import TypeAdapter
+from models.lead import Lead
+from schemas.lead import LeadOut
+
+# Columns selected for lead lists, in the order rows are unpacked
+LEAD_LIST_FIELDS = (
+    "id", "name", "email", "phone", "company", "source_type", "source",
+    "designation", "status", "stage", "assigned", "assigned_to", "created_by",
+    "follow_up_required", "follow_up_date", "follow_up_time", "follow_up_status",
+    "created_at", "updated_at",
+)
+LEAD_LIST_COLUMNS = tuple(getattr(Lead, field) for field in LEAD_LIST_FIELDS)
+
+_CREATED_BY = LEAD_LIST_FIELDS.index("created_by")
+
+lead_list_adapter = TypeAdapter(list[LeadOut])
+
+def lead_rows_to_dicts(rows, creator_names: dict) -> list[dict]:
+    """Build LeadOut-shaped dicts from LEAD_LIST_COLUMNS rows"""
+    items = []
+    for row in rows:
+        item = dict(zip(LEAD_LIST_FIELDS, row))
+        created_by = row[_CREATED_BY]
+        item["created_by_name"] = creator_names.get(created_by) if created_by else None
+        items.append(item)
+    return items
+
+def serialize_lead_rows(rows, creator_names: dict) -> bytes:
+    """JSON body for a lead list, validated against LeadOut in a single pass"""
+    return lead_list_adapter.dump_json(lead_list_adapter.validate_python(lead_rows_to_dicts(rows, creator_names)))
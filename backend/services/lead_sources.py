@@ -0,0 +1,54 @@
+"""
+Lead source normalization
+Form-based leads are grouped under source_type='Website' with the form name
+kept in source, so reports and dashboards see one "Website" category.
+Sources are normalized when a lead is written; migrations/normalize_lead_sources.py
+backfills rows written before that.
+"""
+from sqlalchemy import and_, or_
+
+FORM_SOURCE_NAMES = frozenset([
+    'Brochure Download',
+    'Product Profile Download',
+    'Talk to Sales',
+    'General Inquiry',
+    'Request a Demo'
+])
+
+# Submission form_type -> form name stored in lead.source
+FORM_TYPE_SOURCES = {
+    'contact': 'General Inquiry',
+    'talk_to_sales': 'Talk to Sales',
+    'talk': 'Talk to Sales',
+    'brochure': 'Brochure Download',
+    'product_profile': 'Product Profile Download',
+    'product-profile': 'Product Profile Download',
+    'demo': 'Request a Demo'
+}
+
+def normalize_source(source_type: str | None, source: str | None) -> tuple[str | None, str | None]:
+    """Return the normalized (source_type, source) pair for a lead"""
+    # If source is a form name but source_type is not 'Website', normalize it
+    if source and source in FORM_SOURCE_NAMES:
+        return 'Website', source
+    # Legacy: If source_type is a form name (old data structure), move it to source
+    if source_type and source_type in FORM_SOURCE_NAMES:
+        return 'Website', source_type if not source or source == 'Website' else source
+    return source_type, source
+
+def apply_normalized_source(lead):
+    """Normalize a lead's source columns in place before it is written"""
+    lead.source_type, lead.source = normalize_source(lead.source_type, lead.source)
+    return lead
+
+def source_for_form_type(form_type: str | None) -> str:
+    """Form name used as lead.source for a submission's form_type (handles variations)"""
+    normalized_form_type = form_type.lower().replace('-', '_') if form_type else ''
+    return FORM_TYPE_SOURCES.get(form_type) or FORM_TYPE_SOURCES.get(normalized_form_type) or 'Website Form'
+
+def needs_normalization(source_type_column, source_column):
+    """SQL predicate matching rows normalize_source() would change"""
+    return or_(
+        and_(source_column.in_(FORM_SOURCE_NAMES), or_(source_type_column.is_(None), source_type_column != 'Website')),
+        source_type_column.in_(FORM_SOURCE_NAMES),
+    )
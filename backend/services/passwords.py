@@ -0,0 +1,30 @@
+"""
+Password hashing on a dedicated, bounded thread pool
+bcrypt costs ~250 ms per call. Running it inline blocks the event loop (async
+handlers) or ties up the shared request threadpool (sync handlers), so every
+hash/verify goes through this executor instead.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from passlib.hash import bcrypt
+from config import PASSWORD_HASH_WORKERS
+
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+
+def hash_password(password: str) -> str:
+    """Hash from sync code (waits on the bounded pool)"""
+    return _executor.submit(bcrypt.hash, password).result()
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify from sync code (waits on the bounded pool)"""
+    return _executor.submit(bcrypt.verify, plain_password, hashed_password).result()
+
+async def hash_password_async(password: str) -> str:
+    """Hash without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, bcrypt.hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, bcrypt.verify, plain_password, hashed_password)
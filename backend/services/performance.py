@@ -0,0 +1,97 @@
+"""
+Team and organization performance metrics
+The reports read lead status counts and call-log totals per user from the
+rollup tables (services/report_rollups.py): a few rows per user, however many
+leads and call logs there are. source_metrics computes the same numbers with
+GROUP BY queries over leads and call_logs, to check the rollups against.
+"""
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+from models.call_log import CallLog
+from models.lead import Lead
+from models.report_rollup import CallStageRollup, LeadStatusRollup
+from services.lead_bulk import chunked
+
+CLOSED_WON_STATUSES = ("Closed Won", "Won")
+
+def _empty_metrics() -> dict:
+    return {
+        "total_leads": 0,
+        "total_calls": 0,
+        "total_dollar_value": 0,
+        "secured_orders": 0,
+        "status_counts": {},
+        "stage_distribution": {},
+    }
+
+def _with_rates(metrics: dict) -> dict:
+    closed_won = sum(metrics["status_counts"].get(status, 0) for status in CLOSED_WON_STATUSES)
+    metrics["closed_won"] = closed_won
+    metrics["conversion_rate"] = (closed_won / metrics["total_leads"] * 100) if metrics["total_leads"] > 0 else 0
+    return metrics
+
+def _add_rows(metrics: dict, lead_rows, call_rows):
+    for user_id, status, count in lead_rows:
+        user = metrics[user_id]
+        user["total_leads"] += count
+        # Leads without a status are rolled up under '' and reported under None, as grouping leads does
+        status = status or None
+        user["status_counts"][status] = user["status_counts"].get(status, 0) + count
+    for user_id, stage, count, dollar_value, secured in call_rows:
+        user = metrics[user_id]
+        user["total_calls"] += count
+        user["total_dollar_value"] += dollar_value
+        user["secured_orders"] += secured
+        if stage:
+            user["stage_distribution"][stage] = user["stage_distribution"].get(stage, 0) + count
+
+def user_metrics(db: Session, user_ids) -> dict:
+    """
+    user id -> {total_leads, total_calls, total_dollar_value, secured_orders,
+    status_counts, stage_distribution, closed_won, conversion_rate} for every
+    id in user_ids (zeroes for users with no leads or calls)
+    """
+    user_ids = sorted(set(user_ids))
+    metrics = {user_id: _empty_metrics() for user_id in user_ids}
+    for chunk in chunked(user_ids):
+        leads = db.query(LeadStatusRollup.user_id, LeadStatusRollup.status, LeadStatusRollup.lead_count).filter(
+            LeadStatusRollup.user_id.in_(chunk)
+        )
+        calls = db.query(
+            CallStageRollup.user_id,
+            CallStageRollup.stage,
+            CallStageRollup.call_count,
+            CallStageRollup.dollar_value,
+            CallStageRollup.secured_orders,
+        ).filter(CallStageRollup.user_id.in_(chunk))
+        _add_rows(metrics, leads, calls)
+    return {user_id: _with_rates(user) for user_id, user in metrics.items()}
+
+def source_metrics(db: Session, user_ids) -> dict:
+    """user_metrics computed from leads and call_logs directly"""
+    user_ids = sorted(set(user_ids))
+    metrics = {user_id: _empty_metrics() for user_id in user_ids}
+    for chunk in chunked(user_ids):
+        leads = db.query(Lead.assigned_to, func.coalesce(Lead.status, ''), func.count(Lead.id)).filter(
+            Lead.assigned_to.in_(chunk)
+        ).group_by(Lead.assigned_to, Lead.status)
+        calls = db.query(
+            CallLog.user_id,
+            CallLog.stage,
+            func.count(CallLog.id),
+            func.coalesce(func.sum(CallLog.dollar_value), 0),
+            func.coalesce(func.sum(case((CallLog.secured_order == True, 1), else_=0)), 0),
+        ).filter(CallLog.user_id.in_(chunk)).group_by(CallLog.user_id, CallLog.stage)
+        _add_rows(metrics, leads, calls)
+    return {user_id: _with_rates(user) for user_id, user in metrics.items()}
+
+def combine_metrics(metrics_list) -> dict:
+    """The metrics of several users added up, e.g. a manager's whole team"""
+    total = _empty_metrics()
+    for metrics in metrics_list:
+        for key in ("total_leads", "total_calls", "total_dollar_value", "secured_orders"):
+            total[key] += metrics[key]
+        for key in ("status_counts", "stage_distribution"):
+            for name, count in metrics[key].items():
+                total[key][name] = total[key].get(name, 0) + count
+    return _with_rates(total)
@@ -0,0 +1,116 @@
+"""
+Compiled permission registry
+Role permission JSON is compiled once per role into immutable read/write
+bitmasks, with the implication rules ("view" grants read access to leads,
+submissions and reports; "leads" grants the lead sub-permissions) folded in.
+has(principal, permission, write) is then a single bit test.
+"""
+import threading
+from sqlalchemy.orm import Session
+from models.role import Role
+
+# Permissions known up front; names seen in role JSON later get the next free bit
+KNOWN_PERMISSIONS = (
+    "all", "view", "leads", "submissions", "reports", "users", "roles",
+    "settings", "configuration", "convert_to_lead", "delete_submission",
+    "lead_assignment", "lead_followup", "lead_status_update", "lead_comments",
+    "reminders",
+)
+
+# Read-only implications: holding the key grants read access to the values.
+# Write access always requires the explicit permission (or "all").
+READ_IMPLICATIONS = {
+    "view": ("leads", "submissions", "reports"),
+    "leads": ("lead_status_update", "lead_comments", "lead_assignment"),
+}
+
+_bits = {name: 1 << index for index, name in enumerate(KNOWN_PERMISSIONS)}
+_bits_lock = threading.Lock()
+
+def permission_bit(name: str) -> int:
+    """Bit for a permission name, allocating one for names not seen before"""
+    bit = _bits.get(name)
+    if bit is None:
+        with _bits_lock:
+            bit = _bits.get(name)
+            if bit is None:
+                bit = 1 << len(_bits)
+                _bits[name] = bit
+    return bit
+
+class CompiledPermissions:
+    """Immutable read/write masks for one role's permission JSON"""
+    __slots__ = ("source", "is_admin", "read_mask", "write_mask")
+
+    def __init__(self, permissions: dict | None):
+        permissions = dict(permissions or {})
+        granted = [name for name, value in permissions.items() if value == True]
+        write_mask = 0
+        for name in granted:
+            write_mask |= permission_bit(name)
+        read_mask = write_mask
+        for name in granted:
+            for implied in READ_IMPLICATIONS.get(name, ()):
+                read_mask |= permission_bit(implied)
+        object.__setattr__(self, "source", permissions)
+        object.__setattr__(self, "is_admin", permissions.get("all") == True)
+        object.__setattr__(self, "read_mask", read_mask)
+        object.__setattr__(self, "write_mask", write_mask)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CompiledPermissions is immutable")
+
+    def allows(self, permission: str, write: bool = False) -> bool:
+        if self.is_admin:
+            return True
+        bit = _bits.get(permission)
+        if bit is None:
+            return False
+        return bool((self.write_mask if write else self.read_mask) & bit)
+
+class PermissionRegistry:
+    """role_id -> CompiledPermissions, compiled at startup and on /roles writes"""
+
+    def __init__(self):
+        self._roles = {}
+        self._lock = threading.Lock()
+
+    def load(self, db: Session):
+        compiled = {role.id: CompiledPermissions(role.permissions) for role in db.query(Role).all()}
+        with self._lock:
+            self._roles = compiled
+
+    def compile_role(self, role: Role) -> CompiledPermissions:
+        compiled = CompiledPermissions(role.permissions)
+        with self._lock:
+            self._roles[role.id] = compiled
+        return compiled
+
+    def drop_role(self, role_id: int):
+        with self._lock:
+            self._roles.pop(role_id, None)
+
+    def for_role(self, role_id: int, permissions: dict | None) -> CompiledPermissions:
+        """
+        Compiled masks for a role snapshot. Reuses the registry entry when it was
+        compiled from the same JSON; a differing snapshot is compiled on its own
+        without replacing the registry entry.
+        """
+        with self._lock:
+            compiled = self._roles.get(role_id)
+        if compiled is not None and compiled.source == (permissions or {}):
+            return compiled
+        snapshot = CompiledPermissions(permissions)
+        if compiled is None:
+            with self._lock:
+                self._roles.setdefault(role_id, snapshot)
+        return snapshot
+
+permission_registry = PermissionRegistry()
+
+def has(principal, permission: str, write: bool = False) -> bool:
+    """O(1) permission check for a resolved principal"""
+    role = principal.role if principal is not None else None
+    if role is None:
+        return False
+    return role.compiled.allows(permission, write)
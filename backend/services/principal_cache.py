@@ -0,0 +1,130 @@
+"""
+Principal cache for authenticated requests
+Keeps the resolved user, role and permissions for a (user_id, token) pair so
+the auth dependencies don't query users/roles on every request.
+"""
+import threading
+import time
+from config import PRINCIPAL_CACHE_TTL, PRINCIPAL_CACHE_MAX_ENTRIES
+from services.permissions import permission_registry
+
+# Claims a token must carry to be verified without a database lookup
+_IDENTITY_CLAIMS = ("sub", "user_id", "name", "role_id", "hierarchy_level", "tv")
+
+class RoleSnapshot:
+    """Detached copy of a Role row (safe to share across requests/sessions)"""
+    __slots__ = ("id", "role_name", "hierarchy_level", "permissions", "compiled")
+
+    def __init__(self, id, role_name, hierarchy_level, permissions):
+        self.id = id
+        self.role_name = role_name
+        self.hierarchy_level = hierarchy_level
+        self.permissions = dict(permissions or {})
+        self.compiled = permission_registry.for_role(id, self.permissions)
+
+    @classmethod
+    def from_role(cls, role):
+        return cls(role.id, role.role_name, role.hierarchy_level, role.permissions)
+
+class Principal:
+    """
+    Resolved identity for a request: the user's columns plus their role.
+    Exposes the same attributes handlers used on the User row (id, name, email,
+    role_id, manager_id) so it can be used wherever current_user was.
+    """
+    __slots__ = ("id", "name", "email", "role_id", "manager_id", "role")
+
+    def __init__(self, user, role=None):
+        self.id = user.id
+        self.name = user.name
+        self.email = user.email
+        self.role_id = user.role_id
+        self.manager_id = user.manager_id
+        self.role = RoleSnapshot.from_role(role) if role is not None else None
+
+    @classmethod
+    def from_claims(cls, claims: dict):
+        """
+        Build a principal from the signed claims issued by /auth/login.
+        Returns None for tokens that predate the full claim set.
+        """
+        if any(key not in claims for key in _IDENTITY_CLAIMS):
+            return None
+        principal = cls.__new__(cls)
+        principal.id = claims["user_id"]
+        principal.name = claims["name"]
+        principal.email = claims["sub"]
+        principal.role_id = claims["role_id"]
+        principal.manager_id = claims.get("manager_id")
+        principal.role = None
+        if claims["role_id"] is not None and claims.get("role_name") is not None:
+            principal.role = RoleSnapshot(
+                claims["role_id"], claims["role_name"], claims["hierarchy_level"], claims.get("permissions")
+            )
+        return principal
+
+    @property
+    def role_name(self):
+        return self.role.role_name if self.role else None
+
+    @property
+    def permissions(self):
+        return self.role.permissions if self.role else {}
+
+class PrincipalCache:
+    """Thread-safe TTL cache of principals keyed by (user_id, token)"""
+
+    def __init__(self, ttl: int = PRINCIPAL_CACHE_TTL, max_entries: int = PRINCIPAL_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id, token: str):
+        if self.ttl <= 0:
+            return None
+        key = (user_id, token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, principal = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            return principal
+
+    def put(self, user_id, token: str, principal: Principal):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._evict_locked()
+            self._entries[(user_id, token)] = (time.monotonic() + self.ttl, principal)
+
+    def invalidate_user(self, user_id: int):
+        """Drop every cached token for a user (called on user update/delete)"""
+        with self._lock:
+            for key in [k for k, (_, p) in self._entries.items() if p.id == user_id]:
+                del self._entries[key]
+
+    def invalidate_role(self, role_id: int):
+        """Drop every cached principal holding a role (called on role update/delete)"""
+        with self._lock:
+            for key in [k for k, (_, p) in self._entries.items() if p.role_id == role_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _evict_locked(self):
+        now = time.monotonic()
+        for key in [k for k, (exp, _) in self._entries.items() if exp < now]:
+            del self._entries[key]
+        # Still full: drop the oldest half (dicts keep insertion order)
+        if len(self._entries) >= self.max_entries:
+            for key in list(self._entries)[: max(1, len(self._entries) // 2)]:
+                del self._entries[key]
+
+principal_cache = PrincipalCache()
@@ -0,0 +1,130 @@
+"""
+Rollup tables behind the performance reports
+lead_status_rollups holds the number of leads per assignee and status;
+call_stage_rollups the number of call logs, secured orders and dollar value per
+user and stage. Triggers on leads and call_logs apply every insert, update and
+delete to them in the writing transaction, so bulk statements, merges and
+writes from other processes are counted too, and a rolled-back write leaves no
+trace. The reports read O(users x statuses) rollup rows instead of grouping
+every lead and call log.
+"""
+from sqlalchemy.engine import Engine
+from database import Base
+from models.report_rollup import CallStageRollup, LeadStatusRollup
+
+_TRIGGER_PREFIX = 'report_rollup'
+
+# rollup table -> (source table, user id SQL, key column, key SQL, {counter: increment SQL}, columns that move a row);
+# {r} is the row alias: new/old in triggers, the source table when rebuilding. The first counter
+# is a row count: a rollup row is dropped when it reaches zero
+_ROLLUPS = {
+    LeadStatusRollup.__tablename__: (
+        'leads', "{r}.assigned_to", 'status', "coalesce({r}.status, '')", {'lead_count': "1"},
+        ('assigned_to', 'status'),
+    ),
+    CallStageRollup.__tablename__: (
+        'call_logs', "{r}.user_id", 'stage', "coalesce({r}.stage, '')",
+        {
+            'call_count': "1",
+            'secured_orders': "CASE WHEN {r}.secured_order THEN 1 ELSE 0 END",
+            'dollar_value': "coalesce({r}.dollar_value, 0)",
+        },
+        ('user_id', 'stage', 'secured_order', 'dollar_value'),
+    ),
+}
+
+def _add_sql(dialect: str, rollup: str, row: str) -> str:
+    """Add a source row's counters to its rollup row, creating that if needed"""
+    _, user_id, key, key_value, counters, _ = _ROLLUPS[rollup]
+    values = ", ".join(value.format(r=row) for value in counters.values())
+    insert = (
+        f"INSERT INTO {rollup}(user_id, {key}, {', '.join(counters)}) "
+        f"SELECT {user_id.format(r=row)}, {key_value.format(r=row)}, {values}"
+    )
+    if dialect == 'mysql':
+        updates = ", ".join(f"{counter} = {counter} + VALUES({counter})" for counter in counters)
+        return f"{insert} FROM DUAL WHERE {user_id.format(r=row)} IS NOT NULL ON DUPLICATE KEY UPDATE {updates}"
+    # The WHERE keeps SQLite from reading ON CONFLICT as part of the SELECT
+    updates = ", ".join(f"{counter} = {counter} + excluded.{counter}" for counter in counters)
+    return f"{insert} WHERE {user_id.format(r=row)} IS NOT NULL ON CONFLICT(user_id, {key}) DO UPDATE SET {updates}"
+
+def _subtract_sql(rollup: str, row: str) -> list:
+    """Take a source row's counters off its rollup row and drop the rollup row once it's empty"""
+    _, user_id, key, key_value, counters, _ = _ROLLUPS[rollup]
+    where = f"user_id = {user_id.format(r=row)} AND {key} = {key_value.format(r=row)}"
+    updates = ", ".join(f"{counter} = {counter} - {value.format(r=row)}" for counter, value in counters.items())
+    return [
+        f"UPDATE {rollup} SET {updates} WHERE {where}",
+        f"DELETE FROM {rollup} WHERE {where} AND {next(iter(counters))} <= 0",
+    ]
+
+def _triggers(dialect: str) -> dict:
+    """Trigger name -> CREATE TRIGGER statement"""
+    triggers = {}
+    for rollup, (table, *_, watched) in _ROLLUPS.items():
+        name = f"{_TRIGGER_PREFIX}_{table}"
+        on_insert = [_add_sql(dialect, rollup, 'new')]
+        on_update = _subtract_sql(rollup, 'old') + [_add_sql(dialect, rollup, 'new')]
+        on_delete = _subtract_sql(rollup, 'old')
+        if dialect == 'mysql':
+            # MySQL has no UPDATE OF column list; skip updates that don't touch the rolled-up columns
+            unchanged = " AND ".join(f"old.{column} <=> new.{column}" for column in watched)
+            triggers[f"{name}_ai"] = f"AFTER INSERT ON {table} FOR EACH ROW BEGIN {'; '.join(on_insert)}; END"
+            triggers[f"{name}_au"] = (
+                f"AFTER UPDATE ON {table} FOR EACH ROW BEGIN IF NOT ({unchanged}) THEN {'; '.join(on_update)}; END IF; END"
+            )
+            triggers[f"{name}_ad"] = f"AFTER DELETE ON {table} FOR EACH ROW BEGIN {'; '.join(on_delete)}; END"
+        else:
+            triggers[f"{name}_ai"] = f"AFTER INSERT ON {table} BEGIN {'; '.join(on_insert)}; END"
+            triggers[f"{name}_au"] = f"AFTER UPDATE OF {', '.join(watched)} ON {table} BEGIN {'; '.join(on_update)}; END"
+            triggers[f"{name}_ad"] = f"AFTER DELETE ON {table} BEGIN {'; '.join(on_delete)}; END"
+    return {name: f"CREATE TRIGGER {name} {body}" for name, body in triggers.items()}
+
+def _existing_triggers(conn) -> set:
+    if conn.dialect.name == 'mysql':
+        return set(conn.exec_driver_sql(
+            "SELECT TRIGGER_NAME FROM information_schema.TRIGGERS WHERE TRIGGER_SCHEMA = DATABASE() AND TRIGGER_NAME LIKE %s",
+            (f"{_TRIGGER_PREFIX}%",)
+        ).scalars())
+    return set(conn.exec_driver_sql(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE ?", (f"{_TRIGGER_PREFIX}%",)
+    ).scalars())
+
+def _refill(conn):
+    for rollup, (table, user_id, key, key_value, counters, _) in _ROLLUPS.items():
+        _, *sums = counters
+        totals = ["count(*)"] + [f"coalesce(sum({counters[counter].format(r=table)}), 0)" for counter in sums]
+        conn.exec_driver_sql(f"DELETE FROM {rollup}")
+        conn.exec_driver_sql(
+            f"INSERT INTO {rollup}(user_id, {key}, {', '.join(counters)}) "
+            f"SELECT {user_id.format(r=table)}, {key_value.format(r=table)}, {', '.join(totals)} FROM {table} "
+            f"WHERE {user_id.format(r=table)} IS NOT NULL "
+            f"GROUP BY {user_id.format(r=table)}, {key_value.format(r=table)}"
+        )
+
+def ensure_report_rollups(bind: Engine) -> bool:
+    """
+    Create the rollup tables and triggers if missing. The rollups are refilled
+    whenever a trigger had to be created, since writes made without it weren't
+    counted. Returns True if anything was built.
+    """
+    if bind.dialect.name not in ('sqlite', 'mysql'):
+        return False
+    for rollup in _ROLLUPS:
+        Base.metadata.tables[rollup].create(bind=bind, checkfirst=True)
+    triggers = _triggers(bind.dialect.name)
+    with bind.begin() as conn:
+        existing = _existing_triggers(conn)
+        missing = [name for name in triggers if name not in existing]
+        if not missing:
+            return False
+        for name in missing:
+            conn.exec_driver_sql(triggers[name])
+        _refill(conn)
+    return True
+
+def rebuild_report_rollups(bind: Engine):
+    """Recompute every rollup row from leads and call_logs, e.g. after editing them with triggers disabled"""
+    ensure_report_rollups(bind)
+    with bind.begin() as conn:
+        _refill(conn)
@@ -0,0 +1,108 @@
+"""
+Daily performance report snapshots and the trends read from them
+take_snapshot stores every executive's metrics, and every manager's team
+totals, as of one day (read from the report rollups, so a snapshot costs
+O(users)). Past periods can't be recomputed from leads once statuses change;
+the trends endpoint reads them back from the snapshots instead, taking the
+last snapshot of each day, week or month: a fixed number of rows per bucket
+whatever the number of leads.
+"""
+from datetime import date, timedelta
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+from models.report_snapshot import ReportSnapshot
+from services.performance import user_metrics, combine_metrics
+from services.team_index import team_index, MANAGER_ROLE_NAME
+
+EXECUTIVE_SCOPE = 'executive'
+TEAM_SCOPE = 'team'
+TREND_BUCKETS = ('day', 'week', 'month')
+
+_METRIC_COLUMNS = ("total_leads", "closed_won", "total_calls", "secured_orders", "total_dollar_value", "status_counts", "stage_distribution")
+
+def bucket_start(day: date, bucket: str) -> date:
+    """First day of the bucket (day, ISO week starting Monday, or month) that day falls in"""
+    if bucket == 'week':
+        return day - timedelta(days=day.weekday())
+    if bucket == 'month':
+        return day.replace(day=1)
+    return day
+
+def _row(day: date, scope: str, user_id: int, manager_id, metrics: dict) -> dict:
+    row = {column: metrics[column] for column in _METRIC_COLUMNS}
+    row.update(snapshot_date=day, scope=scope, user_id=user_id, manager_id=manager_id)
+    return row
+
+def take_snapshot(db: Session, day: date) -> int:
+    """
+    Store (or replace) the snapshot for day from the current metrics; returns
+    the number of rows written. Doesn't commit.
+    """
+    managers = team_index.users_with_role(db, MANAGER_ROLE_NAME)
+    teams = {manager.id: team_index.team_of(db, manager.id) for manager in managers}
+    executives = team_index.users(db, team_index.executive_ids(db))
+    metrics = user_metrics(db, (executive.id for executive in executives))
+
+    rows = [_row(day, EXECUTIVE_SCOPE, executive.id, executive.manager_id, metrics[executive.id]) for executive in executives]
+    rows += [
+        _row(day, TEAM_SCOPE, manager_id, None, combine_metrics(metrics[user_id] for user_id in team if user_id in metrics))
+        for manager_id, team in teams.items()
+    ]
+    db.execute(delete(ReportSnapshot).where(ReportSnapshot.snapshot_date == day))
+    if rows:
+        db.execute(insert(ReportSnapshot), rows)
+    return len(rows)
+
+def _metrics_out(snapshot: ReportSnapshot) -> dict:
+    return {
+        "total_leads": snapshot.total_leads,
+        "total_calls": snapshot.total_calls,
+        "conversion_rate": round(snapshot.closed_won / snapshot.total_leads * 100, 2) if snapshot.total_leads else 0,
+        "total_dollar_value": round(snapshot.total_dollar_value, 2),
+        "secured_orders": snapshot.secured_orders,
+        "status_counts": snapshot.status_counts or {},
+        "stage_distribution": snapshot.stage_distribution or {},
+        "closed_won": snapshot.closed_won,
+    }
+
+def trend_series(db: Session, date_from: date, date_to: date, bucket: str, manager_id: int | None = None) -> list:
+    """
+    One entry per bucket between date_from and date_to that has a snapshot:
+    {period, snapshot_date, executives, teams}, from the bucket's last
+    snapshot. With manager_id, only that manager's executives and team.
+    """
+    in_range = db.query(ReportSnapshot.snapshot_date).filter(
+        ReportSnapshot.snapshot_date >= date_from, ReportSnapshot.snapshot_date <= date_to
+    ).distinct()
+    last_of_bucket = {}
+    for (day,) in in_range:
+        period = bucket_start(day, bucket)
+        last_of_bucket[period] = max(day, last_of_bucket.get(period, day))
+    if not last_of_bucket:
+        return []
+
+    snapshots = db.query(ReportSnapshot).filter(ReportSnapshot.snapshot_date.in_(last_of_bucket.values()))
+    if manager_id is not None:
+        snapshots = snapshots.filter(
+            ((ReportSnapshot.scope == EXECUTIVE_SCOPE) & (ReportSnapshot.manager_id == manager_id))
+            | ((ReportSnapshot.scope == TEAM_SCOPE) & (ReportSnapshot.user_id == manager_id))
+        )
+    snapshots = snapshots.order_by(ReportSnapshot.snapshot_date, ReportSnapshot.scope, ReportSnapshot.user_id).all()
+    names = {user.id: user.name for user in team_index.users(db, {snapshot.user_id for snapshot in snapshots})}
+
+    series = {
+        day: {"period": period.isoformat(), "snapshot_date": day.isoformat(), "executives": [], "teams": []}
+        for period, day in sorted(last_of_bucket.items())
+    }
+    for snapshot in snapshots:
+        entry = series[snapshot.snapshot_date]
+        if snapshot.scope == TEAM_SCOPE:
+            entry["teams"].append({"manager_id": snapshot.user_id, "manager_name": names.get(snapshot.user_id), **_metrics_out(snapshot)})
+        else:
+            entry["executives"].append({
+                "user_id": snapshot.user_id,
+                "user_name": names.get(snapshot.user_id),
+                "manager_id": snapshot.manager_id,
+                **_metrics_out(snapshot),
+            })
+    return list(series.values())
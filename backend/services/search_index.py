@@ -0,0 +1,221 @@
+"""
+Full-text search over leads, comments and call-log notes
+On SQLite an FTS5 table, search_index, holds one document per lead, comment
+and call log. Triggers on the source tables keep it in sync on every write,
+bulk statements and writes from other processes included. On MySQL the source
+tables carry InnoDB FULLTEXT indexes instead, which the server maintains
+itself. Either way a search is an index lookup joined to leads by primary key
+for scoping, so its cost follows the number of matches, not the table sizes.
+"""
+import re
+from sqlalchemy import Column, Integer, MetaData, String, Table, Text, func, inspect, literal, literal_column, or_, select, union_all
+from sqlalchemy.orm import Session
+from models.call_log import CallLog
+from models.comment import Comment
+from models.lead import Lead
+from services.lead_queries import scope_leads
+from services.permissions import has
+
+SEARCH_TABLE = 'search_index'
+MAX_SEARCH_TERMS = 8
+
+# Document kinds. A document's rowid is source id * _KIND_SLOTS + code, so the
+# triggers replace a document by rowid instead of scanning the table
+KIND_CODES = {'lead': 1, 'comment': 2, 'call_log': 3}
+_KIND_SLOTS = 4
+
+CALL_LOG_TEXT_COLUMNS = ('objective', 'planning_notes', 'post_meeting_notes', 'follow_up_notes', 'challenges')
+
+# kind -> (source table, title SQL, body SQL, lead id SQL, owner id SQL, columns that change the document);
+# {r} is the row alias: new/old in triggers, the table name when backfilling
+_DOCUMENTS = {
+    'lead': (
+        'leads', "{r}.name", "trim(coalesce({r}.email, '') || ' ' || coalesce({r}.company, ''))", "{r}.id", "NULL",
+        ('name', 'email', 'company'),
+    ),
+    'comment': ('comments', "NULL", "{r}.text", "{r}.lead_id", "NULL", ('text', 'lead_id')),
+    'call_log': (
+        'call_logs', "{r}.objective",
+        "trim(" + " || ' ' || ".join(f"coalesce({{r}}.{column}, '')" for column in CALL_LOG_TEXT_COLUMNS[1:]) + ")",
+        "{r}.lead_id", "{r}.user_id",
+        CALL_LOG_TEXT_COLUMNS + ('lead_id', 'user_id'),
+    ),
+}
+
+# Titles (lead name, call objective) rank above body text
+_RANK = "bm25(0, 0, 0, 0, 5.0, 1.0)"
+
+# MySQL: table -> (index name, columns)
+MYSQL_FULLTEXT_INDEXES = {
+    'leads': ('ft_leads_search', ('name', 'email', 'company')),
+    'comments': ('ft_comments_search', ('text',)),
+    'call_logs': ('ft_call_logs_search', CALL_LOG_TEXT_COLUMNS),
+}
+
+# Only used to build queries; not in Base.metadata because create_all can't create virtual tables
+search_table = Table(
+    SEARCH_TABLE, MetaData(),
+    Column('rowid', Integer, primary_key=True),
+    Column('kind', String),
+    Column('entity_id', Integer),
+    Column('lead_id', Integer),
+    Column('owner_id', Integer),
+    Column('title', Text),
+    Column('body', Text),
+)
+
+def _rowid_sql(kind: str, row: str) -> str:
+    return f"{row}.id * {_KIND_SLOTS} + {KIND_CODES[kind]}"
+
+def _document_select(kind: str, row: str) -> str:
+    _, title, body, lead_id, owner_id, _ = _DOCUMENTS[kind]
+    return (
+        f"{_rowid_sql(kind, row)}, '{kind}', {row}.id, {lead_id.format(r=row)}, "
+        f"{owner_id.format(r=row)}, {title.format(r=row)}, {body.format(r=row)}"
+    )
+
+def _insert_sql(kind: str, row: str) -> str:
+    return f"INSERT INTO {SEARCH_TABLE}(rowid, kind, entity_id, lead_id, owner_id, title, body) VALUES ({_document_select(kind, row)})"
+
+def _sqlite_triggers() -> dict:
+    """Trigger name -> CREATE TRIGGER statement"""
+    triggers = {}
+    for kind, (table, *_, watched) in _DOCUMENTS.items():
+        delete = f"DELETE FROM {SEARCH_TABLE} WHERE rowid = {_rowid_sql(kind, 'old')}"
+        triggers[f"{SEARCH_TABLE}_{table}_ai"] = f"AFTER INSERT ON {table} BEGIN {_insert_sql(kind, 'new')}; END"
+        triggers[f"{SEARCH_TABLE}_{table}_au"] = (
+            f"AFTER UPDATE OF {', '.join(watched)} ON {table} BEGIN {delete}; {_insert_sql(kind, 'new')}; END"
+        )
+        triggers[f"{SEARCH_TABLE}_{table}_ad"] = f"AFTER DELETE ON {table} BEGIN {delete}; END"
+    return {name: f"CREATE TRIGGER IF NOT EXISTS {name} {body}" for name, body in triggers.items()}
+
+def _backfill_sqlite(conn):
+    conn.exec_driver_sql(f"DELETE FROM {SEARCH_TABLE}")
+    for kind, (table, *_) in _DOCUMENTS.items():
+        conn.exec_driver_sql(
+            f"INSERT INTO {SEARCH_TABLE}(rowid, kind, entity_id, lead_id, owner_id, title, body) "
+            f"SELECT {_document_select(kind, table)} FROM {table}"
+        )
+
+def ensure_search_index(bind) -> bool:
+    """
+    Create whatever part of the search index is missing. On SQLite the FTS
+    table is (re)filled when it or any of its triggers had to be created, since
+    writes made meanwhile weren't indexed. Returns True if anything was built.
+    """
+    if bind.dialect.name == 'sqlite':
+        triggers = _sqlite_triggers()
+        with bind.begin() as conn:
+            existing = set(conn.exec_driver_sql(
+                "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger') AND name LIKE ?", (f"{SEARCH_TABLE}%",)
+            ).scalars())
+            if SEARCH_TABLE in existing and existing.issuperset(triggers):
+                return False
+            conn.exec_driver_sql(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+                "kind UNINDEXED, entity_id UNINDEXED, lead_id UNINDEXED, owner_id UNINDEXED, title, body, "
+                "prefix='2 3', tokenize='unicode61 remove_diacritics 2')"
+            )
+            conn.exec_driver_sql(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rank) VALUES ('rank', '{_RANK}')")
+            for ddl in triggers.values():
+                conn.exec_driver_sql(ddl)
+            _backfill_sqlite(conn)
+        return True
+    if bind.dialect.name == 'mysql':
+        inspector = inspect(bind)
+        built = False
+        for table, (index_name, columns) in MYSQL_FULLTEXT_INDEXES.items():
+            if index_name in {index['name'] for index in inspector.get_indexes(table)}:
+                continue
+            with bind.begin() as conn:
+                conn.exec_driver_sql(f"ALTER TABLE {table} ADD FULLTEXT INDEX {index_name} ({', '.join(columns)})")
+            built = True
+        return built
+    return False
+
+def rebuild_search_index(bind):
+    """Re-index every document from the source tables (MySQL keeps its FULLTEXT indexes current itself)"""
+    ensure_search_index(bind)
+    if bind.dialect.name == 'sqlite':
+        with bind.begin() as conn:
+            _backfill_sqlite(conn)
+            conn.exec_driver_sql(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')")
+
+def search_terms(q: str) -> list:
+    """Words of a user query; punctuation never reaches the match syntax"""
+    return re.findall(r"\w+", q.lower())[:MAX_SEARCH_TERMS]
+
+def _fts5_match(terms) -> str:
+    # Every term must match; terms of two or more characters also match as prefixes
+    return " ".join(f'"{term}"*' if len(term) > 1 else f'"{term}"' for term in terms)
+
+def _mysql_against(terms) -> str:
+    return " ".join(f"+{term}*" for term in terms)
+
+def _search_sqlite(db: Session, current_user, terms, limit: int, offset: int):
+    fts = search_table
+    fts_table = literal_column(SEARCH_TABLE)
+    query = db.query(
+        fts.c.kind,
+        fts.c.entity_id,
+        fts.c.lead_id,
+        Lead.name,
+        func.snippet(fts_table, -1, '', '', '...', 16),
+    ).join(Lead, Lead.id == fts.c.lead_id).filter(fts_table.op('MATCH')(_fts5_match(terms)))
+    query = scope_leads(query, db, current_user)
+    if not has(current_user, "all"):
+        # Call logs are private to the user who logged them
+        query = query.filter(or_(fts.c.kind != 'call_log', fts.c.owner_id == current_user.id))
+    return query.order_by(literal_column(f"{SEARCH_TABLE}.rank"), fts.c.rowid).limit(limit).offset(offset).all()
+
+def _search_mysql(db: Session, current_user, terms, limit: int, offset: int):
+    from sqlalchemy.dialects.mysql import match
+    against = _mysql_against(terms)
+
+    def score(*columns):
+        return match(*columns, against=against).in_boolean_mode()
+
+    lead_score = score(Lead.name, Lead.email, Lead.company)
+    comment_score = score(Comment.text)
+    call_log_score = score(*(getattr(CallLog, column) for column in CALL_LOG_TEXT_COLUMNS))
+    queries = [
+        db.query(
+            literal('lead').label('kind'), Lead.id.label('entity_id'), Lead.id.label('lead_id'), Lead.name.label('lead_name'),
+            func.concat_ws(' ', Lead.email, Lead.company).label('snippet'), lead_score.label('score'),
+        ).filter(lead_score),
+        db.query(
+            literal('comment').label('kind'), Comment.id.label('entity_id'), Comment.lead_id.label('lead_id'),
+            Lead.name.label('lead_name'), func.left(Comment.text, 200).label('snippet'), comment_score.label('score'),
+        ).join(Lead, Lead.id == Comment.lead_id).filter(comment_score),
+        db.query(
+            literal('call_log').label('kind'), CallLog.id.label('entity_id'), CallLog.lead_id.label('lead_id'),
+            Lead.name.label('lead_name'),
+            func.left(func.concat_ws(' ', *(getattr(CallLog, column) for column in CALL_LOG_TEXT_COLUMNS)), 200).label('snippet'),
+            call_log_score.label('score'),
+        ).join(Lead, Lead.id == CallLog.lead_id).filter(call_log_score),
+    ]
+    if not has(current_user, "all"):
+        # Call logs are private to the user who logged them
+        queries[2] = queries[2].filter(CallLog.user_id == current_user.id)
+    hits = union_all(*(scope_leads(query, db, current_user).statement for query in queries)).subquery()
+    statement = select(hits.c.kind, hits.c.entity_id, hits.c.lead_id, hits.c.lead_name, hits.c.snippet).order_by(
+        hits.c.score.desc(), hits.c.kind, hits.c.entity_id
+    )
+    return db.execute(statement.limit(limit).offset(offset)).all()
+
+def search(db: Session, current_user, q: str, limit: int, offset: int = 0) -> list:
+    """
+    Ranked documents matching every word of q among the leads current_user can
+    see, as dicts with entity_type, entity_id, lead_id, lead_name and snippet
+    """
+    terms = search_terms(q)
+    if not terms:
+        return []
+    if db.get_bind().dialect.name == 'mysql':
+        rows = _search_mysql(db, current_user, terms, limit, offset)
+    else:
+        rows = _search_sqlite(db, current_user, terms, limit, offset)
+    return [
+        {"entity_type": kind, "entity_id": entity_id, "lead_id": lead_id, "lead_name": lead_name, "snippet": snippet}
+        for kind, entity_id, lead_id, lead_name, snippet in rows
+    ]
@@ -0,0 +1,181 @@
+"""
+Newest-first form submission feeds
+The website's forms database keeps each form in its own table. Every table is
+read in (submitted_at, id) descending order through its own streaming cursor
+and the streams are merged lazily with a heap, so a page of N submissions
+fetches at most N + 1 rows per table and holds one batch per table in memory,
+instead of converting and sorting every row. Rows are column tuples, turned
+into submissions by the converters in services/form_converters.py. Pages are keyset-paginated on
+(submitted_at, form table, id) across the merged stream; the CRM Submission
+table is paged the same way with a single stream.
+Timestamps are compared as their stored text so a cursor value round-trips
+exactly (see services/lead_queries.py).
+"""
+import base64
+import binascii
+import heapq
+import json
+import threading
+from itertools import islice
+from sqlalchemy import String, and_, or_, type_coerce
+from sqlalchemy.orm import Session
+from models.submission import Submission
+from services.form_converters import converter_for, form_columns
+from services.lead_queries import InvalidCursor
+from config import FORMS_DB_PAGE_CACHE_ENTRIES
+
+FEED_BATCH_SIZE = 200
+
+# Form tables newest-first listings read, in tie-break order: form type -> (model name, time column, demo_date filter)
+FORM_TABLES = {
+    'contact': ('ContactForm', 'submitted_at', False),
+    'demo': ('ContactForm', 'submitted_at', True),
+    'brochure': ('BrochureForm', 'submitted_at', None),
+    'product-profile': ('ProductProfileForm', 'submitted_at', None),
+    'talk': ('TalkToSalesForm', 'submitted_at', None),
+    'newsletter': ('NewsletterSubscription', 'subscribed_at', None),
+}
+_RANKS = {form_type: rank for rank, form_type in enumerate(FORM_TABLES)}
+
+# Other names a form type is requested by; submissions are labelled with the requested name
+FORM_TYPE_ALIASES = {'general': 'contact', 'product_profile': 'product-profile', 'talk_to_sales': 'talk'}
+
+def form_models() -> dict:
+    # Imported here: database_forms is only set up for USE_FORMS_DB
+    from models.external.brochure_forms import BrochureForm
+    from models.external.contact_forms import ContactForm
+    from models.external.newsletter_subscriptions import NewsletterSubscription
+    from models.external.product_profile_forms import ProductProfileForm
+    from models.external.talk_to_sales_forms import TalkToSalesForm
+    return {model.__name__: model for model in (BrochureForm, ContactForm, NewsletterSubscription, ProductProfileForm, TalkToSalesForm)}
+
+def encode_cursor(key: str, rank: int, last_id: int) -> str:
+    raw = json.dumps([key, rank, last_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    """Return (key, rank, last_id) from an X-Next-Cursor value"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key, rank, last_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError, binascii.Error):
+        raise InvalidCursor("Malformed cursor")
+    if not isinstance(key, str) or not isinstance(rank, int) or not isinstance(last_id, int):
+        raise InvalidCursor("Malformed cursor")
+    return key, rank, last_id
+
+def _after(key_expr, id_column, rank: int, cursor):
+    """Rows of the stream with this rank that come strictly after the cursor, newest first"""
+    key, cursor_rank, last_id = cursor
+    if rank < cursor_rank:
+        return key_expr <= key
+    if rank > cursor_rank:
+        return key_expr < key
+    return and_(key_expr <= key, or_(key_expr < key, id_column < last_id))
+
+def _stream(query, time_column, id_column, rank: int, cursor, limit: int | None):
+    """(key, rank, id, row) for query's rows newest first, resumed after the cursor; row ends with key and id"""
+    key_expr = type_coerce(time_column, String)
+    query = query.add_columns(key_expr, id_column).filter(time_column.isnot(None))
+    if cursor:
+        query = query.filter(_after(key_expr, id_column, rank, cursor))
+    query = query.order_by(key_expr.desc(), id_column.desc())
+    if limit is not None:
+        query = query.limit(limit + 1)
+    for row in query.yield_per(FEED_BATCH_SIZE):
+        yield row[-2], rank, row[-1], row
+
+def _form_items(convert, form_type: str, stream):
+    for key, rank, row_id, row in stream:
+        yield key, rank, row_id, convert(row, form_type)
+
+def forms_db_feed(db: Session, form_type: str | None = None, cursor: str | None = None, limit: int | None = None):
+    """
+    (key, rank, id, FormSubmissionOut) from the forms database, newest first, for
+    one form type or all of them; with a limit, no more than limit + 1
+    """
+    if form_type:
+        canonical = FORM_TYPE_ALIASES.get(form_type, form_type)
+        if canonical not in FORM_TABLES:
+            return iter(())
+        selected = {canonical: form_type}
+    else:
+        selected = {form_type: form_type for form_type in FORM_TABLES}
+    position = decode_cursor(cursor) if cursor else None
+
+    models = form_models()
+    streams = []
+    for canonical, label in selected.items():
+        model_name, time_name, has_demo_date = FORM_TABLES[canonical]
+        model = models[model_name]
+        query = db.query(*form_columns(model))
+        # Contact forms and demo requests share a table: demo requests have a demo date
+        if has_demo_date is True:
+            query = query.filter(model.demo_date != None)
+        elif has_demo_date is False:
+            query = query.filter(model.demo_date == None)
+        rows = _stream(query, getattr(model, time_name), model.id, _RANKS[canonical], position, limit)
+        streams.append(_form_items(converter_for(model), label, rows))
+    merged = heapq.merge(*streams, key=lambda entry: entry[:3], reverse=True)
+    return merged if limit is None else islice(merged, limit + 1)
+
+def forms_db_submissions(session_factory, form_type: str | None = None):
+    """
+    Every FormSubmissionOut from the forms database, newest first, streamed with
+    a session opened here (for response bodies read after the endpoint returns)
+    """
+    db = session_factory()
+    try:
+        for *_, item in forms_db_feed(db, form_type):
+            yield item
+    finally:
+        db.close()
+
+def crm_feed(query, cursor: str | None = None, limit: int | None = None):
+    """(key, rank, id, Submission) for a Submission query, newest first; with a limit, no more than limit + 1"""
+    position = decode_cursor(cursor) if cursor else None
+    return ((key, rank, row_id, row[0]) for key, rank, row_id, row in _stream(query, Submission.submitted, Submission.id, 0, position, limit))
+
+def take_page(feed, limit: int | None):
+    """(items, next_cursor) from a feed read with the same limit"""
+    entries = list(feed)
+    next_cursor = None
+    if limit is not None and len(entries) > limit:
+        entries = entries[:limit]
+        next_cursor = encode_cursor(*entries[-1][:3])
+    return [entry[3] for entry in entries], next_cursor
+
+class FormsPageCache:
+    """
+    Pages (items, next_cursor) read from the forms database, keyed by
+    (form_type, cursor, limit) and reused while the file's data version is the
+    one they were read at. Items are shared between requests, not copied.
+    """
+    def __init__(self, max_entries: int = FORMS_DB_PAGE_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, version: int, key: tuple):
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            return None
+        return entry[1]
+
+    def put(self, version: int, key: tuple, page):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.max_entries:
+                stale = [k for k, (v, _) in self._entries.items() if v != version]
+                # None stale: drop the oldest half (dicts keep insertion order)
+                for k in stale or list(self._entries)[: max(1, len(self._entries) // 2)]:
+                    del self._entries[k]
+            self._entries[key] = (version, page)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+forms_page_cache = FormsPageCache()
@@ -0,0 +1,100 @@
+"""
+Per-form-type submission counts
+Total, New, Converted and last 7/30 days counts for every form type, from one
+GROUP BY query over submissions, or one per table in the forms database,
+folded onto the names GET /form-submissions/{form_type} lists them under
+(FORM_TYPE_ALIASES). A result is kept until the data version it was counted
+at (the submissions change counter, or the forms file's data version) moves,
+or the minute its 7/30 day windows end at has passed.
+"""
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import case, func, or_
+from sqlalchemy.orm import Session
+from models.submission import Submission
+from services.submission_feed import FORM_TABLES, FORM_TYPE_ALIASES, form_models
+
+STATS_WINDOWS = (("last_7_days", 7), ("last_30_days", 30))
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+def stats_as_of(now: datetime | None = None) -> datetime:
+    """The minute the counting windows end at"""
+    return (now or datetime.utcnow()).replace(second=0, microsecond=0)
+
+def _counts(time_column, as_of: datetime) -> list:
+    """count(*) and how many fall in each of STATS_WINDOWS"""
+    return [func.count()] + [
+        func.coalesce(func.sum(case((time_column >= as_of - timedelta(days=days), 1), else_=0)), 0)
+        for _, days in STATS_WINDOWS
+    ]
+
+def _add(stats: dict, form_type: str, total: int, new: int, converted: int, windows):
+    form_type = FORM_TYPE_ALIASES.get(form_type, form_type)
+    entry = stats.setdefault(form_type, {"total": 0, "new": 0, "converted": 0, **{name: 0 for name, _ in STATS_WINDOWS}})
+    entry["total"] += total
+    entry["new"] += new
+    entry["converted"] += converted
+    for (name, _), count in zip(STATS_WINDOWS, windows):
+        entry[name] += count
+
+def _as_list(stats: dict) -> list:
+    """[{form_type, total, new, converted, last_7_days, last_30_days}], listing form types in FORM_TABLES order"""
+    order = {form_type: rank for rank, form_type in enumerate(FORM_TABLES)}
+    return [
+        {"form_type": form_type, **stats[form_type]}
+        for form_type in sorted(stats, key=lambda name: (order.get(name, len(order)), name))
+    ]
+
+def crm_stats(db: Session, as_of: datetime) -> list:
+    """Counts from the submissions table; a submission without a status is New"""
+    new = or_(Submission.status == 'New', Submission.status.is_(None))
+    rows = db.query(
+        Submission.form_type,
+        func.coalesce(func.sum(case((new, 1), else_=0)), 0),
+        func.coalesce(func.sum(case((Submission.status == 'Converted', 1), else_=0)), 0),
+        *_counts(Submission.submitted, as_of),
+    ).group_by(Submission.form_type).all()
+    stats = {}
+    for form_type, new_count, converted, total, *windows in rows:
+        _add(stats, form_type, total, new_count, converted, windows)
+    return _as_list(stats)
+
+def forms_db_stats(forms_db: Session, as_of: datetime) -> list:
+    """Counts from the forms database, whose submissions are all New"""
+    models = form_models()
+    stats = {}
+    read = set()
+    for form_type, (model_name, time_name, has_demo_date) in FORM_TABLES.items():
+        if model_name in read:
+            continue
+        read.add(model_name)
+        model = models[model_name]
+        counts = _counts(getattr(model, time_name), as_of)
+        if has_demo_date is None:
+            rows = [(form_type, *forms_db.query(*counts).one())]
+        else:
+            # Contact forms and demo requests share a table: demo requests have a demo date
+            is_demo = model.demo_date.isnot(None)
+            by_kind = {kind: form for form, (name, _, kind) in FORM_TABLES.items() if name == model_name}
+            rows = [(by_kind[bool(demo)], *row) for demo, *row in forms_db.query(is_demo, *counts).group_by(is_demo)]
+        for label, total, *windows in rows:
+            _add(stats, label, total, total, 0, windows)
+    return _as_list(stats)
+
+def cached_stats(source: str, version, as_of: datetime, compute) -> list:
+    """compute() for source, reused while (version, as_of) is unchanged"""
+    key = (version, as_of)
+    with _cache_lock:
+        entry = _cache.get(source)
+    if entry is not None and entry[0] == key:
+        return entry[1]
+    stats = compute()
+    with _cache_lock:
+        _cache[source] = (key, stats)
+    return stats
+
+def clear_stats_cache():
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,190 @@
+"""
+In-memory team membership index
+Answers "which Sales Executives report to this manager", the assignable-user
+set and role-by-id lookups without querying users/roles. Built from the two
+tables on first use, kept current by the /users and /roles write paths, and
+fully reloaded every TEAM_INDEX_REFRESH_SECONDS to pick up out-of-band edits
+(seed scripts, migrations, other workers).
+"""
+import threading
+import time
+from sqlalchemy.orm import Session
+from models.user import User
+from models.role import Role
+from config import TEAM_INDEX_REFRESH_SECONDS
+
+EXECUTIVE_ROLE_NAME = "Sales Executive"
+MANAGER_ROLE_NAME = "Sales Manager"
+
+class TeamMember:
+    """Detached copy of the user columns the index needs"""
+    __slots__ = ("id", "name", "email", "role_id", "manager_id")
+
+    def __init__(self, user):
+        self.id = user.id
+        self.name = user.name
+        self.email = user.email
+        self.role_id = user.role_id
+        self.manager_id = user.manager_id
+
+class TeamRole:
+    """Detached copy of a role row"""
+    __slots__ = ("id", "role_name", "hierarchy_level", "permissions")
+
+    def __init__(self, role):
+        self.id = role.id
+        self.role_name = role.role_name
+        self.hierarchy_level = role.hierarchy_level
+        self.permissions = dict(role.permissions or {})
+
+class TeamIndex:
+    def __init__(self, refresh_seconds: int = TEAM_INDEX_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.RLock()
+        self._loaded_at = None
+        self._users = {}
+        self._roles = {}
+        self._teams = {}       # manager_id -> frozenset of executive ids
+        self._executives = frozenset()
+
+    # -- loading -----------------------------------------------------------
+
+    def load(self, db: Session):
+        users = {u.id: TeamMember(u) for u in db.query(User).all()}
+        roles = {r.id: TeamRole(r) for r in db.query(Role).all()}
+        with self._lock:
+            self._users = users
+            self._roles = roles
+            self._rebuild_locked()
+            self._loaded_at = time.monotonic()
+
+    def ensure_loaded(self, db: Session):
+        with self._lock:
+            fresh = self._loaded_at is not None and (
+                self.refresh_seconds <= 0 or time.monotonic() - self._loaded_at < self.refresh_seconds
+            )
+        if not fresh:
+            self.load(db)
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    def _rebuild_locked(self):
+        executive_role_ids = {r.id for r in self._roles.values() if r.role_name == EXECUTIVE_ROLE_NAME}
+        teams = {}
+        executives = set()
+        for member in self._users.values():
+            if member.role_id in executive_role_ids:
+                executives.add(member.id)
+                if member.manager_id is not None:
+                    teams.setdefault(member.manager_id, set()).add(member.id)
+        self._teams = {manager_id: frozenset(ids) for manager_id, ids in teams.items()}
+        self._executives = frozenset(executives)
+
+    # -- write-path maintenance ----------------------------------------------
+
+    def upsert_user(self, user: User):
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            previous = self._users.get(user.id)
+            member = TeamMember(user)
+            self._users[user.id] = member
+            self._move_member_locked(previous, member)
+
+    def remove_user(self, user_id: int):
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            previous = self._users.pop(user_id, None)
+            self._move_member_locked(previous, None)
+
+    def _move_member_locked(self, previous, member):
+        executive_role_ids = {r.id for r in self._roles.values() if r.role_name == EXECUTIVE_ROLE_NAME}
+        if previous is not None and previous.role_id in executive_role_ids:
+            self._executives = self._executives - {previous.id}
+            if previous.manager_id is not None:
+                team = self._teams.get(previous.manager_id, frozenset()) - {previous.id}
+                self._teams[previous.manager_id] = team
+        if member is not None and member.role_id in executive_role_ids:
+            self._executives = self._executives | {member.id}
+            if member.manager_id is not None:
+                team = self._teams.get(member.manager_id, frozenset()) | {member.id}
+                self._teams[member.manager_id] = team
+
+    def upsert_role(self, role: Role):
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            self._roles[role.id] = TeamRole(role)
+            self._rebuild_locked()
+
+    def remove_role(self, role_id: int):
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            self._roles.pop(role_id, None)
+            self._rebuild_locked()
+
+    # -- lookups ---------------------------------------------------------------
+
+    def team_of(self, db: Session, manager_id: int) -> frozenset:
+        """Ids of the Sales Executives reporting to manager_id"""
+        self.ensure_loaded(db)
+        with self._lock:
+            return self._teams.get(manager_id, frozenset())
+
+    def executive_ids(self, db: Session) -> frozenset:
+        """Ids of every Sales Executive (the assignable-user set)"""
+        self.ensure_loaded(db)
+        with self._lock:
+            return self._executives
+
+    def assignable_ids(self, db: Session, manager_id: int | None = None) -> frozenset:
+        """Assignable users, narrowed to one manager's team when manager_id is given"""
+        if manager_id is not None:
+            return self.team_of(db, manager_id)
+        return self.executive_ids(db)
+
+    def all_user_ids(self, db: Session) -> list:
+        self.ensure_loaded(db)
+        with self._lock:
+            return sorted(self._users)
+
+    def user(self, db: Session, user_id: int):
+        self.ensure_loaded(db)
+        with self._lock:
+            return self._users.get(user_id)
+
+    def users(self, db: Session, user_ids) -> list:
+        self.ensure_loaded(db)
+        with self._lock:
+            return [self._users[user_id] for user_id in user_ids if user_id in self._users]
+
+    def users_with_role(self, db: Session, role_name: str) -> list:
+        self.ensure_loaded(db)
+        with self._lock:
+            role_ids = {r.id for r in self._roles.values() if r.role_name == role_name}
+            return [m for m in self._users.values() if m.role_id in role_ids]
+
+    def role(self, db: Session, role_id: int):
+        self.ensure_loaded(db)
+        with self._lock:
+            return self._roles.get(role_id)
+
+    def role_by_name(self, db: Session, role_name: str):
+        self.ensure_loaded(db)
+        with self._lock:
+            for role in self._roles.values():
+                if role.role_name == role_name:
+                    return role
+        return None
+
+    def user_name(self, db: Session, user_id: int | None):
+        if user_id is None:
+            return None
+        member = self.user(db, user_id)
+        return member.name if member else None
+
+team_index = TeamIndex()
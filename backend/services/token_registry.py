@@ -0,0 +1,149 @@
+"""
+Token version registry for stateless JWT verification
+Every user row carries a token_version that is embedded in issued tokens as "tv".
+Bumping the version (password change, role change, deletion) revokes all tokens
+issued before it. Versions are mirrored in memory so verifying a token needs no
+per-request user lookup. Other workers bump versions too, so the mirror is only
+trusted for tokens at or below the version it holds: anything newer is checked
+against the database, and the whole mirror is reloaded every
+TOKEN_REGISTRY_REFRESH_SECONDS so revocations reach every worker.
+"""
+import threading
+import time
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+from models.user import User
+from config import TOKEN_REGISTRY_REFRESH_SECONDS
+
+# Deleted users are remembered so their tokens fail fast. Clearing the set is
+# safe: an unknown user id falls back to a single lookup, which then fails.
+_MAX_REVOKED = 10000
+
+_PENDING_KEY = "token_registry_pending"
+
+class TokenRegistry:
+    def __init__(self, refresh_seconds: int = TOKEN_REGISTRY_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._users = {}  # user_id -> (token_version, email)
+        self._revoked = set()
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def load(self, db: Session):
+        """Load all users' token versions in a single query"""
+        rows = db.query(User.id, User.token_version, User.email).all()
+        with self._lock:
+            self._users = {user_id: (version or 0, email) for user_id, version, email in rows}
+            self._loaded_at = time.monotonic()
+
+    def _fresh_locked(self) -> bool:
+        return self._loaded_at is not None and (
+            self.refresh_seconds <= 0 or time.monotonic() - self._loaded_at < self.refresh_seconds
+        )
+
+    def check_cached(self, user_id: int, email: str, token_version: int):
+        """
+        Answer from memory only: True/False, or None when is_current() has to
+        consult the database (user not loaded, mirror due for a reload, or a
+        token newer than the version held here)
+        """
+        with self._lock:
+            if user_id in self._revoked:
+                return False
+            entry = self._users.get(user_id) if self._fresh_locked() else None
+        if entry is None:
+            return None
+        version, known_email = entry
+        token_version = token_version or 0
+        if token_version < version:
+            # Versions only increase: a token below the one we hold is revoked
+            return False
+        if token_version == version and known_email == email:
+            return True
+        return None
+
+    def is_current(self, user_id: int, email: str, token_version: int, db: Session) -> bool:
+        """
+        True if a token for (user_id, email) carrying token_version is still valid,
+        read from the database (and mirrored). The email check stops a token from
+        outliving its user when an id is reused.
+        """
+        with self._lock:
+            if user_id in self._revoked:
+                return False
+            fresh = self._fresh_locked()
+        if not fresh:
+            self.load(db)
+            with self._lock:
+                entry = self._users.get(user_id)
+        else:
+            row = db.query(User.token_version, User.email).filter(User.id == user_id).first()
+            entry = None if row is None else (row[0] or 0, row[1])
+            with self._lock:
+                if entry is None:
+                    self._users.pop(user_id, None)
+                else:
+                    self._users[user_id] = entry
+        if entry is None:
+            return False
+        version, known_email = entry
+        return version == (token_version or 0) and known_email == email
+
+    def register(self, user: User):
+        """Track a newly created or updated user (after its commit)"""
+        self._set(user.id, user.token_version, user.email)
+
+    def _set(self, user_id: int, version, email: str):
+        with self._lock:
+            self._revoked.discard(user_id)
+            self._users[user_id] = (version or 0, email)
+
+    def _after_commit(self, db: Session, apply):
+        """Run apply once db commits; dropped if it rolls back instead"""
+        db.info.setdefault(_PENDING_KEY, []).append(apply)
+        if not event.contains(db, "after_commit", _apply_pending):
+            event.listen(db, "after_commit", _apply_pending)
+            event.listen(db, "after_rollback", _drop_pending)
+
+    def bump(self, db: Session, user: User):
+        """Increment a user's token version (caller commits); mirrored in memory once committed"""
+        user.token_version = (user.token_version or 0) + 1
+        user_id, version, email = user.id, user.token_version, user.email
+        self._after_commit(db, lambda: self._set(user_id, version, email))
+
+    def bump_role(self, db: Session, role_id: int):
+        """Revoke the tokens of every user holding role_id (caller commits); mirrored once committed"""
+        db.query(User).filter(User.role_id == role_id).update(
+            {User.token_version: func.coalesce(User.token_version, 0) + 1},
+            synchronize_session=False
+        )
+        rows = db.query(User.id, User.token_version, User.email).filter(User.role_id == role_id).all()
+
+        def apply():
+            with self._lock:
+                for user_id, version, email in rows:
+                    self._users[user_id] = (version or 0, email)
+        self._after_commit(db, apply)
+
+    def revoke_user(self, user_id: int):
+        """Reject every token of a deleted user"""
+        with self._lock:
+            self._users.pop(user_id, None)
+            if len(self._revoked) >= _MAX_REVOKED:
+                self._revoked.clear()
+            self._revoked.add(user_id)
+
+    def reset(self):
+        with self._lock:
+            self._users.clear()
+            self._revoked.clear()
+            self._loaded_at = None
+
+def _apply_pending(session: Session):
+    for apply in session.info.pop(_PENDING_KEY, []):
+        apply()
+
+def _drop_pending(session: Session):
+    session.info.pop(_PENDING_KEY, None)
+
+token_registry = TokenRegistry()
@@ -9,6 +9,7 @@ from models.reminder import Reminder
 from models.entity_tag import EntityTag
 from models.tag import Tag
 from services.activity_logger import log_activity
+from services.lead_sources import source_for_form_type
 
 def execute_demo_request_workflow(
     db: Session,
@@ -31,7 +32,8 @@ def execute_demo_request_workflow(
         name=submission.name,
         email=submission.email,
         company=submission.company,
-        source="Website",
+        source_type="Website",
+        source=source_for_form_type(submission.form_type),
         status="New",
         assigned_to=assigned_to_user_id,
         assigned=assigned_to_user_id or "Unassigned",
@@ -93,7 +95,8 @@ def execute_brochure_workflow(
         name=submission.name,
         email=submission.email,
         company=submission.company,
-        source="Website",
+        source_type="Website",
+        source=source_for_form_type(submission.form_type),
         status="New",
         assigned_to=assigned_to_user_id,
         assigned=assigned_to_user_id or "Unassigned",
@@ -0,0 +1,78 @@
+"""
+Unit tests for the per-table change counters behind conditional GETs
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from database import Base
+from models.activity_log import ActivityLog
+from models.lead import Lead
+from models.table_version import TableVersion
+from models.tag import Tag
+from services.change_tracker import current_versions, ensure_version_rows, etag_matches, track_changes
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+track_changes(TestingSessionLocal)
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    ensure_version_rows(session)
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+def versions(db):
+    return current_versions(db, ["leads", "tags"])
+
+def test_committed_writes_bump_their_table(db):
+    lead = Lead(name="A", email="a@test.com", company="Acme")
+    db.add(lead)
+    db.commit()
+    assert versions(db) == {"leads": 1, "tags": 0}
+
+    lead.status = "Contacted"
+    db.commit()
+    db.delete(lead)
+    db.commit()
+    assert versions(db) == {"leads": 3, "tags": 0}
+
+def test_unchanged_and_rolled_back_writes_do_not_bump(db):
+    lead = Lead(name="A", email="a@test.com", company="Acme", status="New")
+    db.add(lead)
+    db.commit()
+
+    assert lead.status == "New"
+    lead.status = "New"
+    db.commit()
+    db.add(Tag(name="hot", entity_type="lead"))
+    db.flush()
+    db.rollback()
+    assert versions(db) == {"leads": 1, "tags": 0}
+
+def test_bulk_statements_bump_their_table(db):
+    db.add(Lead(name="A", email="a@test.com", company="Acme"))
+    db.commit()
+    db.query(Lead).filter(Lead.status == None).update({Lead.status: "New"}, synchronize_session=False)
+    db.commit()
+    assert versions(db)["leads"] == 2
+
+def test_untracked_tables_have_no_counter(db):
+    db.add(ActivityLog(action_type="login", description="login", entity_type="user", entity_id=1, user_id=1))
+    db.commit()
+    db.query(ActivityLog).delete()
+    db.commit()
+    assert db.get(TableVersion, "activity_logs") is None
+    with pytest.raises(ValueError):
+        current_versions(db, ["activity_logs"])
+
+def test_etag_matches():
+    etag = 'W/"abc"'
+    assert etag_matches('W/"abc"', etag)
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('"xyz", W/"abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('W/"xyz"', etag)
+    assert not etag_matches(None, etag)
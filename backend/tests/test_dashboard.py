@@ -0,0 +1,120 @@
+"""
+Unit tests for the dashboard summary aggregates
+"""
+import pytest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from database import Base
+from database_forms import FormsBase
+from models.external.brochure_forms import BrochureForm
+from models.external.contact_forms import ContactForm  # noqa: F401
+from models.external.newsletter_subscriptions import NewsletterSubscription
+from models.external.product_profile_forms import ProductProfileForm  # noqa: F401
+from models.external.talk_to_sales_forms import TalkToSalesForm
+from models.lead import Lead
+from models.reminder import Reminder
+from models.submission import Submission
+from services.dashboard import forms_db_submission_summary, lead_summary, reminder_summary, submission_summary
+from services.principal_cache import Principal
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+forms_engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+FormsSession = sessionmaker(bind=forms_engine)
+
+NOW = datetime(2024, 3, 10, 12, 0)
+WEEK_AGO = NOW - timedelta(days=7)
+START = NOW.date() - timedelta(days=2)
+
+def make_principal(user_id, role_name, permissions):
+    user = SimpleNamespace(id=user_id, name=f"User {user_id}", email=f"u{user_id}@test.com", role_id=user_id, manager_id=None)
+    role = SimpleNamespace(id=user_id, role_name=role_name, hierarchy_level=2, permissions=permissions)
+    return Principal(user, role)
+
+ADMIN = make_principal(1, "Admin", {"all": True})
+EXECUTIVE = make_principal(2, "Sales Executive", {"leads": True})
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    session.add_all([
+        Lead(name="A", email="a@test.com", company="Acme", status="New", source_type="Website", assigned_to=2, created_at=NOW),
+        Lead(name="B", email="b@test.com", company="Acme", status="New", source="Walk-in", assigned_to=3, created_at=NOW - timedelta(days=30)),
+        Lead(name="C", email="c@test.com", company="Acme", status="Qualified", source_type="Website", assigned_to=2, created_at=NOW - timedelta(days=1)),
+    ])
+    session.add_all([
+        Submission(form_type="talk", name="s1", email=" A@test.com", company="Acme", submitted=NOW),
+        Submission(form_type="brochure", name="s2", email="b@test.com", company="Acme", submitted=NOW - timedelta(days=1)),
+        Submission(form_type="brochure", name="s3", email="x@test.com", company="Acme", submitted=NOW - timedelta(days=20)),
+        Submission(form_type="newsletter", name="", email="a@test.com", company="", submitted=NOW),
+    ])
+    session.commit()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+def test_lead_summary_is_scoped(db):
+    summary = lead_summary(db, ADMIN, WEEK_AGO)
+    assert (summary["total"], summary["new"], summary["new_this_week"]) == (3, 2, 2)
+    assert summary["by_status"] == [{"status": "New", "count": 2}, {"status": "Qualified", "count": 1}]
+    assert summary["by_source_type"] == [{"source_type": "Website", "count": 2}, {"source_type": "Walk-in", "count": 1}]
+    assert [lead["name"] for lead in summary["recent"]] == ["A", "C", "B"]
+
+    summary = lead_summary(db, EXECUTIVE, WEEK_AGO)
+    assert (summary["total"], summary["new"]) == (2, 1)
+
+def test_submission_summary(db):
+    summary = submission_summary(db, ADMIN, WEEK_AGO, START, 3)
+    assert (summary["total"], summary["converted"], summary["new_this_week"], summary["newsletter"]) == (3, 2, 2, 1)
+    assert summary["conversion_rate"] == 66.7
+    assert summary["by_form_type"] == [{"form_type": "brochure", "count": 2}, {"form_type": "talk", "count": 1}]
+    # Newsletter sign-ups are counted per day beside, not in, the totals
+    assert summary["per_day"] == [
+        {"date": "2024-03-08", "total": 0, "converted": 0, "newsletter": 0},
+        {"date": "2024-03-09", "total": 1, "converted": 1, "newsletter": 0},
+        {"date": "2024-03-10", "total": 1, "converted": 1, "newsletter": 1},
+    ]
+    # Only lead A's email is one of the executive's leads
+    assert submission_summary(db, EXECUTIVE, WEEK_AGO, START, 3)["converted"] == 1
+
+def test_forms_db_summary_matches_sql(db):
+    FormsBase.metadata.create_all(bind=forms_engine)
+    forms_db = FormsSession()
+    try:
+        # The same submissions as the fixture's, as the website stores them
+        forms_db.add_all([
+            TalkToSalesForm(first_name="s1", last_name="", email=" A@test.com", company="Acme", submitted_at=NOW),
+            BrochureForm(first_name="s2", last_name="", email="b@test.com", company="Acme", submitted_at=NOW - timedelta(days=1)),
+            BrochureForm(first_name="s3", last_name="", email="x@test.com", company="Acme", submitted_at=NOW - timedelta(days=20)),
+            NewsletterSubscription(email="a@test.com", subscribed_at=NOW),
+        ])
+        forms_db.commit()
+        for principal in (ADMIN, EXECUTIVE):
+            summary = forms_db_submission_summary(db, forms_db, principal, WEEK_AGO, START, 3)
+            expected = submission_summary(db, principal, WEEK_AGO, START, 3)
+            recent, expected_recent = summary.pop("recent"), expected.pop("recent")
+            assert summary == expected
+            assert [day["newsletter"] for day in summary["per_day"]] == [0, 0, 1]
+            assert [(item["form_type"], item["submitted_at"]) for item in recent] == [
+                (item["form_type"], item["submitted_at"]) for item in expected_recent
+            ]
+    finally:
+        forms_db.close()
+        FormsBase.metadata.drop_all(bind=forms_engine)
+
+def test_reminder_summary_skips_deleted_leads(db):
+    lead_id = db.query(Lead.id).filter(Lead.name == "A").scalar()
+    db.add_all([
+        Reminder(user_id=2, lead_id=lead_id, title="Call A", due_date=NOW + timedelta(days=1)),
+        Reminder(user_id=2, lead_id=None, title="General", due_date=NOW + timedelta(days=2)),
+        Reminder(user_id=2, lead_id=999, title="Deleted lead", due_date=NOW + timedelta(hours=1)),
+        Reminder(user_id=2, lead_id=None, title="Done", due_date=NOW + timedelta(days=1), completed=True),
+        Reminder(user_id=1, lead_id=None, title="Someone else's", due_date=NOW + timedelta(days=1)),
+    ])
+    db.commit()
+    summary = reminder_summary(db, EXECUTIVE, NOW)
+    assert summary["upcoming"] == 2
+    assert [reminder.title for reminder in summary["next"]] == ["Call A", "General"]
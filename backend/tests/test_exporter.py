@@ -0,0 +1,57 @@
+"""
+Unit tests for the streaming CSV / NDJSON exporter
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from database import Base
+from models.lead import Lead
+from services import exporter
+from services.exporter import encode_csv, encode_ndjson, export_rows
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+FIELDS = ("id", "name", "created_at", "data")
+ROWS = [
+    (1, 'Acme, "Quoted"', datetime(2024, 1, 2, 3, 4, 5), {"a": 1}),
+    (2, "Line\nbreak", None, None),
+]
+
+def test_encode_csv():
+    body = b"".join(encode_csv(FIELDS, ROWS)).decode()
+    assert list(csv.reader(io.StringIO(body))) == [
+        list(FIELDS),
+        ["1", 'Acme, "Quoted"', "2024-01-02T03:04:05", '{"a": 1}'],
+        ["2", "Line\nbreak", "", ""],
+    ]
+
+def test_encode_ndjson():
+    lines = b"".join(encode_ndjson(FIELDS, ROWS)).decode().splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {"id": 1, "name": 'Acme, "Quoted"', "created_at": "2024-01-02T03:04:05", "data": {"a": 1}},
+        {"id": 2, "name": "Line\nbreak", "created_at": None, "data": None},
+    ]
+
+def test_export_rows_streams_in_chunks(monkeypatch):
+    monkeypatch.setattr(exporter, "FLUSH_BYTES", 100)
+    Base.metadata.create_all(bind=engine)
+    try:
+        session = TestingSessionLocal()
+        session.add_all(Lead(name=f"L{i}", email=f"l{i}@test.com", company="Acme") for i in range(50))
+        session.commit()
+        session.close()
+
+        def build_query(db):
+            return db.query(Lead.id, Lead.email).order_by(Lead.id)
+
+        # The CSV has a header line on top of one line per row
+        for fmt, lines in (("csv", 51), ("ndjson", 50)):
+            chunks = list(export_rows(TestingSessionLocal, build_query, ("id", "email"), fmt, batch_size=7))
+            assert len(chunks) > 1
+            assert b"".join(chunks).decode().count("\n") == lines
+    finally:
+        Base.metadata.drop_all(bind=engine)
@@ -0,0 +1,43 @@
+"""
+Unit tests for the compiled form row converters
+"""
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from database_forms import FormsBase
+from models.external.contact_forms import ContactForm
+from models.external.newsletter_subscriptions import NewsletterSubscription
+from models.external.product_profile_forms import ProductProfileForm
+from services.form_converters import converter_for, form_columns
+
+AT = datetime(2024, 3, 1, 9, 0)
+
+def test_converters_read_column_tuples():
+    engine = create_engine("sqlite://")
+    FormsBase.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        db.add_all([
+            ProductProfileForm(first_name="Ada", last_name="L", email="ada@test.com", phone="1", company_name="Beta", submitted_at=AT),
+            ContactForm(first_name="Bo", last_name="K", email="bo@test.com", company="Acme", message="Hi", submitted_at=AT),
+            NewsletterSubscription(email="n@test.com", subscribed_at=AT),
+        ])
+        db.commit()
+
+        row = db.query(*form_columns(ProductProfileForm)).one()
+        assert dict(converter_for(ProductProfileForm)(row, "product-profile")) == {
+            "id": 1, "form_type": "product-profile", "name": "Ada L", "email": "ada@test.com", "company": "Beta",
+            "submitted_at": AT, "status": "New", "lead_id": None,
+            # NULL columns are left out of data
+            "data": {"first_name": "Ada", "last_name": "L", "email": "ada@test.com", "phone": "1", "company_name": "Beta"},
+        }
+        contact = converter_for(ContactForm)(db.query(*form_columns(ContactForm)).one(), "general")
+        assert (contact.form_type, contact.company, contact.data["message"]) == ("general", "Acme", "Hi")
+        subscription = converter_for(NewsletterSubscription)(db.query(*form_columns(NewsletterSubscription)).one(), "newsletter")
+        assert (subscription.email, subscription.data, subscription.submitted_at) == ("n@test.com", {"email": "n@test.com"}, AT)
+    finally:
+        db.close()
+
+def test_converters_are_compiled_once():
+    assert converter_for(ContactForm) is converter_for(ContactForm)
+    assert converter_for(ContactForm) is not converter_for(ProductProfileForm)
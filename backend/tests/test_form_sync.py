@@ -0,0 +1,103 @@
+"""
+Unit tests for the incremental forms-database sync
+"""
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+from database import Base
+from database_forms import FormsBase
+from models.external.brochure_forms import BrochureForm
+from models.external.contact_forms import ContactForm
+from models.external.newsletter_subscriptions import NewsletterSubscription
+from models.external.product_profile_forms import ProductProfileForm  # noqa: F401
+from models.external.talk_to_sales_forms import TalkToSalesForm  # noqa: F401
+from models.form_sync_state import FormSyncState
+from models.submission import Submission
+from models.table_version import TableVersion
+from services.change_tracker import track_changes
+from services.form_sync import sync_forms_db, sync_table
+
+forms_engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+FormsSession = sessionmaker(bind=forms_engine)
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+track_changes(TestingSessionLocal)
+
+START = datetime(2024, 3, 1, 9, 0)
+
+@pytest.fixture
+def dbs():
+    FormsBase.metadata.create_all(bind=forms_engine)
+    Base.metadata.create_all(bind=engine)
+    forms_db = FormsSession()
+    db = TestingSessionLocal()
+    yield db, forms_db
+    db.close()
+    forms_db.close()
+    Base.metadata.drop_all(bind=engine)
+    FormsBase.metadata.drop_all(bind=forms_engine)
+
+def _add_contacts(forms_db, start, count):
+    forms_db.add_all(
+        ContactForm(first_name=f"F{i}", last_name="L", email=f"c{i}@test.com", company="Acme",
+                    demo_date="2024-04-01" if i % 2 else None, submitted_at=START + timedelta(minutes=i))
+        for i in range(start, start + count)
+    )
+    forms_db.commit()
+
+def test_sync_copies_each_row_once(dbs):
+    db, forms_db = dbs
+    _add_contacts(forms_db, 0, 5)
+    forms_db.add(BrochureForm(first_name="B", last_name="R", email="b@test.com", company="Beta", submitted_at=START))
+    forms_db.add(NewsletterSubscription(email="n@test.com", subscribed_at=START))
+    forms_db.commit()
+
+    copied = sync_forms_db(TestingSessionLocal, FormsSession, batch_size=2)
+    assert copied["contact_forms"] == 5 and copied["brochure_forms"] == 1 and copied["newsletter_subscriptions"] == 1
+    subs = db.query(Submission).order_by(Submission.source_table, Submission.source_id).all()
+    assert [(s.form_type, s.source_id) for s in subs if s.source_table == "contact_forms"] == [
+        ("contact", 1), ("demo", 2), ("contact", 3), ("demo", 4), ("contact", 5),
+    ]
+    brochure = next(s for s in subs if s.source_table == "brochure_forms")
+    assert (brochure.name, brochure.company, brochure.status, brochure.lead_id) == ("B R", "Beta", "New", None)
+    assert brochure.data["email"] == "b@test.com" and "id" not in brochure.data
+    assert db.get(FormSyncState, "contact_forms").last_id == 5
+    assert db.get(TableVersion, "submissions").version > 0
+
+    # Conversion state survives later passes, which only copy new rows
+    db.execute(update(Submission).where(Submission.source_id == 1).values(status="Converted"))
+    db.commit()
+    _add_contacts(forms_db, 5, 2)
+    assert sync_forms_db(TestingSessionLocal, FormsSession)["contact_forms"] == 2
+    assert sync_forms_db(TestingSessionLocal, FormsSession)["contact_forms"] == 0
+    assert db.query(Submission).count() == 9
+    assert db.query(Submission).filter(Submission.source_id == 1, Submission.source_table == "contact_forms").one().status == "Converted"
+
+def test_racing_batch_is_not_duplicated(dbs):
+    db, forms_db = dbs
+    _add_contacts(forms_db, 0, 3)
+    assert sync_table(db, forms_db, ContactForm, batch_size=2) == 2
+    # Another worker copied the same rows but this process's mark is behind
+    db.query(FormSyncState).delete()
+    db.commit()
+    assert sync_table(db, forms_db, ContactForm, batch_size=2) == 0
+    assert db.query(Submission).count() == 2
+    assert db.get(FormSyncState, "contact_forms").last_id == 2
+
+    # The mark moved past the rows already there, so the rest and new ones are still copied
+    _add_contacts(forms_db, 3, 2)
+    assert sync_forms_db(TestingSessionLocal, FormsSession, batch_size=2)["contact_forms"] == 3
+    assert [source_id for (source_id,) in db.query(Submission.source_id).order_by(Submission.source_id)] == [1, 2, 3, 4, 5]
+
+def test_partly_copied_batch_skips_existing_rows(dbs):
+    db, forms_db = dbs
+    _add_contacts(forms_db, 0, 4)
+    # Restored from a backup: rows 2 and 3 are in submissions, the mark is unset
+    assert sync_table(db, forms_db, ContactForm, batch_size=4) == 4
+    db.query(Submission).filter(Submission.source_id.in_([1, 4])).delete()
+    db.query(FormSyncState).delete()
+    db.commit()
+    assert sync_forms_db(TestingSessionLocal, FormsSession, batch_size=4)["contact_forms"] == 2
+    assert [source_id for (source_id,) in db.query(Submission.source_id).order_by(Submission.source_id)] == [1, 2, 3, 4]
+    assert db.get(FormSyncState, "contact_forms").last_id == 4
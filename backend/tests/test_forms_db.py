@@ -0,0 +1,66 @@
+"""
+Unit tests for the read-only forms database layer
+"""
+import os
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from database_forms import FormsBase, FormsDbChanges, create_forms_engine, warm_forms_pool
+from models.external.newsletter_subscriptions import NewsletterSubscription
+from services.submission_feed import FormsPageCache
+
+@pytest.fixture
+def forms_file(tmp_path):
+    path = str(tmp_path / "spars forms.db")
+    writer = create_engine(f"sqlite:///{path}")
+    FormsBase.metadata.create_all(bind=writer, tables=[NewsletterSubscription.__table__])
+    yield path, writer
+    writer.dispose()
+
+def test_engine_is_read_only_and_tuned(forms_file):
+    path, writer = forms_file
+    with writer.begin() as conn:
+        conn.execute(text("INSERT INTO newsletter_subscriptions (email) VALUES ('a@test.com')"))
+    engine = create_forms_engine(path, pool_size=2)
+    try:
+        warm_forms_pool(engine, 2)
+        assert engine.pool.checkedin() == 2
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT email FROM newsletter_subscriptions")).scalars().all() == ["a@test.com"]
+            assert conn.execute(text("PRAGMA mmap_size")).scalar() > 0
+            assert conn.execute(text("PRAGMA cache_size")).scalar() < 0
+            with pytest.raises(OperationalError):
+                conn.execute(text("DELETE FROM newsletter_subscriptions"))
+    finally:
+        engine.dispose()
+
+def test_changes_follow_commits_not_mtime(forms_file):
+    path, writer = forms_file
+    changes = FormsDbChanges(path)
+    first = changes.version()
+    assert changes.version() == first
+    # Touching the file alone isn't a change
+    os.utime(path, ns=(1, 1))
+    assert changes.version() == first
+    with writer.begin() as conn:
+        conn.execute(text("INSERT INTO newsletter_subscriptions (email) VALUES ('b@test.com')"))
+    second = changes.version()
+    assert second > first
+    # A commit that leaves the file's size and mtime as they were is still a change
+    st = os.stat(path)
+    with writer.begin() as conn:
+        conn.execute(text("UPDATE newsletter_subscriptions SET email = 'c@test.com'"))
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert os.stat(path).st_size == st.st_size
+    assert changes.version() > second
+
+def test_page_cache_is_per_version():
+    cache = FormsPageCache(max_entries=2)
+    cache.put(1, ("contact", None, 50), (["a"], None))
+    assert cache.get(1, ("contact", None, 50)) == (["a"], None)
+    assert cache.get(2, ("contact", None, 50)) is None
+    cache.put(2, ("demo", None, 50), (["b"], None))
+    # Full: pages from older versions go first
+    cache.put(2, ("talk", None, 50), (["c"], None))
+    assert cache.get(1, ("contact", None, 50)) is None
+    assert cache.get(2, ("demo", None, 50)) == (["b"], None)
@@ -0,0 +1,112 @@
+"""
+Unit tests for set-based bulk lead operations
+"""
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from database import Base
+from models.comment import Comment
+from models.entity_tag import EntityTag
+from models.lead import Lead
+from models.role import Role
+from models.submission import Submission
+from models.user import User
+from routers.leads import bulk_update_leads
+from schemas.lead import LeadBulkRequest
+from services import lead_bulk
+from services.lead_bulk import delete_leads, leads_from_submissions, update_leads
+from services.principal_cache import Principal
+from services.team_index import team_index
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+@pytest.fixture
+def db(monkeypatch):
+    # Small chunks so the tests cover ids spread across several statements
+    monkeypatch.setattr(lead_bulk, "ID_CHUNK_SIZE", 2)
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    session.add_all(Lead(id=i, name=f"L{i}", email=f"l{i}@test.com", company="Acme", status="New") for i in range(1, 6))
+    session.add_all([
+        Comment(lead_id=1, text="a"),
+        Comment(lead_id=1, text="b"),
+        Comment(lead_id=4, text="c"),
+        EntityTag(tag_id=1, entity_type="lead", entity_id=4),
+        EntityTag(tag_id=1, entity_type="submission", entity_id=4),
+        Submission(form_type="talk", name="s", email="s@test.com", company="Acme", status="Converted", lead_id=1),
+    ])
+    session.commit()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+def test_update_leads(db):
+    assert update_leads(db, [1, 2, 3, 5], {Lead.status: "Contacted"}) == 4
+    db.commit()
+    assert dict(db.query(Lead.id, Lead.status).order_by(Lead.id).all()) == {
+        1: "Contacted", 2: "Contacted", 3: "Contacted", 4: "New", 5: "Contacted"
+    }
+
+def test_delete_leads(db):
+    related = delete_leads(db, [1, 3, 4])
+    db.commit()
+
+    assert related[1] == {"call_logs": 0, "reminders": 0, "comments": 2, "entity_tags": 0, "submissions_updated": 1}
+    assert related[4]["comments"] == 1 and related[4]["entity_tags"] == 1
+    assert sum(related[3].values()) == 0
+    assert [lead_id for (lead_id,) in db.query(Lead.id).order_by(Lead.id)] == [2, 5]
+    assert db.query(Comment).count() == 0
+    # Only the lead's tag goes; the submission tag with the same entity_id stays
+    assert db.query(EntityTag.entity_type).all() == [("submission",)]
+    submission = db.query(Submission).one()
+    assert (submission.lead_id, submission.status) == (None, "New")
+
+def test_leads_from_submissions(db):
+    submissions = [
+        Submission(form_type=form_type, name=f"S{i}", email=f"s{i}@test.com", company="Acme", status="New")
+        for i, form_type in enumerate(["brochure", "talk", "demo"])
+    ]
+    db.add_all(submissions)
+    db.flush()
+
+    lead_ids = leads_from_submissions(db, submissions, assigned="Ex", assigned_to=7, created_by=1)
+    db.commit()
+
+    for sub, lead_id in zip(submissions, lead_ids):
+        db.refresh(sub)
+        lead = db.get(Lead, lead_id)
+        assert (sub.status, sub.lead_id) == ("Converted", lead_id)
+        assert (lead.name, lead.email, lead.source_type) == (sub.name, sub.email, "Website")
+        assert (lead.assigned, lead.assigned_to, lead.created_by, lead.status) == ("Ex", 7, 1, "New")
+        assert (lead.email_key, lead.company_key) == (sub.email, "acme")
+    assert [db.get(Lead, lead_id).source for lead_id in lead_ids] == ["Brochure Download", "Talk to Sales", "Request a Demo"]
+
+def test_bulk_delete_follows_single_delete_rules(db):
+    manager_role = Role(id=1, role_name="Sales Manager", hierarchy_level=1, permissions={"leads": True, "lead_status_update": True})
+    executive_role = Role(id=2, role_name="Sales Executive", hierarchy_level=2, permissions={"leads": True})
+    manager = User(id=1, name="Mgr", email="m@test.com", role_id=1)
+    executive = User(id=2, name="Ex", email="e@test.com", role_id=2, manager_id=1)
+    db.add_all([manager_role, executive_role, manager, executive])
+    db.query(Lead).filter(Lead.id.in_([1, 2])).update({Lead.assigned_to: 2}, synchronize_session=False)
+    db.query(Lead).filter(Lead.id == 3).update({Lead.assigned_to: 9}, synchronize_session=False)
+    db.commit()
+    team_index.invalidate()
+    as_manager, as_executive = Principal(manager, manager_role), Principal(executive, executive_role)
+
+    # Lead 3 is outside the manager's team, and leads 4 and 5 are unassigned: a manager may still delete them
+    result = bulk_update_leads(LeadBulkRequest(lead_ids=[3, 4], operation="delete"), db=db, current_user=as_manager)
+    assert result["deleted"] == 2
+    # Other bulk operations stay scoped to the team
+    with pytest.raises(HTTPException) as error:
+        bulk_update_leads(LeadBulkRequest(lead_ids=[5], operation="set_status", status="Contacted"), db=db, current_user=as_manager)
+    assert error.value.status_code == 403
+
+    # An executive only deletes leads assigned to them, and nothing is deleted otherwise
+    with pytest.raises(HTTPException) as error:
+        bulk_update_leads(LeadBulkRequest(lead_ids=[1, 5], operation="delete"), db=db, current_user=as_executive)
+    assert error.value.status_code == 403
+    assert bulk_update_leads(LeadBulkRequest(lead_ids=[1, 2], operation="delete"), db=db, current_user=as_executive)["deleted"] == 2
+    assert [lead_id for (lead_id,) in db.query(Lead.id)] == [5]
+    team_index.invalidate()
@@ -0,0 +1,91 @@
+"""
+Unit tests for lead duplicate detection and merging
+"""
+import pytest
+from types import SimpleNamespace
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from database import Base
+from models.comment import Comment
+from models.entity_tag import EntityTag
+from models.lead import Lead
+from models.submission import Submission
+from services.lead_bulk import merge_leads
+from services.lead_dedup import duplicate_clusters, existing_lead_ids, normalize_company, normalize_email
+from services.principal_cache import Principal
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def make_principal(user_id, role_name, permissions):
+    user = SimpleNamespace(id=user_id, name=f"User {user_id}", email=f"u{user_id}@test.com", role_id=user_id, manager_id=None)
+    role = SimpleNamespace(id=user_id, role_name=role_name, hierarchy_level=2, permissions=permissions)
+    return Principal(user, role)
+
+ADMIN = make_principal(1, "Admin", {"all": True})
+EXECUTIVE = make_principal(2, "Sales Executive", {"leads": True})
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    session.add_all([
+        Lead(id=1, name="A", email="jane@acme.io", company="Acme, Inc.", assigned_to=2),
+        Lead(id=2, name="B", email=" Jane@ACME.io", company="ACME", assigned_to=3),
+        Lead(id=3, name="C", email="jane@acme.io", company="Acme Corporation", assigned_to=2),
+        Lead(id=4, name="D", email="bob@other.com", company="Other Co", assigned_to=2),
+    ])
+    session.commit()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+def test_normalization():
+    assert normalize_email("  Jane@ACME.io ") == "jane@acme.io"
+    assert normalize_email("   ") is None
+    assert normalize_company("Acme, Inc.") == normalize_company("ACME") == "acme"
+    assert normalize_company("Big Data Co. Ltd") == "big data"
+    # A name that is only a legal-form word is kept
+    assert normalize_company("Company") == "company"
+    assert normalize_company(None) is None
+
+def test_keys_follow_writes(db):
+    lead = db.get(Lead, 4)
+    assert (lead.email_key, lead.company_key) == ("bob@other.com", "other")
+    lead.email = "Jane@Acme.io"
+    db.commit()
+    assert db.get(Lead, 4).email_key == "jane@acme.io"
+    assert existing_lead_ids(db, ["JANE@acme.io", "nobody@test.com", None]) == {"jane@acme.io": [1, 2, 3, 4]}
+
+def test_duplicate_clusters_are_scoped(db):
+    clusters = duplicate_clusters(db, ADMIN, "email", limit=10)
+    assert [(c["key"], c["count"], [lead.id for lead in c["leads"]]) for c in clusters] == [("jane@acme.io", 3, [1, 2, 3])]
+    assert [c["count"] for c in duplicate_clusters(db, ADMIN, "company", limit=10)] == [3]
+    # Lead 2 belongs to someone else
+    assert [[lead.id for lead in c["leads"]] for c in duplicate_clusters(db, EXECUTIVE, "email", limit=10)] == [[1, 3]]
+    assert duplicate_clusters(db, ADMIN, "email", limit=10, offset=1) == []
+
+def test_merge_leads(db):
+    db.add_all([
+        Comment(lead_id=2, text="a"),
+        Comment(lead_id=3, text="b"),
+        EntityTag(tag_id=1, entity_type="lead", entity_id=1),
+        EntityTag(tag_id=1, entity_type="lead", entity_id=2),
+        EntityTag(tag_id=2, entity_type="lead", entity_id=2),
+        EntityTag(tag_id=2, entity_type="lead", entity_id=3),
+        EntityTag(tag_id=1, entity_type="submission", entity_id=3),
+        Submission(form_type="talk", name="s", email="jane@acme.io", company="Acme", status="Converted", lead_id=3),
+    ])
+    db.commit()
+
+    moved = merge_leads(db, 1, [2, 3])
+    db.commit()
+
+    assert moved == {"comments": 2, "call_logs": 0, "reminders": 0, "submissions": 1, "entity_tags": 1}
+    assert [lead_id for (lead_id,) in db.query(Lead.id).order_by(Lead.id)] == [1, 4]
+    assert {lead_id for (lead_id,) in db.query(Comment.lead_id)} == {1}
+    assert db.query(Submission).one().lead_id == 1
+    # One row per tag on the survivor; the submission tag is untouched
+    assert sorted(db.query(EntityTag.tag_id, EntityTag.entity_type, EntityTag.entity_id)) == [
+        (1, "lead", 1), (1, "submission", 3), (2, "lead", 1)
+    ]
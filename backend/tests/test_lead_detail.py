@@ -0,0 +1,125 @@
+"""
+Unit tests for the combined lead detail endpoint (GET /leads/{id}/full)
+"""
+import pytest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from database import Base
+from models.activity_log import ActivityLog
+from models.call_log import CallLog
+from models.comment import Comment
+from models.entity_tag import EntityTag
+from models.lead import Lead
+from models.reminder import Reminder
+from models.tag import Tag
+from routers.activities import get_lead_activities
+from routers.call_logs import list_call_logs
+from routers.comments import list_comments
+from routers.leads import get_lead_detail
+from routers.reminders import list_reminders
+from routers.tags import get_entity_tags
+from services.principal_cache import Principal
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+NOW = datetime(2024, 3, 10, 12, 0)
+
+def make_principal(user_id, role_name, permissions):
+    user = SimpleNamespace(id=user_id, name=f"User {user_id}", email=f"u{user_id}@test.com", role_id=user_id, manager_id=None)
+    role = SimpleNamespace(id=user_id, role_name=role_name, hierarchy_level=2, permissions=permissions)
+    return Principal(user, role)
+
+ADMIN = make_principal(1, "Admin", {"all": True, "reminders": True})
+MANAGER = make_principal(2, "Sales Manager", {"leads": True, "reminders": True})
+EXECUTIVE = make_principal(3, "Sales Executive", {"leads": True, "reminders": True})
+MARKETING = make_principal(4, "Marketing", {"leads": True})
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    lead, other = Lead(name="A", email="a@test.com", company="Acme"), Lead(name="B", email="b@test.com", company="Beta")
+    session.add_all([lead, other])
+    session.flush()
+    tag, other_tag = Tag(name="Hot", entity_type="lead"), Tag(name="Cold", entity_type="lead")
+    session.add_all([tag, other_tag])
+    session.flush()
+    session.add_all([
+        Comment(lead_id=lead.id, text="first", created_by=3),
+        Comment(lead_id=lead.id, text="second", created_by=2),
+        Comment(lead_id=other.id, text="elsewhere", created_by=3),
+        EntityTag(tag_id=tag.id, entity_type="lead", entity_id=lead.id),
+        EntityTag(tag_id=other_tag.id, entity_type="submission", entity_id=lead.id),
+    ])
+    for user_id in (2, 3):
+        session.add_all([
+            CallLog(lead_id=lead.id, user_id=user_id, objective="Intro", meeting_date=NOW - timedelta(days=user_id)),
+            CallLog(lead_id=other.id, user_id=user_id, objective="Elsewhere", meeting_date=NOW),
+            Reminder(lead_id=lead.id, user_id=user_id, title="Call back", due_date=NOW + timedelta(days=user_id)),
+            Reminder(lead_id=other.id, user_id=user_id, title="Elsewhere", due_date=NOW),
+        ])
+    for i in range(6):
+        session.add(ActivityLog(
+            action_type="status_changed", description=f"change {i}", entity_type="lead",
+            entity_id=lead.id, user_id=2 + i % 2, created_at=NOW + timedelta(minutes=i),
+        ))
+    session.add(ActivityLog(action_type="user_updated", description="user", entity_type="user", entity_id=lead.id, user_id=3))
+    session.commit()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+def lead_id(db, name="A"):
+    return db.query(Lead.id).filter(Lead.name == name).scalar()
+
+def ids(rows):
+    return [row.id for row in rows]
+
+def test_missing_lead_is_404(db):
+    with pytest.raises(HTTPException) as error:
+        get_lead_detail(9999, activity_limit=50, db=db, current_user=ADMIN)
+    assert error.value.status_code == 404
+
+def test_call_logs_and_reminders_are_private_unless_all(db):
+    detail = get_lead_detail(lead_id(db), activity_limit=50, db=db, current_user=ADMIN)
+    assert sorted(log.user_id for log in detail["call_logs"]) == [2, 3]
+    assert sorted(reminder.user_id for reminder in detail["reminders"]) == [2, 3]
+
+    # Sales Managers see their team's leads, but only their own call logs and reminders
+    for principal in (MANAGER, EXECUTIVE):
+        detail = get_lead_detail(lead_id(db), activity_limit=50, db=db, current_user=principal)
+        assert {log.user_id for log in detail["call_logs"]} == {principal.id}
+        assert {reminder.user_id for reminder in detail["reminders"]} == {principal.id}
+
+def test_reminders_need_reminders_permission(db):
+    detail = get_lead_detail(lead_id(db), activity_limit=50, db=db, current_user=MARKETING)
+    assert detail["reminders"] == []
+    assert detail["call_logs"] == []
+
+def test_activities_depend_on_role(db):
+    for principal in (ADMIN, MANAGER):
+        activities = get_lead_detail(lead_id(db), activity_limit=50, db=db, current_user=principal)["activities"]
+        assert [activity.description for activity in activities] == [f"change {i}" for i in range(5, -1, -1)]
+    activities = get_lead_detail(lead_id(db), activity_limit=50, db=db, current_user=EXECUTIVE)["activities"]
+    assert [activity.description for activity in activities] == ["change 5", "change 3", "change 1"]
+
+def test_activity_limit_keeps_the_latest(db):
+    activities = get_lead_detail(lead_id(db), activity_limit=2, db=db, current_user=ADMIN)["activities"]
+    assert [activity.description for activity in activities] == ["change 5", "change 4"]
+
+def test_parts_match_their_own_endpoints(db):
+    id = lead_id(db)
+    for principal in (ADMIN, MANAGER, EXECUTIVE):
+        detail = get_lead_detail(id, activity_limit=200, db=db, current_user=principal)
+        assert ids(detail["comments"]) == ids(list_comments(id, db=db, current_user=principal))
+        assert ids(detail["call_logs"]) == ids(list_call_logs(lead_id=id, user_id=None, db=db, current_user=principal))
+        assert ids(detail["reminders"]) == ids(list_reminders(
+            lead_id=id, user_id=None, completed=None, upcoming_only=False, db=db, current_user=principal
+        ))
+        assert ids(detail["tags"]) == ids(get_entity_tags("lead", id, db=db, current_user=principal))
+        assert ids(detail["activities"]) == ids(get_lead_activities(id, db=db, current_user=principal))
+        assert detail["lead"].id == id
@@ -0,0 +1,42 @@
+"""
+Unit tests for the lead list serialization fast path
+"""
+import json
+import pytest
+from datetime import date, datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from database import Base
+from models.lead import Lead
+from schemas.lead import LeadOut
+from services.lead_serializer import LEAD_LIST_COLUMNS, serialize_lead_rows
+from services.lead_queries import paginate_leads
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    session.add_all([
+        Lead(name="Web", email="web@test.com", company="Acme", source_type="Website", source="Talk to Sales", created_by=1,
+             follow_up_required=True, follow_up_date=date(2024, 2, 1), created_at=datetime(2024, 1, 1, 9, 0)),
+        Lead(name="Show", email="show@test.com", company="Acme", source_type="Trade Show", source="Expo",
+             created_at=datetime(2024, 1, 2, 9, 0)),
+    ])
+    session.commit()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+def test_matches_leadout_serialization(db):
+    rows, _ = paginate_leads(db.query(*LEAD_LIST_COLUMNS), sort="id", order="asc")
+    body = json.loads(serialize_lead_rows(rows, {1: "Creator"}))
+
+    expected = []
+    for lead in db.query(Lead).order_by(Lead.id).all():
+        item = LeadOut.model_validate(lead).model_dump(mode="json")
+        item["created_by_name"] = "Creator" if lead.created_by == 1 else None
+        expected.append(item)
+    assert body == expected
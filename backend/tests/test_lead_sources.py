@@ -0,0 +1,50 @@
+"""
+Unit tests for write-time lead source normalization
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from database import Base
+from models.lead import Lead
+from services.lead_sources import normalize_source, needs_normalization, source_for_form_type
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+CASES = [
+    # (stored source_type, stored source) -> normalized
+    (("Talk to Sales", None), ("Website", "Talk to Sales")),
+    (("Request a Demo", "Website"), ("Website", "Request a Demo")),
+    (("Request a Demo", "Expo"), ("Website", "Expo")),
+    ((None, "General Inquiry"), ("Website", "General Inquiry")),
+    (("Referral", "Brochure Download"), ("Website", "Brochure Download")),
+    (("Website", "Talk to Sales"), ("Website", "Talk to Sales")),
+    (("Trade Show", "Expo"), ("Trade Show", "Expo")),
+    ((None, None), (None, None)),
+]
+
+@pytest.mark.parametrize("stored,expected", CASES)
+def test_normalize_source(stored, expected):
+    assert normalize_source(*stored) == expected
+    # Normalizing is idempotent
+    assert normalize_source(*expected) == expected
+
+def test_sql_predicate_matches_python_rule():
+    """The backfill selects exactly the rows normalize_source() would change"""
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    try:
+        for index, (stored, _) in enumerate(CASES):
+            db.add(Lead(id=index + 1, name="x", email="x@test.com", company="c", source_type=stored[0], source=stored[1]))
+        db.commit()
+        selected = {lead.id for lead in db.query(Lead).filter(needs_normalization(Lead.source_type, Lead.source))}
+        expected = {index + 1 for index, (stored, normalized) in enumerate(CASES) if stored != normalized}
+        assert selected == expected
+    finally:
+        db.close()
+        Base.metadata.drop_all(bind=engine)
+
+def test_source_for_form_type():
+    assert source_for_form_type("talk_to_sales") == "Talk to Sales"
+    assert source_for_form_type("Product-Profile") == "Product Profile Download"
+    assert source_for_form_type(None) == "Website Form"
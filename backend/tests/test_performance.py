@@ -0,0 +1,114 @@
+"""
+Unit tests for the performance report metrics and their rollups
+"""
+import pytest
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+from database import Base
+from models.call_log import CallLog
+from models.lead import Lead
+from models.report_rollup import LeadStatusRollup
+from services.performance import user_metrics, source_metrics, combine_metrics
+from services.report_rollups import ensure_report_rollups, rebuild_report_rollups
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    leads = [
+        Lead(name="A", email="a@test.com", company="Acme", status="New", assigned_to=2),
+        Lead(name="B", email="b@test.com", company="Acme", status="Closed Won", assigned_to=2),
+        Lead(name="C", email="c@test.com", company="Acme", status="Won", assigned_to=2),
+        Lead(name="D", email="d@test.com", company="Acme", status="New", assigned_to=3),
+        Lead(name="E", email="e@test.com", company="Acme", status="Closed Won", assigned_to=None),
+    ]
+    session.add_all(leads)
+    session.commit()
+    # Built after the leads exist: those are backfilled, the call logs come from the triggers
+    assert ensure_report_rollups(engine)
+    assert not ensure_report_rollups(engine)
+    session.add_all([
+        CallLog(lead_id=leads[0].id, user_id=2, stage="A", dollar_value=100.5, secured_order=True),
+        CallLog(lead_id=leads[1].id, user_id=2, stage="A", dollar_value=None, secured_order=False),
+        CallLog(lead_id=leads[1].id, user_id=2, stage=None, dollar_value=20, secured_order=True),
+        CallLog(lead_id=leads[3].id, user_id=3, stage="C", dollar_value=5, secured_order=False),
+    ])
+    session.commit()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+def test_user_metrics(db):
+    metrics = user_metrics(db, [2, 3, 4])
+    assert metrics[2] == {
+        "total_leads": 3,
+        "total_calls": 3,
+        "total_dollar_value": 120.5,
+        "secured_orders": 2,
+        "status_counts": {"New": 1, "Closed Won": 1, "Won": 1},
+        "stage_distribution": {"A": 2},
+        "closed_won": 2,
+        "conversion_rate": pytest.approx(66.667, abs=0.001),
+    }
+    assert (metrics[3]["total_leads"], metrics[3]["closed_won"], metrics[3]["stage_distribution"]) == (1, 0, {"C": 1})
+    # Users without leads or calls still get a row
+    assert (metrics[4]["total_leads"], metrics[4]["total_calls"], metrics[4]["conversion_rate"]) == (0, 0, 0)
+
+def test_combine_metrics(db):
+    metrics = user_metrics(db, [2, 3])
+    team = combine_metrics(metrics.values())
+    assert (team["total_leads"], team["total_calls"], team["secured_orders"]) == (4, 4, 2)
+    assert team["total_dollar_value"] == 125.5
+    assert team["status_counts"] == {"New": 2, "Closed Won": 1, "Won": 1}
+    assert team["stage_distribution"] == {"A": 2, "C": 1}
+    assert team["conversion_rate"] == 50
+
+def test_rollups_follow_writes(db):
+    assert user_metrics(db, [2, 3, 4]) == source_metrics(db, [2, 3, 4])
+
+    lead = db.query(Lead).filter(Lead.name == "A").one()
+    lead.status = "Closed Won"
+    lead.assigned_to = 4
+    call_log = db.query(CallLog).filter(CallLog.stage == "C").one()
+    call_log.dollar_value = 7.5
+    call_log.secured_order = True
+    db.delete(db.query(Lead).filter(Lead.name == "D").one())
+    db.commit()
+    # Bulk statements are counted too
+    db.execute(update(Lead).where(Lead.name == "E").values(assigned_to=3))
+    db.commit()
+
+    metrics = user_metrics(db, [2, 3, 4])
+    assert metrics == source_metrics(db, [2, 3, 4])
+    assert (metrics[3]["status_counts"], metrics[3]["total_dollar_value"], metrics[3]["secured_orders"]) == (
+        {"Closed Won": 1}, 7.5, 1
+    )
+    assert metrics[4]["closed_won"] == 1
+    # Emptied rollup rows are dropped
+    assert db.query(LeadStatusRollup).filter(LeadStatusRollup.user_id == 3, LeadStatusRollup.status == "New").count() == 0
+
+    # Rolled-back writes leave the rollups alone
+    db.add(Lead(name="F", email="f@test.com", company="Acme", status="New", assigned_to=2))
+    db.flush()
+    db.rollback()
+    assert user_metrics(db, [2])[2]["total_leads"] == 2
+
+def test_rebuild_repairs_rollups(db):
+    expected = user_metrics(db, [2, 3])
+    db.query(LeadStatusRollup).delete()
+    db.commit()
+    assert user_metrics(db, [2, 3])[2]["total_leads"] == 0
+    rebuild_report_rollups(engine)
+    assert user_metrics(db, [2, 3]) == expected
+
+def test_leads_without_status_count_under_none(db):
+    db.add(Lead(name="F", email="f@test.com", company="Acme", assigned_to=3))
+    db.commit()
+    # Bypasses the column default, like rows written before it existed
+    db.execute(update(Lead).where(Lead.name == "F").values(status=None))
+    db.commit()
+    assert user_metrics(db, [3])[3]["status_counts"] == {"New": 1, None: 1}
+    assert source_metrics(db, [3])[3]["status_counts"] == {"New": 1, None: 1}
@@ -0,0 +1,61 @@
+"""
+Unit tests for the compiled permission registry
+"""
+from types import SimpleNamespace
+from services.permissions import CompiledPermissions, PermissionRegistry, has
+from services.principal_cache import RoleSnapshot
+
+def principal_with(permissions):
+    return SimpleNamespace(role=RoleSnapshot(99, "Role", 2, permissions))
+
+def test_admin_has_everything():
+    compiled = CompiledPermissions({"all": True})
+    assert compiled.allows("leads")
+    assert compiled.allows("roles", write=True)
+    assert compiled.allows("something_new", write=True)
+
+def test_write_requires_explicit_permission():
+    compiled = CompiledPermissions({"view": True, "leads": True})
+    assert compiled.allows("leads", write=True)
+    assert not compiled.allows("submissions", write=True)
+    assert not compiled.allows("lead_status_update", write=True)
+
+def test_view_grants_read_only_access():
+    compiled = CompiledPermissions({"view": True})
+    for permission in ("leads", "submissions", "reports"):
+        assert compiled.allows(permission)
+        assert not compiled.allows(permission, write=True)
+    assert not compiled.allows("users")
+    # Implications are not transitive: view -> leads does not grant lead sub-permissions
+    assert not compiled.allows("lead_status_update")
+
+def test_leads_grants_lead_sub_permissions_for_reads():
+    compiled = CompiledPermissions({"leads": True})
+    for permission in ("lead_status_update", "lead_comments", "lead_assignment"):
+        assert compiled.allows(permission)
+        assert not compiled.allows(permission, write=True)
+
+def test_only_true_values_count():
+    compiled = CompiledPermissions({"leads": False, "reports": "yes"})
+    assert not compiled.allows("leads")
+    assert not compiled.allows("reports")
+
+def test_unknown_permissions_get_their_own_bit():
+    compiled = CompiledPermissions({"custom_export": True})
+    assert compiled.allows("custom_export", write=True)
+    assert not CompiledPermissions({"leads": True}).allows("custom_export")
+
+def test_has_uses_principal_role():
+    assert has(principal_with({"reports": True}), "reports")
+    assert not has(principal_with({"reports": True}), "users")
+    assert not has(SimpleNamespace(role=None), "leads")
+
+def test_registry_reuses_matching_snapshot():
+    registry = PermissionRegistry()
+    role = SimpleNamespace(id=5, permissions={"leads": True})
+    compiled = registry.compile_role(role)
+    assert registry.for_role(5, {"leads": True}) is compiled
+    # A stale snapshot is compiled separately and doesn't clobber the registry entry
+    stale = registry.for_role(5, {"reports": True})
+    assert stale is not compiled
+    assert registry.for_role(5, {"leads": True}) is compiled
@@ -0,0 +1,54 @@
+"""
+Unit tests for the principal cache used by the auth dependencies
+"""
+import time
+from types import SimpleNamespace
+from services.principal_cache import Principal, PrincipalCache
+
+def make_principal(user_id=1, role_id=10, permissions=None):
+    user = SimpleNamespace(id=user_id, name="User", email=f"u{user_id}@test.com", role_id=role_id, manager_id=None)
+    role = SimpleNamespace(id=role_id, role_name="Sales Executive", hierarchy_level=2, permissions=permissions or {"leads": True})
+    return Principal(user, role)
+
+def test_principal_snapshots_role():
+    """Principal copies role data so later edits to the row don't leak in"""
+    role_permissions = {"leads": True}
+    principal = make_principal(permissions=role_permissions)
+    role_permissions["all"] = True
+    assert principal.role_name == "Sales Executive"
+    assert principal.permissions == {"leads": True}
+
+def test_cache_hit_and_miss():
+    cache = PrincipalCache(ttl=60, max_entries=10)
+    principal = make_principal()
+    cache.put(1, "token-a", principal)
+    assert cache.get(1, "token-a") is principal
+    assert cache.get(1, "token-b") is None
+    assert cache.get(2, "token-a") is None
+
+def test_cache_expires():
+    cache = PrincipalCache(ttl=0.01, max_entries=10)
+    cache.put(1, "token-a", make_principal())
+    time.sleep(0.02)
+    assert cache.get(1, "token-a") is None
+
+def test_invalidate_user_and_role():
+    cache = PrincipalCache(ttl=60, max_entries=10)
+    cache.put(1, "token-a", make_principal(user_id=1, role_id=10))
+    cache.put(1, "token-b", make_principal(user_id=1, role_id=10))
+    cache.put(2, "token-c", make_principal(user_id=2, role_id=20))
+
+    cache.invalidate_user(1)
+    assert cache.get(1, "token-a") is None
+    assert cache.get(1, "token-b") is None
+    assert cache.get(2, "token-c") is not None
+
+    cache.invalidate_role(20)
+    assert cache.get(2, "token-c") is None
+
+def test_cache_is_bounded():
+    cache = PrincipalCache(ttl=60, max_entries=4)
+    for i in range(20):
+        cache.put(i, f"token-{i}", make_principal(user_id=i))
+    assert len(cache._entries) <= 4
+    assert cache.get(19, "token-19") is not None
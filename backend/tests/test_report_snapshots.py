@@ -0,0 +1,85 @@
+"""
+Unit tests for the daily report snapshots and trends
+"""
+import pytest
+from datetime import date
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from database import Base
+from models.lead import Lead
+from models.role import Role
+from models.user import User
+from services.report_rollups import ensure_report_rollups
+from services.report_snapshots import bucket_start, take_snapshot, trend_series
+from services.team_index import team_index
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    ensure_report_rollups(engine)
+    session = TestingSessionLocal()
+    yield session
+    session.close()
+    team_index.invalidate()
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture
+def org(db):
+    manager_role = Role(role_name="Sales Manager", hierarchy_level=1, permissions={"leads": True})
+    exec_role = Role(role_name="Sales Executive", hierarchy_level=2, permissions={"leads": True})
+    db.add_all([manager_role, exec_role])
+    db.commit()
+    manager = User(name="Mgr", email="mgr@test.com", hashed_password="x", role_id=manager_role.id)
+    db.add(manager)
+    db.commit()
+    alice = User(name="Alice", email="alice@test.com", hashed_password="x", role_id=exec_role.id, manager_id=manager.id)
+    bob = User(name="Bob", email="bob@test.com", hashed_password="x", role_id=exec_role.id)
+    db.add_all([alice, bob])
+    db.commit()
+    team_index.load(db)
+    return manager, alice, bob
+
+def test_bucket_start():
+    day = date(2024, 3, 14)  # a Thursday
+    assert bucket_start(day, 'day') == day
+    assert bucket_start(day, 'week') == date(2024, 3, 11)
+    assert bucket_start(day, 'month') == date(2024, 3, 1)
+
+def test_trends_keep_past_metrics(db, org):
+    manager, alice, bob = org
+    lead = Lead(name="A", email="a@test.com", company="Acme", status="New", assigned_to=alice.id)
+    db.add_all([lead, Lead(name="B", email="b@test.com", company="Acme", status="New", assigned_to=bob.id)])
+    db.commit()
+    assert take_snapshot(db, date(2024, 3, 4)) == 3
+    lead.status = "Closed Won"
+    db.commit()
+    take_snapshot(db, date(2024, 3, 6))
+    # Re-running a day replaces its snapshot
+    take_snapshot(db, date(2024, 3, 6))
+    take_snapshot(db, date(2024, 3, 12))
+    db.commit()
+
+    daily = trend_series(db, date(2024, 3, 1), date(2024, 3, 31), 'day')
+    assert [entry["snapshot_date"] for entry in daily] == ["2024-03-04", "2024-03-06", "2024-03-12"]
+    assert [entry["executives"][0]["closed_won"] for entry in daily] == [0, 1, 1]
+    assert daily[0]["executives"][0]["user_name"] == "Alice"
+    assert daily[1]["teams"] == [{
+        "manager_id": manager.id, "manager_name": "Mgr", "total_leads": 1, "total_calls": 0, "conversion_rate": 100.0,
+        "total_dollar_value": 0, "secured_orders": 0, "status_counts": {"Closed Won": 1}, "stage_distribution": {},
+        "closed_won": 1,
+    }]
+
+    # Each week is represented by its last snapshot
+    weekly = trend_series(db, date(2024, 3, 1), date(2024, 3, 31), 'week')
+    assert [(entry["period"], entry["snapshot_date"]) for entry in weekly] == [
+        ("2024-03-04", "2024-03-06"), ("2024-03-11", "2024-03-12"),
+    ]
+    assert [entry["snapshot_date"] for entry in trend_series(db, date(2024, 3, 1), date(2024, 3, 5), 'month')] == ["2024-03-04"]
+
+    # A manager only sees their own executives and team
+    team = trend_series(db, date(2024, 3, 1), date(2024, 3, 31), 'month', manager_id=manager.id)
+    assert [e["user_id"] for e in team[0]["executives"]] == [alice.id]
+    assert [t["manager_id"] for t in team[0]["teams"]] == [manager.id]
@@ -0,0 +1,70 @@
+"""
+Unit tests for the full-text search index
+"""
+import pytest
+from types import SimpleNamespace
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from database import Base
+from models.call_log import CallLog
+from models.comment import Comment
+from models.lead import Lead
+from services.principal_cache import Principal
+from services.search_index import ensure_search_index, search
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def make_principal(user_id, role_name, permissions):
+    user = SimpleNamespace(id=user_id, name=f"User {user_id}", email=f"u{user_id}@test.com", role_id=user_id, manager_id=None)
+    role = SimpleNamespace(id=user_id, role_name=role_name, hierarchy_level=2, permissions=permissions)
+    return Principal(user, role)
+
+ADMIN = make_principal(1, "Admin", {"all": True})
+EXECUTIVE = make_principal(2, "Sales Executive", {"leads": True})
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    session.add_all([
+        Lead(id=1, name="Zebra Crossing", email="zc@acme.io", company="Acme", assigned_to=2),
+        Lead(id=2, name="Other Lead", email="other@test.com", company="Zebra Holdings", assigned_to=3),
+    ])
+    session.commit()
+    # Built after the first rows exist: those are backfilled, later ones come from the triggers
+    assert ensure_search_index(engine)
+    assert not ensure_search_index(engine)
+    session.add_all([
+        Comment(lead_id=1, text="Wants a zebra-striped quote"),
+        CallLog(lead_id=1, user_id=2, objective="Pricing", post_meeting_notes="zebra volume discount"),
+        CallLog(lead_id=1, user_id=3, objective="Private", challenges="zebra budget freeze"),
+    ])
+    session.commit()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP TABLE IF EXISTS search_index")
+
+def hits(db, principal, q):
+    return {(hit["entity_type"], hit["entity_id"]) for hit in search(db, principal, q, limit=50)}
+
+def test_search_is_scoped(db):
+    assert hits(db, ADMIN, "zebra") == {("lead", 1), ("lead", 2), ("comment", 1), ("call_log", 1), ("call_log", 2)}
+    # Only leads assigned to the executive, and only their own call logs
+    assert hits(db, EXECUTIVE, "zebra") == {("lead", 1), ("comment", 1), ("call_log", 1)}
+
+def test_every_word_must_match_as_prefix(db):
+    assert hits(db, ADMIN, "zeb acm") == {("lead", 1)}
+    assert hits(db, ADMIN, 'zebra "budget') == {("call_log", 2)}
+    assert hits(db, ADMIN, "*** OR") == set()
+
+def test_index_follows_writes(db):
+    lead = db.get(Lead, 2)
+    lead.company = "Giraffe Ltd"
+    db.query(Comment).filter(Comment.lead_id == 1).delete()
+    db.commit()
+    assert hits(db, ADMIN, "giraffe") == {("lead", 2)}
+    assert ("lead", 2) not in hits(db, ADMIN, "zebra")
+    assert ("comment", 1) not in hits(db, ADMIN, "zebra")
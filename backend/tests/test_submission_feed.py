@@ -0,0 +1,108 @@
+"""
+Unit tests for the newest-first submission feeds
+"""
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from database import Base
+from database_forms import FormsBase
+from models.external.brochure_forms import BrochureForm
+from models.external.contact_forms import ContactForm
+from models.external.newsletter_subscriptions import NewsletterSubscription
+from models.external.product_profile_forms import ProductProfileForm
+from models.external.talk_to_sales_forms import TalkToSalesForm
+from models.submission import Submission
+from services.lead_queries import InvalidCursor
+from services.submission_feed import crm_feed, forms_db_feed, forms_db_submissions, take_page
+
+forms_engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+FormsSession = sessionmaker(bind=forms_engine)
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+START = datetime(2024, 3, 1, 9, 0)
+
+@pytest.fixture
+def forms_db():
+    FormsBase.metadata.create_all(bind=forms_engine)
+    session = FormsSession()
+    for i in range(12):
+        # Every third submission shares its timestamp with one in another table
+        at = START + timedelta(minutes=i - i % 3)
+        person = dict(first_name=f"F{i}", last_name="L", email=f"p{i}@test.com", submitted_at=at)
+        if i % 4 == 0:
+            session.add(ContactForm(company="Acme", demo_date="2024-04-01" if i % 8 else None, **person))
+        elif i % 4 == 1:
+            session.add(BrochureForm(company="Acme", **person))
+        elif i % 4 == 2:
+            session.add(ProductProfileForm(company_name="Beta", phone="1", **person))
+        else:
+            session.add(TalkToSalesForm(company="Acme", phone="1", **person))
+    session.add(NewsletterSubscription(email="n@test.com", subscribed_at=START + timedelta(minutes=3)))
+    session.commit()
+    yield session
+    session.close()
+    FormsBase.metadata.drop_all(bind=forms_engine)
+
+def _all_pages(read, limit):
+    items, cursor = take_page(read(None, limit), limit)
+    while cursor:
+        page, cursor = take_page(read(cursor, limit), limit)
+        items += page
+    return items
+
+def test_merged_feed_is_newest_first(forms_db):
+    items = [item for *_, item in forms_db_feed(forms_db)]
+    assert len(items) == 13
+    assert [item.submitted_at for item in items] == sorted((item.submitted_at for item in items), reverse=True)
+    by_email = {item.email: item for item in items}
+    assert (by_email["p0@test.com"].form_type, by_email["p4@test.com"].form_type) == ("contact", "demo")
+    assert by_email["p2@test.com"].company == "Beta"
+    assert dict(by_email["n@test.com"]) == {
+        "id": 1, "form_type": "newsletter", "name": "", "email": "n@test.com", "company": "",
+        "submitted_at": START + timedelta(minutes=3), "data": {"email": "n@test.com"}, "status": "New", "lead_id": None,
+    }
+    assert list(forms_db_submissions(FormsSession)) == items
+
+def test_pages_cover_the_feed_once(forms_db):
+    everything = [item for *_, item in forms_db_feed(forms_db)]
+    for limit in (1, 2, 5, 50):
+        assert _all_pages(lambda cursor, limit: forms_db_feed(forms_db, cursor=cursor, limit=limit), limit) == everything
+
+def test_page_reads_at_most_limit_plus_one_row_per_table(forms_db):
+    fetched = []
+    def count_rows(conn, cursor, statement, parameters, context, executemany):
+        fetched.append(statement)
+    event.listen(forms_engine, "before_cursor_execute", count_rows)
+    try:
+        items, cursor = take_page(forms_db_feed(forms_db, limit=2), 2)
+    finally:
+        event.remove(forms_engine, "before_cursor_execute", count_rows)
+    assert len(items) == 2 and cursor
+    assert len(fetched) == 6 and all("LIMIT" in statement for statement in fetched)
+
+def test_form_type_alias_labels(forms_db):
+    items = [item for *_, item in forms_db_feed(forms_db, "talk_to_sales")]
+    assert {item.form_type for item in items} == {"talk_to_sales"}
+    assert len(items) == 3
+    assert list(forms_db_feed(forms_db, "unknown")) == []
+
+def test_crm_feed_pages_and_rejects_bad_cursor():
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    try:
+        db.add_all(
+            Submission(form_type="talk", name=f"s{i}", email=f"s{i}@test.com", company="Acme", submitted=START + timedelta(minutes=i // 2))
+            for i in range(7)
+        )
+        db.commit()
+        everything = [sub.name for *_, sub in crm_feed(db.query(Submission))]
+        assert everything == ["s6", "s5", "s4", "s3", "s2", "s1", "s0"]
+        pages = _all_pages(lambda cursor, limit: crm_feed(db.query(Submission), cursor=cursor, limit=limit), 3)
+        assert [sub.name for sub in pages] == everything
+        with pytest.raises(InvalidCursor):
+            crm_feed(db.query(Submission), cursor="not-a-cursor", limit=3)
+    finally:
+        db.close()
+        Base.metadata.drop_all(bind=engine)
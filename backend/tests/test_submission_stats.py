@@ -0,0 +1,80 @@
+"""
+Unit tests for the per-form-type submission counts
+"""
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from database import Base
+from database_forms import FormsBase
+from models.external.brochure_forms import BrochureForm  # noqa: F401
+from models.external.contact_forms import ContactForm
+from models.external.newsletter_subscriptions import NewsletterSubscription
+from models.external.product_profile_forms import ProductProfileForm  # noqa: F401
+from models.external.talk_to_sales_forms import TalkToSalesForm
+from models.submission import Submission
+from services.submission_stats import cached_stats, clear_stats_cache, crm_stats, forms_db_stats, stats_as_of
+
+forms_engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+FormsSession = sessionmaker(bind=forms_engine)
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+AS_OF = stats_as_of(datetime(2024, 6, 30, 12, 0, 45))
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    yield session
+    session.close()
+    clear_stats_cache()
+    Base.metadata.drop_all(bind=engine)
+
+def _by_type(stats):
+    return {entry.pop("form_type"): entry for entry in stats}
+
+def test_crm_stats_fold_aliases(db):
+    db.add_all([
+        Submission(form_type="contact", name="a", email="a@test.com", company="", status="New", submitted=AS_OF - timedelta(days=1)),
+        Submission(form_type="general", name="b", email="b@test.com", company="", status="Converted", submitted=AS_OF - timedelta(days=10)),
+        Submission(form_type="talk_to_sales", name="c", email="c@test.com", company="", status=None, submitted=AS_OF - timedelta(days=40)),
+        Submission(form_type="talk", name="d", email="d@test.com", company="", status="Archived", submitted=AS_OF - timedelta(days=3)),
+    ])
+    db.commit()
+    stats = crm_stats(db, AS_OF)
+    assert [entry["form_type"] for entry in stats] == ["contact", "talk"]
+    assert _by_type(stats) == {
+        "contact": {"total": 2, "new": 1, "converted": 1, "last_7_days": 1, "last_30_days": 2},
+        "talk": {"total": 2, "new": 1, "converted": 0, "last_7_days": 1, "last_30_days": 1},
+    }
+
+def test_forms_db_stats():
+    FormsBase.metadata.create_all(bind=forms_engine)
+    forms_db = FormsSession()
+    try:
+        person = dict(first_name="F", last_name="L", email="p@test.com")
+        forms_db.add_all([
+            ContactForm(submitted_at=AS_OF - timedelta(days=2), **person),
+            ContactForm(demo_date="2024-07-01", submitted_at=AS_OF - timedelta(days=20), **person),
+            TalkToSalesForm(phone="1", submitted_at=AS_OF - timedelta(days=60), **person),
+            NewsletterSubscription(email="n@test.com", subscribed_at=AS_OF - timedelta(days=5)),
+        ])
+        forms_db.commit()
+        stats = _by_type(forms_db_stats(forms_db, AS_OF))
+    finally:
+        forms_db.close()
+        FormsBase.metadata.drop_all(bind=forms_engine)
+    assert stats["contact"] == {"total": 1, "new": 1, "converted": 0, "last_7_days": 1, "last_30_days": 1}
+    assert stats["demo"] == {"total": 1, "new": 1, "converted": 0, "last_7_days": 0, "last_30_days": 1}
+    assert stats["talk"]["total"] == 1 and stats["talk"]["last_30_days"] == 0
+    assert stats["newsletter"]["last_7_days"] == 1
+    assert stats["brochure"]["total"] == 0
+
+def test_cached_until_version_or_minute_changes(db):
+    calls = []
+    compute = lambda: calls.append(1) or [len(calls)]
+    assert cached_stats("submissions", 1, AS_OF, compute) == [1]
+    assert cached_stats("submissions", 1, AS_OF, compute) == [1]
+    assert cached_stats("submissions", 2, AS_OF, compute) == [2]
+    assert cached_stats("submissions", 2, AS_OF + timedelta(minutes=1), compute) == [3]
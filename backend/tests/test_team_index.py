@@ -0,0 +1,80 @@
+"""
+Unit tests for the in-memory team membership index
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from database import Base
+from models.role import Role
+from models.user import User
+from services.team_index import TeamIndex
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture
+def org(db):
+    manager_role = Role(role_name="Sales Manager", hierarchy_level=1, permissions={"leads": True})
+    exec_role = Role(role_name="Sales Executive", hierarchy_level=2, permissions={"leads": True})
+    marketing_role = Role(role_name="Marketing", hierarchy_level=3, permissions={"submissions": True})
+    db.add_all([manager_role, exec_role, marketing_role])
+    db.commit()
+    manager = User(name="Mgr", email="mgr@test.com", hashed_password="x", role_id=manager_role.id)
+    db.add(manager)
+    db.commit()
+    alice = User(name="Alice", email="alice@test.com", hashed_password="x", role_id=exec_role.id, manager_id=manager.id)
+    bob = User(name="Bob", email="bob@test.com", hashed_password="x", role_id=exec_role.id)
+    carol = User(name="Carol", email="carol@test.com", hashed_password="x", role_id=marketing_role.id, manager_id=manager.id)
+    db.add_all([alice, bob, carol])
+    db.commit()
+    return manager, alice, bob, carol
+
+def test_team_and_assignable_sets(db, org):
+    manager, alice, bob, carol = org
+    index = TeamIndex(refresh_seconds=0)
+    assert index.team_of(db, manager.id) == {alice.id}
+    assert index.executive_ids(db) == {alice.id, bob.id}
+    assert index.assignable_ids(db, manager_id=manager.id) == {alice.id}
+    assert [m.name for m in index.users_with_role(db, "Sales Manager")] == ["Mgr"]
+    assert index.user_name(db, alice.manager_id) == "Mgr"
+    assert index.role_by_name(db, "Marketing").hierarchy_level == 3
+
+def test_write_paths_keep_index_current(db, org):
+    manager, alice, bob, carol = org
+    index = TeamIndex(refresh_seconds=0)
+    index.load(db)
+
+    bob.manager_id = manager.id
+    db.commit()
+    index.upsert_user(bob)
+    assert index.team_of(db, manager.id) == {alice.id, bob.id}
+
+    index.remove_user(alice.id)
+    assert index.team_of(db, manager.id) == {bob.id}
+    assert index.user(db, alice.id) is None
+
+def test_role_rename_rebuilds_membership(db, org):
+    manager, alice, bob, carol = org
+    index = TeamIndex(refresh_seconds=0)
+    index.load(db)
+
+    exec_role = db.query(Role).filter(Role.role_name == "Sales Executive").first()
+    exec_role.role_name = "Account Executive"
+    db.commit()
+    index.upsert_role(exec_role)
+    assert index.executive_ids(db) == frozenset()
+
+def test_updates_before_load_are_ignored(db, org):
+    """Write paths don't populate a cold index; the first lookup loads it"""
+    manager, alice, bob, carol = org
+    index = TeamIndex(refresh_seconds=0)
+    index.remove_user(alice.id)
+    assert index.team_of(db, manager.id) == {alice.id}
@@ -0,0 +1,115 @@
+"""
+Unit tests for the token version registry used by stateless JWT verification
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from database import Base
+from models.role import Role
+from models.user import User
+from services.principal_cache import Principal
+from services.token_registry import TokenRegistry
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture
+def users(db):
+    role = Role(role_name="Sales Executive", hierarchy_level=2, permissions={"leads": True})
+    db.add(role)
+    db.commit()
+    alice = User(name="Alice", email="alice@test.com", hashed_password="x", role_id=role.id)
+    bob = User(name="Bob", email="bob@test.com", hashed_password="x", role_id=role.id)
+    db.add_all([alice, bob])
+    db.commit()
+    return role, alice, bob
+
+def test_fresh_tokens_are_current(db, users):
+    _, alice, _ = users
+    registry = TokenRegistry()
+    assert registry.is_current(alice.id, alice.email, 0, db)
+    assert not registry.is_current(alice.id, alice.email, 1, db)
+    assert not registry.is_current(alice.id, "someone@else.com", 0, db)
+
+def test_bump_revokes_old_tokens(db, users):
+    _, alice, bob = users
+    registry = TokenRegistry()
+    registry.load(db)
+    registry.bump(db, alice)
+    db.commit()
+    assert not registry.is_current(alice.id, alice.email, 0, db)
+    assert registry.is_current(alice.id, alice.email, 1, db)
+    assert registry.is_current(bob.id, bob.email, 0, db)
+
+def test_bump_role_revokes_all_members(db, users):
+    role, alice, bob = users
+    registry = TokenRegistry()
+    registry.load(db)
+    registry.bump_role(db, role.id)
+    db.commit()
+    assert not registry.is_current(alice.id, alice.email, 0, db)
+    assert not registry.is_current(bob.id, bob.email, 0, db)
+    assert registry.is_current(bob.id, bob.email, 1, db)
+
+def test_bumps_are_mirrored_only_once_committed(db, users):
+    role, alice, bob = users
+    registry = TokenRegistry()
+    registry.load(db)
+    registry.bump(db, alice)
+    registry.bump_role(db, role.id)
+    assert registry.check_cached(alice.id, alice.email, 0) is True
+    db.rollback()
+    db.commit()
+    assert registry.check_cached(alice.id, alice.email, 0) is True
+    assert registry.check_cached(bob.id, bob.email, 0) is True
+
+def test_versions_bumped_by_another_worker(db, users):
+    _, alice, bob = users
+    registry = TokenRegistry()
+    registry.load(db)
+    # Another worker changes Alice's password and issues her a version 1 token
+    other = TokenRegistry()
+    other.bump(db, alice)
+    db.commit()
+    # Newer than the mirror: checked against the database, then mirrored
+    assert registry.check_cached(alice.id, alice.email, 1) is None
+    assert registry.is_current(alice.id, alice.email, 1, db)
+    assert registry.check_cached(alice.id, alice.email, 1) is True
+    assert registry.check_cached(alice.id, alice.email, 0) is False
+
+    # A revocation this worker never saw is picked up by the periodic reload
+    other.bump(db, bob)
+    db.commit()
+    assert registry.check_cached(bob.id, bob.email, 0) is True
+    registry._loaded_at -= registry.refresh_seconds + 1
+    assert registry.check_cached(bob.id, bob.email, 0) is None
+    assert not registry.is_current(bob.id, bob.email, 0, db)
+    assert registry.check_cached(bob.id, bob.email, 0) is False
+
+def test_deleted_user_is_rejected(db, users):
+    _, alice, _ = users
+    registry = TokenRegistry()
+    registry.load(db)
+    registry.revoke_user(alice.id)
+    assert not registry.is_current(alice.id, alice.email, 0, db)
+
+def test_principal_from_claims():
+    claims = {
+        "sub": "alice@test.com", "user_id": 7, "name": "Alice", "manager_id": 3,
+        "role_id": 2, "role_name": "Sales Executive", "hierarchy_level": 2,
+        "permissions": {"leads": True}, "tv": 0
+    }
+    principal = Principal.from_claims(claims)
+    assert principal.id == 7
+    assert principal.role_name == "Sales Executive"
+    assert principal.permissions == {"leads": True}
+    # Tokens issued before the full claim set fall back to a database lookup
+    assert Principal.from_claims({"sub": "alice@test.com", "user_id": 7}) is None
@@ -54,16 +54,15 @@ export default function Dashboard(){
   const [pipeline, setPipeline] = useState([]);
   const [sources, setSources] = useState([]);
   const [timeline, setTimeline] = useState([]);
-  const [stats, setStats] = useState({ totalLeads: 0, totalSubmissions: 0, conversionRate: 0, newLeads: 0 });
-  const [myLeads, setMyLeads] = useState([]);
+  const [stats, setStats] = useState({ totalLeads: 0, totalSubmissions: 0, conversionRate: 0, newLeads: 0, newThisWeek: 0 });
   const [myReminders, setMyReminders] = useState([]);
-  const [myTasks, setMyTasks] = useState([]);
+  const [upcomingReminders, setUpcomingReminders] = useState(0);
   const [recentLeads, setRecentLeads] = useState([]);
   const [topSources, setTopSources] = useState([]);
   const [conversionTrend, setConversionTrend] = useState([]);
   const [loading, setLoading] = useState(true);
   // Marketing-specific state
-  const [newsletterSubscribers, setNewsletterSubscribers] = useState([]);
+  const [newsletterCount, setNewsletterCount] = useState(0);
   const [submissionsByType, setSubmissionsByType] = useState([]);
   const [recentSubmissions, setRecentSubmissions] = useState([]);
   
@@ -91,96 +90,25 @@ export default function Dashboard(){
     (async()=>{
       try {
         setLoading(true);
-        const promises = [];
-        
-        // Only load leads if user has permission
-        if (hasLeadsPermission) {
-          promises.push(apiGet('/leads'));
-        } else {
-          // Marketing users: skip leads, but still need empty array for calculations
-          promises.push(Promise.resolve([]));
-        }
-        
-        // Load submissions only if user has permission
-        if (!isSalesExecutive) {
-          promises.push(
-            apiGet('/form-submissions/contact').catch(() => []),  // General Inquiry
-            apiGet('/form-submissions/demo').catch(() => []),  // Request a Demo
-            apiGet('/form-submissions/talk_to_sales').catch(() => []),  // Talk to Sales
-            apiGet('/form-submissions/brochure').catch(() => []),  // Brochure Download
-            apiGet('/form-submissions/product_profile').catch(() => []),  // Product Profile Download
-            apiGet('/form-submissions/newsletter').catch(() => [])  // Newsletter
-          );
-        }
-        
-        // Load reminders for Sales Executive and Read-Only users
-        if (isSalesExecutive || isReadOnly) {
-          promises.push(apiGet('/reminders/my/upcoming').catch(() => []));
-        }
-        
-        const results = await Promise.allSettled(promises);
-        const leads = results[0].status === 'fulfilled' ? results[0].value : [];
-        
+        // Counts, breakdowns and latest items are aggregated server-side and scoped to the user's role
+        const summary = await apiGet('/dashboard/summary');
         if (!mounted) return;
 
-        // Filter leads for Sales Executive and Read-Only users (only assigned to them)
-        let filteredLeads = leads;
-        if (isSalesExecutive || isReadOnly) {
-          filteredLeads = leads.filter(l => l.assigned_to === user?.id || l.assigned === user?.name);
-          setMyLeads(filteredLeads);
-        } else if (isMarketing) {
-          // Marketing users don't have leads permission, set empty array
-          filteredLeads = [];
-        }
-
-        const statusCount = {};
-        for(const l of filteredLeads){ statusCount[l.status] = (statusCount[l.status]||0)+1; }
-        setPipeline(Object.entries(statusCount).map(([status, count])=>({ status, count })));
+        // Marketing users don't work with leads
+        const leadSummary = isMarketing ? null : summary.leads;
+        setPipeline(leadSummary ? leadSummary.by_status : []);
 
-        const sourceCount = {};
-        for(const l of filteredLeads){ 
-          // Group by source_type (category): Website, Referral, Partner, etc.
-          // For form-based leads: source_type='Website', source='Brochure Download' etc.
-          // For other leads: source_type='Referral', source='John Doe' etc.
-          let normalizedSource = 'Unknown';
-          if (l.source_type) {
-            normalizedSource = l.source_type;
-          } else if (l.source) {
-            // Fallback: use source if source_type is not available
-            normalizedSource = l.source;
-          }
-          sourceCount[normalizedSource] = (sourceCount[normalizedSource]||0)+1; 
-        }
-        const sourcesData = Object.entries(sourceCount).map(([name, value])=>({ name, value }));
+        const sourcesData = (leadSummary?.by_source_type || []).map(row => ({ name: row.source_type, value: row.count }));
         setSources(sourcesData);
-        
-        // Get top 5 sources
-        setTopSources(sourcesData.sort((a, b) => b.value - a.value).slice(0, 5));
-        
-        // Get recent leads (last 5)
-        const sortedLeads = [...filteredLeads].sort((a, b) => {
-          const dateA = a.created_at ? new Date(a.created_at) : new Date(0);
-          const dateB = b.created_at ? new Date(b.created_at) : new Date(0);
-          return dateB - dateA;
-        });
-        setRecentLeads(sortedLeads.slice(0, 5));
+        // Get top 5 sources (already sorted by count)
+        setTopSources(sourcesData.slice(0, 5));
+        setRecentLeads(leadSummary ? leadSummary.recent : []);
 
-        if (!isSalesExecutive) {
-          const subsContact = results[1]?.status === 'fulfilled' ? results[1].value : [];
-          const subsDemo = results[2]?.status === 'fulfilled' ? results[2].value : [];
-          const subsTalk = results[3]?.status === 'fulfilled' ? results[3].value : [];
-          const subsBrochure = results[4]?.status === 'fulfilled' ? results[4].value : [];
-          const subsProfile = results[5]?.status === 'fulfilled' ? results[5].value : [];
-          const subsNewsletter = results[6]?.status === 'fulfilled' ? results[6].value : [];
-          
-          // Combine all submissions (excluding newsletter for conversion calculations)
-          const subAll = [...subsContact, ...subsDemo, ...subsTalk, ...subsBrochure, ...subsProfile];
-          const allSubsWithNewsletter = [...subAll, ...subsNewsletter];
-          
+        const subSummary = isSalesExecutive ? null : summary.submissions;
+        if (subSummary) {
           // Marketing-specific calculations
           if (isMarketing) {
-            // Set newsletter subscribers
-            setNewsletterSubscribers(subsNewsletter);
+            setNewsletterCount(subSummary.newsletter);
             
             // Map form_type to display names
             const formTypeDisplayMap = {
@@ -196,18 +124,14 @@ export default function Dashboard(){
               'unknown': 'Unknown'
             };
             
-            // Group submissions by form type with proper display names
+            // Group form type counts by display name (e.g., product-profile and product_profile)
             const typeCount = {};
-            subAll.forEach(s => {
-              const formType = s.form_type || 'unknown';
-              // Normalize form_type (handle variations like product-profile vs product_profile)
+            subSummary.by_form_type.forEach(({ form_type, count }) => {
+              const formType = form_type || 'unknown';
               const normalizedType = formType.toLowerCase().replace(/-/g, '_');
-              // Get display name from map, or fallback to formatted form_type
               const displayName = formTypeDisplayMap[normalizedType] || formTypeDisplayMap[formType] || 
                 formType.charAt(0).toUpperCase() + formType.slice(1).replace(/_/g, ' ');
-              
-              // Group by display name to avoid duplicates (e.g., product-profile and product_profile)
-              typeCount[displayName] = (typeCount[displayName] || 0) + 1;
+              typeCount[displayName] = (typeCount[displayName] || 0) + count;
             });
             
             // Convert to array format for chart/widget display
@@ -216,86 +140,42 @@ export default function Dashboard(){
               count
             })).sort((a, b) => b.count - a.count)); // Sort by count descending
             
-            // Get recent submissions (last 5)
-            const sortedSubs = [...subAll].sort((a, b) => {
-              const dateA = a.submitted_at || a.submitted ? new Date(a.submitted_at || a.submitted) : new Date(0);
-              const dateB = b.submitted_at || b.submitted ? new Date(b.submitted_at || b.submitted) : new Date(0);
-              return dateB - dateA;
-            });
-            setRecentSubmissions(sortedSubs.slice(0, 5));
+            setRecentSubmissions(subSummary.recent);
           }
           
-          // Check which submissions have been converted to leads by matching email (only if user has leads permission)
-          const leadEmails = hasLeadsPermission ? new Set(filteredLeads.map(l => l.email?.toLowerCase()).filter(Boolean)) : new Set();
-          const convertedSubs = hasLeadsPermission ? subAll.filter(s => {
-            const email = s.email?.toLowerCase();
-            return email && leadEmails.has(email);
-          }) : [];
-          
-          const byDay = {};
-          allSubsWithNewsletter.forEach(s=>{ 
-            try {
-              const date = s.submitted_at || s.submitted;
-              if (date) {
-                const d = new Date(date).toISOString().slice(0,10); 
-                byDay[d] = (byDay[d] || 0) + 1; 
-              }
-            } catch(e) {
-              console.warn('Invalid date:', s.submitted_at || s.submitted);
-            }
-          });
-          setTimeline(Object.entries(byDay).sort().map(([date, value])=>({ date, value })));
-
-          const totalSubmissions = subAll.length; // Exclude newsletter from total
-          // Marketing can't calculate conversion rate without leads access
-          const conversionRate = isMarketing ? 0 : (totalSubmissions > 0 ? ((convertedSubs.length / totalSubmissions) * 100).toFixed(1) : 0);
+          setTimeline(subSummary.per_day.map(day => ({ date: day.date, value: day.total + (day.newsletter || 0) })));  // Includes newsletter sign-ups
           
-          // Calculate conversion trend (last 7 days) - only if user has leads permission
+          // Conversion trend (last 7 days) - only if user has leads permission
           if (hasLeadsPermission && !isMarketing) {
-            const trendData = [];
-            for (let i = 6; i >= 0; i--) {
-              const date = new Date();
-              date.setDate(date.getDate() - i);
-              const dateStr = date.toISOString().slice(0, 10);
-              const daySubs = subAll.filter(s => {
-                try {
-                  const subDate = s.submitted_at || s.submitted;
-                  return subDate && new Date(subDate).toISOString().slice(0, 10) === dateStr;
-                } catch { return false; }
-              });
-              const dayConverted = daySubs.filter(s => {
-                const email = s.email?.toLowerCase();
-                return email && leadEmails.has(email);
-              }).length;
-              trendData.push({
-                date: format(date, 'MMM dd'),
-                converted: dayConverted,
-                total: daySubs.length,
-                rate: daySubs.length > 0 ? ((dayConverted / daySubs.length) * 100).toFixed(1) : 0
-              });
-            }
-            setConversionTrend(trendData);
+            setConversionTrend(subSummary.per_day.slice(-7).map(day => ({
+              date: format(new Date(`${day.date}T00:00`), 'MMM dd'),
+              converted: day.converted,
+              total: day.total,
+              rate: day.total > 0 ? ((day.converted / day.total) * 100).toFixed(1) : 0
+            })));
           } else {
             setConversionTrend([]);
           }
           
           setStats({ 
-            totalLeads: filteredLeads.length, 
-            totalSubmissions, 
-            conversionRate: isMarketing ? 0 : parseFloat(conversionRate), 
-            newLeads: filteredLeads.filter(l => l.status === 'New').length 
+            totalLeads: leadSummary?.total || 0, 
+            totalSubmissions: subSummary.total, 
+            // Marketing can't calculate conversion rate without leads access
+            conversionRate: isMarketing ? 0 : subSummary.conversion_rate, 
+            newLeads: leadSummary?.new || 0,
+            newThisWeek: subSummary.new_this_week
           });
         } else {
           // Sales Executive stats
-          const reminders = results[1]?.status === 'fulfilled' ? results[1].value : [];
-          setMyReminders(reminders);
-          setMyTasks(reminders.filter(r => !r.completed));
+          setMyReminders(summary.reminders?.next || []);
+          setUpcomingReminders(summary.reminders?.upcoming || 0);
           
           setStats({ 
-            totalLeads: filteredLeads.length, 
+            totalLeads: leadSummary?.total || 0, 
             totalSubmissions: 0, 
             conversionRate: 0, 
-            newLeads: filteredLeads.filter(l => l.status === 'New').length 
+            newLeads: leadSummary?.new || 0,
+            newThisWeek: 0
           });
         }
       } catch (error) {
@@ -332,15 +212,15 @@ export default function Dashboard(){
         },
         { 
           label: 'My Tasks', 
-          value: myTasks.length, 
+          value: upcomingReminders, 
           icon: CheckCircle, 
           color: '#28C76F',
           change: null,
-          subtitle: `${myReminders.filter(r => !r.completed).length} pending`
+          subtitle: `${upcomingReminders} pending`
         },
         { 
           label: 'My Follow-ups', 
-          value: myReminders.length, 
+          value: upcomingReminders, 
           icon: Calendar, 
           color: '#FF9F43',
           change: null,
@@ -356,14 +236,6 @@ export default function Dashboard(){
         },
       ];
     } else if (isMarketing) {
-      // Calculate new submissions this week
-      const weekAgo = new Date();
-      weekAgo.setDate(weekAgo.getDate() - 7);
-      const newThisWeek = recentSubmissions.filter(s => {
-        const subDate = s.submitted_at || s.submitted;
-        return subDate && new Date(subDate) >= weekAgo;
-      }).length;
-      
       return [
         { 
           label: 'Total Submissions', 
@@ -376,7 +248,7 @@ export default function Dashboard(){
         },
         { 
           label: 'Newsletter Subscribers', 
-          value: newsletterSubscribers.length, 
+          value: newsletterCount, 
           icon: Users, 
           color: '#28C76F',
           change: '+15%',
@@ -385,7 +257,7 @@ export default function Dashboard(){
         },
         { 
           label: 'New This Week', 
-          value: newThisWeek, 
+          value: stats.newThisWeek, 
           icon: TrendingUp, 
           color: '#FF9F43',
           change: null,
@@ -84,20 +84,23 @@ export default function LeadDetails(){
   async function loadData(){
     try {
       setLoading(true);
-      const foundLead = await apiGet(`/leads/${id}`).catch(() => null);
-      if (!foundLead) {
+      // Lead, comments and call logs in one round trip
+      const detail = await apiGet(`/leads/${id}/full`).catch(() => null);
+      if (!detail) {
         // Fallback to list endpoint
         const all = await apiGet('/leads');
         const found = all.find(x=> String(x.id)===String(id))||null;
         setLead(found);
         if (found) setLeadStatus(found.status);
+        const cs = await apiGet(`/comments/${id}`).catch(()=>[]);
+        setComments(cs);
+        await loadCallLogs();
       } else {
-        setLead(foundLead);
-        setLeadStatus(foundLead.status);
+        setLead(detail.lead);
+        setLeadStatus(detail.lead.status);
+        setComments(detail.comments);
+        setCallLogs(detail.call_logs);
       }
-      const cs = await apiGet(`/comments/${id}`).catch(()=>[]);
-      setComments(cs);
-      await loadCallLogs();
     } catch (error) {
       toast.error('Failed to load lead details');
       console.error(error);
@@ -3,6 +3,7 @@ import { useState } from 'react';
 import { motion } from 'framer-motion';
 import { Lock, Eye, EyeOff, Save, CheckCircle } from 'lucide-react';
 import { apiPost } from '@/utils/api';
+import { setToken } from '@/utils/auth';
 import { useAuth } from '@/app/components/AuthProvider';
 import toast from 'react-hot-toast';
 
@@ -39,10 +40,14 @@ export default function Settings(){
     setSuccess(false);
     
     try {
-      await apiPost('/auth/change-password', {
+      const result = await apiPost('/auth/change-password', {
         old_password: oldPassword,
         new_password: newPassword
       });
+      // Changing the password revokes older tokens; keep this session on the new one
+      if (result?.access_token) {
+        setToken(result.access_token);
+      }
       
       toast.success('Password changed successfully!');
       setOldPassword('');
@@ -9,7 +9,7 @@ import Link from 'next/link';
 const formTypes = [
   { type: 'demo', label: 'Request a Demo', icon: MessageSquare, color: '#1E73FF' },
   { type: 'talk', label: 'Talk to Sales', icon: HelpCircle, color: '#28C76F' },
-  { type: 'general', label: 'General Inquiry', icon: FileText, color: '#FF9F43' },
+  { type: 'general', statsType: 'contact', label: 'General Inquiry', icon: FileText, color: '#FF9F43' },
   { type: 'product-profile', label: 'Product Profile Download', icon: Download, color: '#EA5455' },
   { type: 'brochure', label: 'Brochure Download', icon: BookOpen, color: '#7367F0' },
 ];
@@ -22,14 +22,12 @@ export default function SubmissionsIndex(){
     (async () => {
       try {
         setLoading(true);
+        // Counts come back under the names the lists use ('general' is listed with 'contact')
+        const stats = await apiGet('/form-submissions/stats');
+        const totals = Object.fromEntries(stats.form_types.map((entry) => [entry.form_type, entry.total]));
         const countsData = {};
         for (const form of formTypes) {
-          try {
-            const data = await apiGet(`/submissions/${form.type}`).catch(() => []);
-            countsData[form.type] = data.length;
-          } catch (error) {
-            countsData[form.type] = 0;
-          }
+          countsData[form.type] = totals[form.statsType || form.type] || 0;
         }
         setCounts(countsData);
       } catch (error) {
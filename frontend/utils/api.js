@@ -24,7 +24,7 @@ function getHeaders() {
 export async function apiGet(path) {
   try {
     const res = await fetch(`${API}${path}`, { 
-      cache: 'no-store',
+      cache: 'no-cache',  // revalidate with If-None-Match; unchanged lists come back as 304
       headers: getHeaders()
     });
     if (!res.ok) {